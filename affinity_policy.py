@@ -0,0 +1,45 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from round_robin_policy import Round_Robin_Policy
+
+
+class Affinity_Policy(Round_Robin_Policy):
+    """
+    Affinity_Policy gives every transaction a home site: the first site it reads a replicated item from, chosen
+    round-robin. Its later reads go to the home site while the site can serve them, so transactions are spread over the
+    sites but each touches few sites, and fewer site failures can abort it.
+
+    Attributes:
+        lock_manager (Lock_Manager Object): the locks of the database
+        turn (int): number of home sites chosen so far
+        home (dict (int: int)): transaction ID: ID of its home site
+    """
+    def __init__(self, lock_manager):
+        '''
+        Constructor
+
+        Parameters:
+            lock_manager (Lock_Manager Object): the locks of the database
+        '''
+        Round_Robin_Policy.__init__(self, lock_manager)
+        self.home = {}
+
+    def choose(self, txn_id, item_id, site_ids):
+        if len(site_ids) == 1:
+            return site_ids[0]
+
+        site_id = self.home.get(txn_id)
+        if site_id == None:
+            site_id = Round_Robin_Policy.choose(self, txn_id, item_id, site_ids)
+            self.home[txn_id] = site_id
+        elif site_id not in site_ids:
+            # the home can't serve this item, the transaction keeps its home for later reads
+            return Round_Robin_Policy.choose(self, txn_id, item_id, site_ids)
+        return site_id
+
+    def forget(self, txn_id):
+        self.home.pop(txn_id, None)
@@ -0,0 +1,62 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+
+Deadlock handling benchmark. Runs the same generated workloads under deadlock detection and under each prevention
+policy, from low to high contention, and reports instructions and commits per second, the share of transactions that commit and
+the share that are aborted by their own end, killed to break a cycle or aborted by a prevention policy.
+Keys are uniform, contention rises as the items get fewer.
+
+    python3 benchmarks/deadlock.py [num_txns] [concurrency]
+'''
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from transaction_manager import Transaction_Manager
+from run_workload import Stats_Sink, run
+from workload import Workload, pending_of, status_of
+
+# number of data items of each contention level, fewer items conflict more
+CONTENTION = (("low", 1000), ("medium", 200), ("high", 50), ("extreme", 12))
+
+POLICIES = ("detect", "wait_die", "wound_wait", "no_wait")
+
+
+def measure(deadlock_policy, num_variables, num_txns, concurrency):
+    """ Runs one workload under a deadlock policy
+
+    Parameters:
+        deadlock_policy (string): "detect"/"wait_die"/"wound_wait"/"no_wait"
+        num_variables (int): Number of data items
+        num_txns (int): Number of transactions to run
+        concurrency (int): Number of transactions active at once
+
+    Return:
+        (number of instructions, seconds, Stats_Sink Object, number of transactions)
+    """
+
+    sink = Stats_Sink()
+    tm = Transaction_Manager(Config(10, num_variables, deadlock_policy=deadlock_policy), sink)
+    workload = Workload(10, num_variables, num_txns, concurrency, txn_length=5, seed=7)
+    count, elapsed = run(tm, workload.stream(status_of(tm), pending_of(tm)))
+    return count, elapsed, sink, len(tm.txns)
+
+
+if __name__ == "__main__":
+    num_txns = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    print(f'{num_txns} transactions, {concurrency} at once')
+    print(f'{"contention":>10} {"policy":>10} {"instr/s":>9} {"commits/s":>10} {"commit%":>8} {"abort%":>7} {"kill%":>6} {"prevent%":>9}')
+    for level, num_variables in CONTENTION:
+        for deadlock_policy in POLICIES:
+            count, elapsed, sink, txns = measure(deadlock_policy, num_variables, num_txns, concurrency)
+            committed = sink.counts.get("commit", 0) + sink.counts.get("commit_read_only", 0)
+            share = lambda *events: 100 * sum(sink.counts.get(e, 0) for e in events) / max(1, txns)
+            print(f'{level:>10} {deadlock_policy:>10} {count / elapsed:>9.0f} {committed / elapsed:>10.0f} '
+                  f'{share("commit", "commit_read_only"):>8.1f} '
+                  f'{share("abort"):>7.1f} {share("kill"):>6.1f} {share("prevent"):>9.1f}')
@@ -0,0 +1,143 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+
+Load generator for server.py. Opens many concurrent sessions, each running generated transactions one after another,
+and reports operations per second, commit/abort rates and the latency of operations, split into operations that
+were answered at once and operations that blocked.
+
+    python3 server.py --unix /tmp/db.sock &
+    python3 benchmarks/load_client.py --unix /tmp/db.sock --sessions 2000 --txns 20000
+'''
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from workload import add_arguments, from_arguments
+
+# longest answer line read, in bytes
+LINE_LIMIT = 1 << 24
+
+
+class Load_Client(object):
+    """
+    Load_Client runs the transactions of a Workload over many sessions of a server and measures every operation.
+
+    Attributes:
+        workload (Workload Object): generates the transactions
+        first_txn (int): ID of the first transaction
+        next_txn (int): ID of the next transaction to run
+        latencies (list(float)): seconds from sending an operation to its answer, for operations answered at once
+        blocked_latencies (list(float)): the same for operations that blocked first
+        statuses (dict (string: int)): final status of a transaction: number of transactions
+        errors (int): number of operations the server refused
+    """
+    def __init__(self, workload, first_txn=1):
+        '''
+        Constructor
+
+        Parameters:
+            workload (Workload Object): generates the transactions, its num_txns is the number of transactions to run
+            first_txn (int): ID of the first transaction, IDs can't be reused on one server
+        '''
+        self.workload = workload
+        self.first_txn = first_txn
+        self.next_txn = first_txn
+        self.latencies = []
+        self.blocked_latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    async def session(self, connect):
+        """Runs transactions on one connection until every transaction of the workload has been started
+
+        Parameters:
+            connect (function): opens a connection, returns (StreamReader, StreamWriter)
+        """
+
+        reader, writer = await connect()
+        try:
+            while self.next_txn < self.first_txn + self.workload.num_txns:
+                txn_id = self.next_txn
+                self.next_txn += 1
+
+                status = None
+                for instr in self.workload.transaction(txn_id):
+                    sent = time.perf_counter()
+                    writer.write(instr.encode() + b"\n")
+                    await writer.drain()
+                    answer = json.loads(await reader.readline())
+                    elapsed = time.perf_counter() - sent
+
+                    status = answer["status"]
+                    if status == "error":
+                        self.errors += 1
+                        break
+                    if any(" fails to " in line or " not able to " in line or " cannot read " in line
+                           for line in answer["output"]):
+                        self.blocked_latencies.append(elapsed)
+                    else:
+                        self.latencies.append(elapsed)
+                    if status == "aborted":
+                        break
+
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+
+def percentile_ms(values, p):
+    # p-th percentile of sorted values in milliseconds, 0 if there are none
+    if len(values) == 0:
+        return 0
+    return 1000 * values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def run(client, sessions, connect):
+    # runs the sessions together, returns the seconds they took
+    start = time.perf_counter()
+    await asyncio.gather(*(client.session(connect) for _ in range(sessions)))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drives server.py with many concurrent sessions")
+    add_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--unix", help="connect to this Unix socket instead of TCP")
+    parser.add_argument("--sessions", type=int, default=1000, help="number of concurrent sessions")
+    parser.add_argument("--first-txn", type=int, default=1, help="ID of the first transaction, IDs can't be reused on one server")
+    args = parser.parse_args()
+
+    # a wait under heavy load lists every transaction it waits for, answers can be long
+    if args.unix != None:
+        connect = lambda: asyncio.open_unix_connection(args.unix, limit=LINE_LIMIT)
+    else:
+        connect = lambda: asyncio.open_connection(args.host, args.port, limit=LINE_LIMIT)
+
+    client = Load_Client(from_arguments(args), args.first_txn)
+    elapsed = asyncio.run(run(client, args.sessions, connect))
+
+    operations = len(client.latencies) + len(client.blocked_latencies)
+    txns = max(1, sum(client.statuses.values()))
+    latencies = sorted(client.latencies)
+    blocked = sorted(client.blocked_latencies)
+
+    print(f'sessions          {args.sessions}')
+    print(f'operations        {operations}')
+    print(f'seconds           {elapsed:.4f}')
+    print(f'operations/s      {operations / elapsed:.0f}')
+    for status, n in sorted(client.statuses.items(), key=lambda s: str(s[0])):
+        print(f'{str(status):<17} {n} ({100 * n / txns:.1f}%)')
+    print(f'errors            {client.errors}')
+    print(f'latency ms        p50 {percentile_ms(latencies, 50):.2f}  p90 {percentile_ms(latencies, 90):.2f}  '
+          f'p99 {percentile_ms(latencies, 99):.2f}  ({len(latencies)} operations)')
+    print(f'blocked ms        p50 {percentile_ms(blocked, 50):.2f}  p90 {percentile_ms(blocked, 90):.2f}  '
+          f'p99 {percentile_ms(blocked, 99):.2f}  ({len(blocked)} operations)')
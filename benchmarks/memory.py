@@ -0,0 +1,53 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+
+Memory benchmark. Measures the memory a Transaction_Manager keeps after construction with object storage
+(a Variable per item per site) and with compact storage (a typed array and a bitmap per site), while scaling
+the number of variables.
+
+    python3 benchmarks/memory.py [max_variables] [num_sites]
+'''
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from transaction_manager import Transaction_Manager
+
+
+def measure(num_sites, num_variables, compact):
+    """ Builds a Transaction_Manager of the given size
+
+    Parameters:
+        num_sites (int): Number of sites
+        num_variables (int): Number of data items
+        compact (bool): Whether to use compact storage
+
+    Return:
+        bytes still allocated once the Transaction_Manager is built
+    """
+
+    tracemalloc.start()
+    tm = Transaction_Manager(Config(num_sites, num_variables, compact=compact))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tm
+    return current
+
+
+if __name__ == "__main__":
+    max_variables = int(sys.argv[1]) if len(sys.argv) > 1 else 256000
+    num_sites = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print(f'{num_sites} sites')
+    print(f'{"variables":>10} {"objects MiB":>12} {"compact MiB":>12} {"ratio":>6}')
+    n = 1000
+    while n <= max_variables:
+        objects = measure(num_sites, n, False)
+        compact = measure(num_sites, n, True)
+        print(f'{n:>10} {objects / 2**20:>12.2f} {compact / 2**20:>12.2f} {objects / compact:>6.1f}')
+        n *= 4
@@ -0,0 +1,74 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+
+Catch-up benchmark. Fails and recovers one site, then runs a read-mostly workload with round-robin replica choice
+and reports how many ticks the recovered site takes to serve every replicated item again and the share of all reads it
+served, without catching up and with a few batch sizes.
+
+    python3 benchmarks/recovery.py [num_variables] [ticks]
+'''
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from event_sink import Event_Sink
+from instruction import Instruction
+from metrics_registry import Metrics_Registry
+from transaction_manager import Transaction_Manager
+from workload import Workload, pending_of, status_of, step
+
+# site that fails and recovers
+SITE = 3
+
+# catch_up_batch of each run, None doesn't catch up
+BATCHES = (None, 1, 8, 64)
+
+
+def measure(catch_up_batch, num_variables, ticks):
+    """ Recovers a site and runs a read-mostly workload for some ticks
+
+    Parameters:
+        catch_up_batch (int): Number of items copied per tick, None doesn't catch up
+        num_variables (int): Number of data items
+        ticks (int): Number of instructions run after the recovery
+
+    Return:
+        (tick after the recovery the site could serve every replicated item, None if it never did;
+         share of all the reads served by the site)
+    """
+
+    metrics = Metrics_Registry()
+    tm = Transaction_Manager(Config(10, num_variables, replica_policy="round_robin", catch_up_batch=catch_up_batch),
+                             Event_Sink(), metrics)
+    tm.read_instruction(f'fail({SITE})')
+    tm.read_instruction(f'recover({SITE})')
+
+    site = tm.site_manager.sites[SITE - 1]
+    replicated = len(tm.config.replicated_items)
+    workload = Workload(10, num_variables, ticks, concurrency=8, read_only_ratio=0.0, write_ratio=0.05, seed=1)
+
+    caught_up = None
+    for tick, instr in enumerate(workload.stream(status_of(tm), pending_of(tm)), 1):
+        if tick > ticks:
+            break
+        step(tm, Instruction.parse(instr))
+        if caught_up == None and sum(1 for i in tm.config.replicated_items if i in site.readable_variables) == replicated:
+            caught_up = tick
+
+    reads = {name: n for name, n in metrics.counters.items() if name.startswith("read.site")}
+    return caught_up, reads.get(f'read.site{SITE}', 0) / max(1, sum(reads.values()))
+
+
+if __name__ == "__main__":
+    num_variables = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    print(f'{num_variables} variables, {ticks} ticks after Site {SITE} recovers, 10 sites')
+    print(f'{"batch":>6} {"caught up at":>13} {"reads at site":>14}')
+    for catch_up_batch in BATCHES:
+        caught_up, share = measure(catch_up_batch, num_variables, ticks)
+        print(f'{str(catch_up_batch):>6} {str(caught_up):>13} {100 * share:>13.1f}%')
@@ -0,0 +1,72 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+
+Restore benchmark. Compares building a Transaction_Manager from scratch with restoring it from a checkpoint,
+and then reading a fixed number of items, while scaling the number of variables.
+
+    python3 benchmarks/restore.py [max_variables] [items_touched]
+'''
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from transaction_manager import Transaction_Manager
+from event_sink import Event_Sink
+
+
+def touch(tm, items_touched):
+    # reads items_touched items spread over the database
+    step = max(1, tm.config.num_variables // items_touched)
+    tm.read_instruction('begin(T1)')
+    for item_id in range(1, tm.config.num_variables + 1, step):
+        tm.read_instruction(f'R(T1,x{item_id})')
+    tm.read_instruction('end(T1)')
+
+
+def measure(num_variables, items_touched, path):
+    """ Builds a database, checkpoints it and restores it
+
+    Parameters:
+        num_variables (int): Number of data items
+        items_touched (int): Number of items read after construction
+        path (string): path of the checkpoint file
+
+    Return:
+        (seconds to build and touch, seconds to restore and touch)
+    """
+
+    start = time.perf_counter()
+    tm = Transaction_Manager(Config(10, num_variables), Event_Sink())
+    touch(tm, items_touched)
+    built = time.perf_counter() - start
+
+    tm.checkpoint(path)
+    del tm
+
+    start = time.perf_counter()
+    tm = Transaction_Manager(Config(10, num_variables, checkpoint_path=path),
+                             Event_Sink())
+    touch(tm, items_touched)
+    restored = time.perf_counter() - start
+    return built, restored
+
+
+if __name__ == "__main__":
+    max_variables = int(sys.argv[1]) if len(sys.argv) > 1 else 256000
+    items_touched = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    print(f'10 sites, {items_touched} items touched')
+    print(f'{"variables":>10} {"build s":>10} {"restore s":>10}')
+    with tempfile.TemporaryDirectory() as tmp:
+        n = 1000
+        while n <= max_variables:
+            path = os.path.join(tmp, f'{n}.ckpt')
+            built, restored = measure(n, items_touched, path)
+            print(f'{n:>10} {built:>10.4f} {restored:>10.4f}')
+            n *= 4
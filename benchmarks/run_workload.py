@@ -0,0 +1,159 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+
+Workload benchmark runner. Drives a Transaction_Manager with a generated workload, or with an input file, and reports
+instructions per second, commit/abort/kill/prevention rates, how many ticks transactions spent blocked and peak memory.
+
+    python3 benchmarks/run_workload.py [workload options] [--input FILE] [--compact] [--distributed] [--deadlock-policy POLICY] [--concurrency-control CC] [--catch-up-batch N] [--eager-abort MODE] [--trace-memory] [--metrics FILE]
+'''
+import argparse
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from event_sink import Event_Sink
+from instruction import Instruction
+from metrics import Metrics
+from metrics_registry import Metrics_Registry
+from transaction_manager import Transaction_Manager
+from workload import add_arguments, from_arguments, pending_of, status_of, step
+
+
+# events reporting that a transaction has to wait, their first field is the transaction ID
+WAIT_EVENTS = ("wait_shared", "wait_exclusive", "wait_exclusive_range", "wait_range", "wait_site_lock",
+               "unavailable_read", "unavailable_write", "unserved_read", "unserved_write", "snapshot_wait")
+
+
+class Stats_Sink(Event_Sink):
+    """
+    Stats_Sink formats nothing, it counts events and measures how many ticks each wait lasts.
+
+    Attributes:
+        counts (dict (string: int)): event type: number of events
+        tick (int): tick of the last "tick" event
+        blocked_since (dict (int: int)): transaction ID: tick its current wait started
+        waits (list(int)): ticks each finished wait lasted
+    """
+    def __init__(self):
+        self.counts = {}
+        self.tick = 0
+        self.blocked_since = {}
+        self.waits = []
+
+    def emit(self, event, *fields):
+        self.counts[event] = self.counts.get(event, 0) + 1
+        if event == "tick":
+            self.tick = fields[0]
+        elif event in WAIT_EVENTS:
+            self.blocked_since.setdefault(fields[0], self.tick)
+        elif event == "resume" or event == "kill" or event == "prevent" or event == "abort" or event == "doomed":
+            if fields[0] in self.blocked_since:
+                self.waits.append(self.tick - self.blocked_since.pop(fields[0]))
+
+
+def percentile(values, p):
+    # p-th percentile of sorted values, 0 if there are none
+    if len(values) == 0:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(tm, instructions):
+    """ Runs instructions through a Transaction_Manager, the way main.py does
+
+    Parameters:
+        tm (Transaction_Manager Object): Transaction_Manager reporting to a Stats_Sink
+        instructions (iterator(string)): instructions to run
+
+    Return:
+        (number of instructions, seconds)
+    """
+
+    count = 0
+    start = time.perf_counter()
+    for instr in instructions:
+        step(tm, Instruction.parse(instr))
+        count += 1
+    tm.find_cycle()
+    tm.run_ready_transactions()
+    elapsed = time.perf_counter() - start
+
+    tm.close()
+    return count, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs a workload and reports throughput")
+    add_arguments(parser)
+    parser.add_argument("--input", help="run an input file instead of a generated workload")
+    parser.add_argument("--compact", action="store_true", help="use compact site storage")
+    parser.add_argument("--distributed", action="store_true", help="run every site in its own process")
+    parser.add_argument("--replica-policy", choices=("first", "round_robin", "least_locked", "affinity"), default="first",
+                        help="how a read chooses among the replicas of its item")
+    parser.add_argument("--read-quorum", type=int, help="copies of a replicated item a read locks, with --write-quorum")
+    parser.add_argument("--write-quorum", type=int, help="copies of a replicated item a write locks, with --read-quorum")
+    parser.add_argument("--deadlock-policy", choices=("detect", "wait_die", "wound_wait", "no_wait"), default="detect",
+                        help="find deadlocks in the wait-for graph or prevent them at lock conflicts")
+    parser.add_argument("--concurrency-control", choices=("locking", "optimistic"), default="locking",
+                        help="lock before every read and write, or validate the reads at commit")
+    parser.add_argument("--catch-up-batch", type=int, help="replicated items copied to recovered sites per tick")
+    parser.add_argument("--eager-abort", choices=("end", "immediate"),
+                        help="release the locks of transactions doomed by a site failure at once, reporting the abort at their end or now")
+    parser.add_argument("--trace-memory", action="store_true", help="measure peak memory with tracemalloc, which is slower")
+    parser.add_argument("--metrics", help="record metrics and write them to this JSON file")
+    args = parser.parse_args()
+
+    sink = Stats_Sink()
+    metrics = Metrics_Registry() if args.metrics != None else Metrics()
+    tm = Transaction_Manager(Config(args.sites, args.variables, compact=args.compact, distributed=args.distributed,
+                                   replica_policy=args.replica_policy, read_quorum=args.read_quorum,
+                                   write_quorum=args.write_quorum, deadlock_policy=args.deadlock_policy,
+                                   concurrency_control=args.concurrency_control, catch_up_batch=args.catch_up_batch,
+                                   eager_abort=args.eager_abort),
+                             sink, metrics)
+    if args.input != None:
+        with open(args.input) as f:
+            instructions = [line.strip() for line in f if line.strip() != ""]
+    else:
+        instructions = from_arguments(args).stream(status_of(tm), pending_of(tm))
+
+    if args.trace_memory:
+        tracemalloc.start()
+    count, elapsed = run(tm, instructions)
+    if args.trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory = f'{peak / 2**20:.2f} MiB traced peak'
+    else:
+        memory = f'{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10:.2f} MiB max RSS'
+
+    txns = max(1, len(tm.txns))
+    committed = sink.counts.get("commit", 0) + sink.counts.get("commit_read_only", 0)
+    aborted = sink.counts.get("abort", 0)
+    killed = sink.counts.get("kill", 0)
+    prevented = sink.counts.get("prevent", 0)
+    unfinished = sum(1 for txn in tm.txns.values() if txn.status != "committed" and txn.status != "aborted")
+    waits = sorted(sink.waits)
+
+    print(f'instructions      {count}')
+    print(f'seconds           {elapsed:.4f}')
+    print(f'instructions/s    {count / elapsed:.0f}')
+    print(f'transactions      {len(tm.txns)}')
+    print(f'committed         {committed} ({100 * committed / txns:.1f}%)')
+    print(f'aborted           {aborted} ({100 * aborted / txns:.1f}%)')
+    print(f'killed            {killed} ({100 * killed / txns:.1f}%)')
+    print(f'prevented         {prevented} ({100 * prevented / txns:.1f}%)')
+    print(f'unfinished        {unfinished}')
+    print(f'waits             {len(waits)}')
+    print(f'ticks blocked     p50 {percentile(waits, 50)}  p90 {percentile(waits, 90)}  p99 {percentile(waits, 99)}  max {percentile(waits, 100)}')
+    print(f'memory            {memory}')
+
+    if args.metrics != None:
+        metrics.export(args.metrics)
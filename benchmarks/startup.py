@@ -0,0 +1,70 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+
+Startup benchmark. Measures how long it takes to construct a Transaction_Manager and how much memory it allocates
+while scaling the number of sites and the number of variables independently.
+
+    python3 benchmarks/startup.py [max_sites] [max_variables]
+'''
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from transaction_manager import Transaction_Manager
+
+
+def measure(num_sites, num_variables):
+    """ Builds a Transaction_Manager of the given size
+
+    Parameters:
+        num_sites (int): Number of sites
+        num_variables (int): Number of data items
+
+    Return:
+        (seconds to construct, peak bytes allocated during construction)
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    tm = Transaction_Manager(Config(num_sites, num_variables))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tm
+    return elapsed, peak
+
+
+def report(label, sizes):
+    print(label)
+    print(f'{"sites":>8} {"variables":>10} {"seconds":>10} {"peak MiB":>10}')
+    for num_sites, num_variables in sizes:
+        elapsed, peak = measure(num_sites, num_variables)
+        print(f'{num_sites:>8} {num_variables:>10} {elapsed:>10.4f} {peak / 2**20:>10.2f}')
+    print()
+
+
+if __name__ == "__main__":
+    max_sites = int(sys.argv[1]) if len(sys.argv) > 1 else 320
+    max_variables = int(sys.argv[2]) if len(sys.argv) > 2 else 64000
+
+    sites = []
+    n = 10
+    while n <= max_sites:
+        sites.append(n)
+        n *= 2
+
+    variables = []
+    n = 1000
+    while n <= max_variables:
+        variables.append(n)
+        n *= 4
+
+    report("Scaling sites (20 variables)", [(s, 20) for s in sites])
+    report("Scaling variables (10 sites)", [(10, v) for v in variables])
+    report(f'Scaling sites ({variables[0]} variables)', [(s, variables[0]) for s in sites])
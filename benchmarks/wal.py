@@ -0,0 +1,64 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+
+Write-ahead log benchmark. Runs short write transactions (begin, W, end) through a Transaction_Manager that logs
+to a temporary directory and reports the commits per second and the number of fsyncs under each fsync policy.
+Nothing is reported to a client, so commits wait for the group commit window like the server's answers.
+
+    python3 benchmarks/wal.py [num_commits] [group_commit_window]
+'''
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from transaction_manager import Transaction_Manager
+from event_sink import Event_Sink
+
+
+def measure(fsync_policy, num_commits, group_commit_window):
+    """ Commits num_commits transactions that each write one replicated and one unreplicated item
+
+    Parameters:
+        fsync_policy (string): "always"/"group"/"none"
+        num_commits (int): Number of transactions to commit
+        group_commit_window (float): Seconds a commit can wait to share a group fsync
+
+    Return:
+        (commits per second, fsyncs done)
+    """
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = Config(wal_path=os.path.join(tmp, "wal.log"),
+                        fsync_policy=fsync_policy,
+                        group_commit_window=group_commit_window)
+        tm = Transaction_Manager(config, Event_Sink())
+        tm.defer_sync = True
+        log = tm.site_manager.log
+
+        start = time.perf_counter()
+        for i in range(1, num_commits + 1):
+            tm.read_instruction(f'begin(T{i})')
+            tm.read_instruction(f'W(T{i},x{2 * (i % 10) + 2},{i})')
+            tm.read_instruction(f'W(T{i},x{2 * (i % 10) + 1},{i})')
+            tm.read_instruction(f'end(T{i})')
+        tm.close()
+        elapsed = time.perf_counter() - start
+
+        return num_commits / elapsed, log.syncs
+
+
+if __name__ == "__main__":
+    num_commits = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    group_commit_window = float(sys.argv[2]) if len(sys.argv) > 2 else 0.005
+
+    print(f'{num_commits} commits, group commit window {group_commit_window}s')
+    print(f'{"policy":>8} {"commits/s":>12} {"fsyncs":>8}')
+    for fsync_policy in ("always", "group", "none"):
+        rate, syncs = measure(fsync_policy, num_commits, group_commit_window)
+        print(f'{fsync_policy:>8} {rate:>12.0f} {syncs:>8}')
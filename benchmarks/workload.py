@@ -0,0 +1,259 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+
+Synthetic workload generator. Produces instruction streams in the input grammar (begin, beginRO, R, W, MR, MW, end, fail,
+recover) with a chosen key skew, read-only ratio, transaction length, concurrency and failure rate.
+
+The program assumes no new instruction is given to a transaction while it's waiting, so the generator is closed-loop:
+it asks for the status of a transaction before giving it its next instruction. Run as a script, it drives a silent
+Transaction_Manager the way main.py does to get those statuses, so the stream it writes replays the same way with main.py.
+
+    python3 benchmarks/workload.py [options] > workload.txt
+'''
+import argparse
+import os
+import random
+import sys
+from bisect import bisect_left
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from event_sink import Event_Sink
+from instruction import Instruction
+from transaction_manager import Transaction_Manager
+
+
+class Workload(object):
+    """
+    Workload generates the instructions of num_txns transactions, keeping up to concurrency of them active at once.
+
+    Attributes:
+        num_sites (int): Number of sites
+        num_variables (int): Number of data items
+        num_txns (int): Number of transactions to run
+        concurrency (int): Number of transactions active at once
+        txn_length (int): Number of reads and writes per transaction
+        read_only_ratio (float): Fraction of transactions that are read-only
+        write_ratio (float): Fraction of the operations of a read-write transaction that are writes
+        skew (string): Key distribution - "uniform"/"zipf"
+        zipf_s (float): Exponent of the Zipf distribution, item 1 is the most popular
+        failure_rate (float): Probability that an instruction is a site failure or recovery
+        bulk (bool): Whether a transaction gives its reads as one MR instruction and its writes as one MW instruction instead of one R or W each
+        random (Random Object): seeded random generator, so a workload is reproducible
+        cum_weights (list(float)): cumulative Zipf weights of the items, None for uniform keys
+    """
+    def __init__(self,
+                 num_sites=10,
+                 num_variables=20,
+                 num_txns=1000,
+                 concurrency=8,
+                 txn_length=4,
+                 read_only_ratio=0.2,
+                 write_ratio=0.5,
+                 skew="uniform",
+                 zipf_s=1.1,
+                 failure_rate=0.0,
+                 seed=0,
+                 bulk=False):
+        '''
+        Constructor
+
+        Parameters are the attributes of the same name. seed (int) seeds the random generator
+        '''
+        if skew not in ("uniform", "zipf"):
+            raise ValueError("skew must be uniform or zipf")
+
+        self.num_sites = num_sites
+        self.num_variables = num_variables
+        self.num_txns = num_txns
+        self.concurrency = concurrency
+        self.txn_length = txn_length
+        self.read_only_ratio = read_only_ratio
+        self.write_ratio = write_ratio
+        self.skew = skew
+        self.zipf_s = zipf_s
+        self.failure_rate = failure_rate
+        self.bulk = bulk
+        self.random = random.Random(seed)
+
+        self.cum_weights = None
+        if skew == "zipf":
+            self.cum_weights = list(
+                accumulate(1 / k**zipf_s for k in range(1, num_variables + 1)))
+
+    def key(self):
+        # ID of an item, drawn from the key distribution
+        if self.cum_weights == None:
+            return self.random.randint(1, self.num_variables)
+        r = self.random.random() * self.cum_weights[-1]
+        return min(bisect_left(self.cum_weights, r), self.num_variables - 1) + 1
+
+    def transaction(self, txn_id):
+        """Instructions of one transaction, from its begin to its end
+
+        Parameters:
+            txn_id (int): ID of transaction
+
+        Return:
+            list(string) of instructions
+        """
+
+        if self.random.random() < self.read_only_ratio:
+            ops = [f'beginRO(T{txn_id})']
+            ops.extend(f'R(T{txn_id},x{self.key()})' for _ in range(self.txn_length))
+        else:
+            ops = [f'begin(T{txn_id})']
+            for _ in range(self.txn_length):
+                if self.random.random() < self.write_ratio:
+                    ops.append(f'W(T{txn_id},x{self.key()},{self.random.randint(0, 9999)})')
+                else:
+                    ops.append(f'R(T{txn_id},x{self.key()})')
+        if self.bulk:
+            ops = self.batched(txn_id, ops)
+        ops.append(f'end(T{txn_id})')
+        return ops
+
+    def batched(self, txn_id, ops):
+        # the reads of a transaction as one MR and its writes as one MW, after its begin
+        reads = [op[op.index(",") + 1:-1] for op in ops if op[0] == "R"]
+        writes = [op[op.index(",") + 1:-1].replace(",", "=") for op in ops if op[0] == "W"]
+        batch = [ops[0]]
+        if len(reads) > 0:
+            batch.append(f'MR(T{txn_id},{",".join(reads)})')
+        if len(writes) > 0:
+            batch.append(f'MW(T{txn_id},{",".join(writes)})')
+        return batch
+
+    def site_event(self, failed):
+        # fails a site or recovers a failed one, at least one site stays up
+        if len(failed) > 0 and (len(failed) == self.num_sites - 1 or self.random.random() < 0.5):
+            site_id = self.random.choice(sorted(failed))
+            failed.discard(site_id)
+            return f'recover({site_id})'
+
+        site_id = self.random.choice([s for s in range(1, self.num_sites + 1) if s not in failed])
+        failed.add(site_id)
+        return f'fail({site_id})'
+
+    def stream(self, status, pending=None):
+        """Generates the instructions of the workload
+
+        Parameters:
+            status (function): txn_id: status of the transaction - "running"/"blocked"/"doomed"/"committed"/"aborted",
+                               asked before the transaction is given its next instruction
+            pending (function): whether a deadlock check or a resume is waiting for the next instruction, None if never
+
+        Return:
+            iterator(string) of instructions. It ends early if every remaining transaction waits and neither recovering
+            sites nor admitting transactions can help, e.g. readers of a replicated item that no site has had a
+            committed write for since it recovered
+        """
+
+        active = {}
+        next_txn = 1
+        failed = set()
+
+        while next_txn <= self.num_txns or len(active) > 0:
+            # start transactions up to the concurrency
+            while len(active) < self.concurrency and next_txn <= self.num_txns:
+                active[next_txn] = iter(self.transaction(next_txn))
+                next_txn += 1
+
+            if self.failure_rate > 0 and self.random.random() < self.failure_rate:
+                yield self.site_event(failed)
+                continue
+
+            ready = []
+            for txn_id in list(active):
+                s = status(txn_id)
+                if s == "committed" or s == "aborted":
+                    del active[txn_id]
+                elif s != "blocked":
+                    ready.append(txn_id)
+
+            if len(ready) == 0:
+                if pending != None and pending() and next_txn <= self.num_txns:
+                    # deadlocks and resumes are only settled before the next instruction, admit one more transaction
+                    active[next_txn] = iter(self.transaction(next_txn))
+                    next_txn += 1
+                elif len(failed) > 0:
+                    # everyone waits, some of them for a failed site
+                    site_id = min(failed)
+                    failed.discard(site_id)
+                    yield f'recover({site_id})'
+                elif len(active) > 0:
+                    # nothing can run and nothing can unblock it
+                    return
+                continue
+
+            txn_id = self.random.choice(ready)
+            instr = next(active[txn_id], None)
+            if instr == None:
+                del active[txn_id]
+                continue
+            yield instr
+
+        for site_id in sorted(failed):
+            yield f'recover({site_id})'
+
+
+def add_arguments(parser):
+    # the workload options, shared with run_workload.py
+    parser.add_argument("--sites", type=int, default=10)
+    parser.add_argument("--variables", type=int, default=20)
+    parser.add_argument("--txns", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--length", type=int, default=4, help="reads and writes per transaction")
+    parser.add_argument("--read-only", type=float, default=0.2, help="fraction of read-only transactions")
+    parser.add_argument("--writes", type=float, default=0.5, help="fraction of writes in read-write transactions")
+    parser.add_argument("--skew", choices=("uniform", "zipf"), default="uniform")
+    parser.add_argument("--zipf-s", type=float, default=1.1)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability an instruction is a site failure or recovery")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bulk", action="store_true", help="give the reads and the writes of a transaction as one MR and one MW")
+
+
+def from_arguments(args):
+    return Workload(args.sites, args.variables, args.txns, args.concurrency, args.length, args.read_only,
+                    args.writes, args.skew, args.zipf_s, args.failure_rate, args.seed, args.bulk)
+
+
+def status_of(tm):
+    # status of a transaction in a Transaction_Manager, None before it begins
+    def status(txn_id):
+        txn = tm.txns.get(txn_id)
+        return txn.status if txn != None else None
+
+    return status
+
+
+def pending_of(tm):
+    # whether a Transaction_Manager has a deadlock check or a resume to do before its next instruction
+    def pending():
+        site_manager = tm.site_manager
+        return len(site_manager.txns_ready_list) > 0 or len(site_manager.wait_for_graph.newly_blocked) > 0
+
+    return pending
+
+def step(tm, instr):
+    # runs one instruction the way main.py does, deadlocks and resumes are settled before it
+    tm.find_cycle()
+    tm.run_ready_transactions()
+    tm.run_instruction(instr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates a workload")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    workload = from_arguments(args)
+    tm = Transaction_Manager(Config(args.sites, args.variables), Event_Sink())
+    out = sys.stdout
+    for instr in workload.stream(status_of(tm), pending_of(tm)):
+        out.write(instr + "\n")
+        step(tm, Instruction.parse(instr))
@@ -0,0 +1,78 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from collections import OrderedDict, deque
+
+
+class Catch_Up(object):
+    """
+    Catch_Up keeps, for every recovered site, the replicated items it still has to copy from its peers. The Site_Manager
+    copies a bounded batch of them every tick, so a recovered site serves replicated reads again soon after it recovers
+    instead of waiting for a committed write of each item.
+
+    Attributes:
+        config (Config Object): size and item placement of the database
+        batch_size (int): number of items copied per tick, over all the sites catching up
+        pending (OrderedDict (int: deque(int)) ): site_id: IDs of the replicated items the site still has to copy, the next one last.
+                                                 Sites in the order they recovered
+    """
+    def __init__(self, config, batch_size):
+        '''
+        Constructor
+
+        Parameters:
+            config (Config Object): size and item placement of the database
+            batch_size (int): number of items copied per tick
+        '''
+        self.config = config
+        self.batch_size = batch_size
+        self.pending = OrderedDict()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def start(self, site_id, item_ids):
+        """Starts catching up a site
+
+        Parameters:
+            site_id (int): ID of a recovered site
+            item_ids (list(int)): IDs of the replicated items the site can't serve, in increasing order
+        """
+
+        if len(item_ids) == 0:
+            return
+        self.pending[site_id] = deque(reversed(item_ids))
+        self.pending.move_to_end(site_id)
+
+    def stop(self, site_id):
+        # a failed site copies nothing until it recovers again
+        self.pending.pop(site_id, None)
+
+    def take(self):
+        """Takes the next batch of items to copy. The sites that recovered first are served first
+
+        Return:
+            list((int, int)) of (site_id, item_id), at most batch_size of them
+        """
+
+        batch = []
+        for site_id, items in self.pending.items():
+            while len(items) > 0 and len(batch) < self.batch_size:
+                batch.append((site_id, items.pop()))
+            if len(batch) == self.batch_size:
+                break
+
+        # sites with nothing left to copy are done
+        for site_id in [s for s, items in self.pending.items() if len(items) == 0]:
+            del self.pending[site_id]
+        return batch
+
+    def defer(self, site_id, item_id):
+        # an item that can't be copied yet is tried again after the site's other items
+        if site_id in self.pending:
+            self.pending[site_id].appendleft(item_id)
+        else:
+            self.pending[site_id] = deque([item_id])
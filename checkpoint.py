@@ -0,0 +1,176 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from readable_bitmap import Readable_Bitmap
+
+
+class Checkpoint(object):
+    """
+    Checkpoint is a binary image of the committed state of every site, read through a memory map so that restoring
+    a database only reads the parts of the file that are used.
+
+    File layout, little-endian:
+        header: magic, format version, number of sites, number of variables, tick of the checkpoint
+        site states: status (0 normal / 1 failed), last fail timestamp, last recover timestamp of every site
+        committed values: newest committed value of every item, indexed by item ID
+        site values: for every site, the values of the replicated items then the values of its unreplicated items, in increasing item order
+        readable bitmaps: for every site, one bit per item ID set if the item is readable
+
+    Attributes:
+        config (Config Object): size and item placement of the database
+        tick (int): Transaction_Manager clock when the checkpoint was taken
+        data (mmap): the checkpoint file mapped read-only
+        site_value_offsets (list(int)): site_id: offset of the site's values. Index 0 is unused
+        bitmaps_offset (int): offset of the first readable bitmap
+        bitmap_length (int): bytes per readable bitmap
+    """
+    MAGIC = b"RCCK"
+    VERSION = 1
+    HEADER = struct.Struct("<4sIIIq")
+    SITE = struct.Struct("<Bqq")
+    VALUE = struct.Struct("<q")
+
+    def __init__(self, path, config):
+        '''
+        Constructor
+
+        Parameters:
+            path (string): path of the checkpoint file
+            config (Config Object): size and item placement of the database, must match the checkpoint's
+        '''
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, num_sites, num_variables, self.tick = self.HEADER.unpack_from(
+            self.data, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f'{path} is not a checkpoint file')
+        if num_sites != config.num_sites or num_variables != config.num_variables:
+            raise ValueError(
+                f'{path} has {num_sites} sites and {num_variables} variables, expected {config.num_sites} and {config.num_variables}'
+            )
+
+        self.config = config
+        self.sites_offset = self.HEADER.size
+        self.committed_offset = self.sites_offset + num_sites * self.SITE.size
+
+        offset = self.committed_offset + (num_variables + 1) * 8
+        self.site_value_offsets = [0]
+        for site_id in config.site_ids:
+            self.site_value_offsets.append(offset)
+            offset += config.site_size(site_id) * 8
+
+        self.bitmaps_offset = offset
+        self.bitmap_length = (num_variables + 8) // 8
+
+    def site_state(self, site_id):
+        """Status and timestamps of a site
+
+        Parameters:
+            site_id (int): ID of site
+
+        Return:
+            (status, last fail timestamp, last recover timestamp)
+        """
+
+        status, last_fail, last_recover = self.SITE.unpack_from(
+            self.data, self.sites_offset + (site_id - 1) * self.SITE.size)
+        return "failed" if status == 1 else "normal", last_fail, last_recover
+
+    def committed_value(self, item_id):
+        # newest value of the item committed before the checkpoint
+        return self.VALUE.unpack_from(self.data,
+                                      self.committed_offset + item_id * 8)[0]
+
+    def value(self, site_id, item_id):
+        """Value of an item at a site
+
+        Parameters:
+            site_id (int): ID of site
+            item_id (int): ID of item
+
+        Return:
+            value (int) of the item at the site
+
+        Raises:
+            KeyError if the site doesn't store the item
+        """
+
+        index = self.config.site_index(site_id, item_id)
+        return self.VALUE.unpack_from(
+            self.data, self.site_value_offsets[site_id] + index * 8)[0]
+
+    def site_values(self, site_id):
+        # values of every item at a site, in the compact layout of the site
+        offset = self.site_value_offsets[site_id]
+        values = array('q')
+        values.frombytes(self.data[offset:offset +
+                                   self.config.site_size(site_id) * 8])
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def readable(self, site_id):
+        # readable items of a site
+        offset = self.bitmaps_offset + (site_id - 1) * self.bitmap_length
+        return Readable_Bitmap(self.config.num_variables,
+                               self.data[offset:offset + self.bitmap_length])
+
+    @staticmethod
+    def write(path, config, sites, versions, tick):
+        """Writes a checkpoint of the committed state of the sites. The file is replaced atomically
+
+        Parameters:
+            path (string): path of the checkpoint file
+            config (Config Object): size and item placement of the database
+            sites (list(Site Object)): every site, in site ID order
+            versions (Version_Store Object): committed versions of the data items
+            tick (int): Transaction_Manager clock
+        """
+
+        def packed(values):
+            values = array('q', values)
+            if sys.byteorder == "big":
+                values.byteswap()
+            return values.tobytes()
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(Checkpoint.HEADER.pack(Checkpoint.MAGIC, Checkpoint.VERSION,
+                                           config.num_sites,
+                                           config.num_variables, tick))
+
+            for site in sites:
+                f.write(
+                    Checkpoint.SITE.pack(1 if site.status == "failed" else 0,
+                                         site.last_fail_timestamp,
+                                         site.last_recover_timestamp))
+
+            f.write(
+                packed([0] + [versions.read(i, tick) for i in config.items()]))
+
+            for site in sites:
+                f.write(packed(site.value(i) for i in config.replicated_items))
+                f.write(
+                    packed(site.value(i)
+                           for i in config.local_items[site.site_id]))
+
+            for site in sites:
+                readable = site.readable_variables
+                if not isinstance(readable, Readable_Bitmap):
+                    readable = Readable_Bitmap(config.num_variables)
+                    readable.update(site.readable_variables)
+                f.write(readable.tobytes())
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
@@ -0,0 +1,191 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from array import array
+from bisect import bisect_left
+from heapq import merge
+
+
+class Config(object):
+    """
+    Config holds the size of the distributed database and precomputes where each data item is placed.
+    Even items are replicated at every site, odd items are stored only at site (item_id % num_sites) + 1.
+
+    Attributes:
+        num_sites (int): Number of sites
+        num_variables (int): Number of data items
+        site_ids (tuple(int)): IDs of all the sites
+        replicated_items (range): Item IDs of the items that are replicated at every site
+        item_sites (list(tuple(int))): item_id: site IDs that contain the item. Index 0 is unused. All replicated items share one tuple
+        local_items (list(array(int))): site_id: sorted item IDs of the unreplicated items stored at the site. Index 0 is unused
+        escalation_threshold (int): Number of item locks a transaction can hold at one site before they are replaced by a site lock. None disables escalation
+        wal_path (string): Path of the write-ahead log. None keeps the database in memory only
+        fsync_policy (string): When the write-ahead log is fsynced - "always"/"group"/"none"
+        group_commit_window (float): Seconds a commit can wait to share a group fsync
+        checkpoint_path (string): Path of the checkpoint file, the database is restored from it if it exists
+        compact (bool): Whether sites keep their values in a typed array and their readable items in a bitmap instead of Variable objects and sets
+        distributed (bool): Whether every site runs in its own process, with commits by two-phase commit
+        site_dir (string): Directory of the logs of the site processes. None uses a temporary directory
+        replica_policy (string): How a read chooses among the sites its item can be read from - "first"/"round_robin"/"least_locked"/"affinity"
+        read_quorum (int): Number of copies of a replicated item a read locks, the newest of them is read. None uses available copies
+        write_quorum (int): Number of copies of a replicated item a write locks and writes. None uses available copies
+        deadlock_policy (string): How deadlocks are handled - "detect" searches the wait-for graph for cycles, "wait_die"/"wound_wait"/"no_wait" prevent them when a lock request conflicts
+        concurrency_control (string): How read-write transactions are isolated - "locking" takes locks before every read and write, "optimistic" takes none and validates the reads at commit
+        catch_up_batch (int): Number of replicated items recovered sites copy from their peers per tick. None leaves them unreadable until a committed write
+        eager_abort (string): How a read-write transaction that accessed a site that then fails learns it will abort - None finds out at its end, "end" releases its locks at the failure, rejects its operations and reports the abort at its end, "immediate" aborts it at the failure
+    """
+    def __init__(self,
+                 num_sites=10,
+                 num_variables=20,
+                 escalation_threshold=None,
+                 wal_path=None,
+                 fsync_policy="group",
+                 group_commit_window=0.005,
+                 checkpoint_path=None,
+                 compact=False,
+                 distributed=False,
+                 site_dir=None,
+                 replica_policy="first",
+                 read_quorum=None,
+                 write_quorum=None,
+                 deadlock_policy="detect",
+                 concurrency_control="locking",
+                 catch_up_batch=None,
+                 eager_abort=None):
+        '''
+        Constructor
+
+        Parameters:
+            num_sites (int): Number of sites
+            num_variables (int): Number of data items
+            escalation_threshold (int): Number of item locks a transaction can hold at one site before they are replaced by a site lock. None disables escalation
+            wal_path (string): Path of the write-ahead log. None keeps the database in memory only
+            fsync_policy (string): When the write-ahead log is fsynced - "always"/"group"/"none"
+            group_commit_window (float): Seconds a commit can wait to share a group fsync
+            checkpoint_path (string): Path of the checkpoint file, the database is restored from it if it exists
+            compact (bool): Whether sites keep their values in a typed array and their readable items in a bitmap instead of Variable objects and sets
+            distributed (bool): Whether every site runs in its own process, with commits by two-phase commit
+            site_dir (string): Directory of the logs of the site processes. None uses a temporary directory
+            replica_policy (string): How a read chooses among the sites its item can be read from - "first"/"round_robin"/"least_locked"/"affinity"
+            read_quorum (int): Number of copies of a replicated item a read locks. Set with write_quorum, None uses available copies
+            write_quorum (int): Number of copies of a replicated item a write locks. A read quorum and a write quorum, and two write quorums, must overlap
+            deadlock_policy (string): How deadlocks are handled - "detect"/"wait_die"/"wound_wait"/"no_wait"
+            concurrency_control (string): How read-write transactions are isolated - "locking"/"optimistic". Optimistic needs available copies
+            catch_up_batch (int): Number of replicated items recovered sites copy from their peers per tick. None disables catching up
+            eager_abort (string): When transactions doomed by a site failure release their locks and report the abort - None/"end"/"immediate"
+        '''
+        if num_sites < 1 or num_variables < 1:
+            raise ValueError("num_sites and num_variables must be positive")
+        if escalation_threshold != None and escalation_threshold < 1:
+            raise ValueError("escalation_threshold must be positive")
+        if fsync_policy not in ("always", "group", "none"):
+            raise ValueError("fsync_policy must be always, group or none")
+        if group_commit_window < 0:
+            raise ValueError("group_commit_window must not be negative")
+        if replica_policy not in ("first", "round_robin", "least_locked", "affinity"):
+            raise ValueError("replica_policy must be first, round_robin, least_locked or affinity")
+        if (read_quorum == None) != (write_quorum == None):
+            raise ValueError("read_quorum and write_quorum must be set together")
+        if read_quorum != None:
+            if not 1 <= read_quorum <= num_sites or not 1 <= write_quorum <= num_sites:
+                raise ValueError("quorums must be between 1 and num_sites")
+            if read_quorum + write_quorum <= num_sites or 2 * write_quorum <= num_sites:
+                raise ValueError("read_quorum + write_quorum and 2 * write_quorum must be larger than num_sites")
+        if deadlock_policy not in ("detect", "wait_die", "wound_wait", "no_wait"):
+            raise ValueError("deadlock_policy must be detect, wait_die, wound_wait or no_wait")
+        if concurrency_control not in ("locking", "optimistic"):
+            raise ValueError("concurrency_control must be locking or optimistic")
+        if concurrency_control == "optimistic" and read_quorum != None:
+            raise ValueError("optimistic concurrency control can't be used with quorums")
+        if catch_up_batch != None and catch_up_batch < 1:
+            raise ValueError("catch_up_batch must be positive")
+        if eager_abort not in (None, "end", "immediate"):
+            raise ValueError("eager_abort must be None, end or immediate")
+
+        self.num_sites = num_sites
+        self.num_variables = num_variables
+        self.escalation_threshold = escalation_threshold
+        self.wal_path = wal_path
+        self.fsync_policy = fsync_policy
+        self.group_commit_window = group_commit_window
+        self.checkpoint_path = checkpoint_path
+        self.compact = compact
+        self.distributed = distributed
+        self.site_dir = site_dir
+        self.replica_policy = replica_policy
+        self.read_quorum = read_quorum
+        self.write_quorum = write_quorum
+        self.deadlock_policy = deadlock_policy
+        self.concurrency_control = concurrency_control
+        self.catch_up_batch = catch_up_batch
+        self.eager_abort = eager_abort
+        self.site_ids = tuple(range(1, num_sites + 1))
+        self.replicated_items = range(2, num_variables + 1, 2)
+
+        # every unreplicated item lives at exactly one site, share the one-element tuples
+        home_sites = [None] + [(i, ) for i in self.site_ids]
+
+        self.item_sites = [()] * (num_variables + 1)
+        self.local_items = [array('l') for _ in range(num_sites + 1)]
+        for i in range(1, num_variables + 1):
+            if i % 2 == 0:
+                self.item_sites[i] = self.site_ids
+            else:
+                home = (i % num_sites) + 1
+                self.item_sites[i] = home_sites[home]
+                self.local_items[home].append(i)
+
+    def items(self):
+        # IDs of all the data items
+        return range(1, self.num_variables + 1)
+
+    def is_replicated(self, item_id):
+        # whether the item is stored at every site
+        return item_id % 2 == 0
+
+    def is_quorum(self, item_id):
+        # whether reads and writes of the item use quorums. Unreplicated items have one copy, which is every quorum
+        return self.read_quorum != None and item_id % 2 == 0
+
+    def site_items(self, site_id):
+        """Item IDs stored at a site, in increasing order
+
+        Parameters:
+            site_id (int): ID of site
+
+        Return:
+            iterator(int) of item IDs
+        """
+        return merge(self.replicated_items, self.local_items[site_id])
+
+    def site_size(self, site_id):
+        # number of items stored at a site
+        return len(self.replicated_items) + len(self.local_items[site_id])
+
+    def site_index(self, site_id, item_id):
+        """Position of an item in the compact layout of a site: the replicated items, then the site's unreplicated items, in increasing order
+
+        Parameters:
+            site_id (int): ID of site
+            item_id (int): ID of item
+
+        Return:
+            index (int) of the item
+
+        Raises:
+            KeyError if the site doesn't store the item
+        """
+
+        if item_id % 2 == 0:
+            if item_id < 2 or item_id > self.num_variables:
+                raise KeyError(item_id)
+            return item_id // 2 - 1
+
+        local_items = self.local_items[site_id]
+        index = bisect_left(local_items, item_id)
+        if index == len(local_items) or local_items[index] != item_id:
+            raise KeyError(item_id)
+        return len(self.replicated_items) + index
@@ -0,0 +1,69 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+
+class Event_Sink(object):
+    """
+    Event_Sink receives everything the Transaction_Manager and the Site_Manager report: ticks, reads, writes, lock waits,
+    commits, aborts, deadlocks and dumps. An event is a type and positional fields named by FIELDS, and it's only
+    formatted by the sink that consumes it. This sink is silent and drops every event.
+
+    Attributes:
+        enabled (bool): whether the sink consumes events. Callers skip collecting costly fields, like a site dump, when it doesn't
+    """
+    FIELDS = {
+        "tick": ("tick", "instruction"),
+        "invalid": (),
+        "read": ("item_id", "value"),
+        "range_read": ("values", ),
+        "multi_read": ("values", ),
+        "write": ("txn_id", "item_id", "value"),
+        "multi_write": ("txn_id", "values"),
+        "checkpoint": ("path", "tick"),
+        "already_ended": ("txn_id", "status"),
+        "commit": ("txn_id", ),
+        "commit_read_only": ("txn_id", ),
+        "abort": ("txn_id", ),
+        "resume": ("txn_id", ),
+        "cycle": ("txns", ),
+        "kill": ("txn_id", ),
+        "prevent": ("txn_id", "policy", "txns"),
+        "state": ("txns", ),
+        "wait_shared": ("txn_id", "item_id", "blocking", "waits_for"),
+        "wait_exclusive": ("txn_id", "item_id", "blocking", "waits_for"),
+        "wait_exclusive_range": ("txn_id", "low", "high", "blocking", "waits_for"),
+        "wait_range": ("txn_id", "low", "high", "item_id", "blocking", "waits_for"),
+        "wait_site_lock": ("txn_id", "access", "site_id", "blocking", "waits_for"),
+        "unavailable_read": ("txn_id", "item_id"),
+        "unavailable_write": ("txn_id", "item_id"),
+        "unserved_read": ("txn_id", "item_id"),
+        "unserved_write": ("txn_id", "item_id"),
+        "escalate": ("txn_id", "site_id", "access"),
+        "site_failed": ("site_id", "txn_id"),
+        "doomed": ("txn_id", "site_id"),
+        "stale_read": ("txn_id", "item_id"),
+        "snapshot_wait": ("txn_id", "item_id"),
+        "dump_site": ("site_id", "values"),
+    }
+
+    enabled = False
+
+    def emit(self, event, *fields):
+        """Receives an event
+
+        Parameters:
+            event (string): type of event, a key of FIELDS
+            fields: values of the fields of the event, in the order of FIELDS[event]
+        """
+
+        pass
+
+    def flush(self):
+        # writes out the events received so far
+        pass
+
+    def close(self):
+        self.flush()
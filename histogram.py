@@ -0,0 +1,95 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from math import frexp, ldexp
+
+
+class Histogram(object):
+    """
+    Histogram counts recorded values in buckets whose upper bounds are powers of two, so recording a value costs the
+    same whatever its size and latencies in seconds share the same buckets as queue lengths.
+
+    Attributes:
+        count (int): number of values recorded
+        total (float): sum of the values recorded
+        min (float): smallest value recorded, None before the first one
+        max (float): largest value recorded, None before the first one
+        buckets (dict (int: int)): exponent e: number of values v with 2**(e-1) < v <= 2**e. Values <= 0 are under None
+    """
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.buckets = {}
+
+    def record(self, value):
+        """Records one value
+
+        Parameters:
+            value (int or float): value to record
+        """
+
+        self.count += 1
+        self.total += value
+        if self.min == None or value < self.min:
+            self.min = value
+        if self.max == None or value > self.max:
+            self.max = value
+
+        if value <= 0:
+            exponent = None
+        else:
+            mantissa, exponent = frexp(value)
+            # frexp puts powers of two at the bottom of the next bucket
+            if mantissa == 0.5:
+                exponent -= 1
+        self.buckets[exponent] = self.buckets.get(exponent, 0) + 1
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile
+
+        Parameters:
+            p (float): percentile, from 0 to 100
+
+        Return:
+            upper bound (float) of the bucket, 0 if nothing is recorded
+        """
+
+        if self.count == 0:
+            return 0
+
+        rank = max(1, p * self.count / 100)
+        seen = self.buckets.get(None, 0)
+        if seen >= rank:
+            return 0
+        for exponent in sorted(e for e in self.buckets if e != None):
+            seen += self.buckets[exponent]
+            if seen >= rank:
+                return min(ldexp(1, exponent), self.max)
+        return self.max
+
+    def to_dict(self):
+        # summary and buckets of the histogram, in a form json can write
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count > 0 else 0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "buckets": {
+                "0" if e == None else repr(ldexp(1, e)): n
+                for e, n in sorted(self.buckets.items(), key=lambda b: float("-inf") if b[0] == None else b[0])
+            },
+        }
@@ -0,0 +1,142 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+
+class Instruction(object):
+    """
+    Instruction is one parsed line of input. A line is parsed once, and a blocked transaction keeps its
+    Instruction so it can be run again without parsing.
+
+    Attributes:
+        op (string): operation - "begin"/"beginRO"/"R"/"RS"/"MR"/"W"/"MW"/"fail"/"recover"/"end"/"dump"/"checkpoint", None if the line is invalid
+        txn_id (int): ID of the transaction of the operation, None for operations of no transaction
+        args (tuple): arguments of the operation - (item_id) for R, (low, high) for RS, (item_id, new_value) for W,
+                      item IDs in increasing order for MR, (item_id, new_value) pairs in increasing order of item ID for MW,
+                      (site_id) for fail and recover, (path) for checkpoint, () otherwise
+        text (string): the line as it was read
+    """
+    __slots__ = ("op", "txn_id", "args", "text")
+
+    def __init__(self, op, txn_id, args, text):
+        '''
+        Constructor
+
+        Parameters:
+            op (string): operation, None if the line is invalid
+            txn_id (int): ID of the transaction of the operation
+            args (tuple): arguments of the operation
+            text (string): the line as it was read
+        '''
+        self.op = op
+        self.txn_id = txn_id
+        self.args = args
+        self.text = text
+
+    @staticmethod
+    def parse(line):
+        """Parses a line of input
+
+        Parameters:
+            line (string): line of input, like "W(T1,x2,5)" or "MW(T1,x2=5,x8=7)"
+
+        Return:
+            Instruction Object, with op None if the line isn't a valid instruction
+        """
+
+        text = line.strip()
+        try:
+            compact = text.replace(" ", "")
+            op, arg = compact[:-1].split("(")
+            if compact[-1] != ")":
+                raise ValueError(text)
+
+            if op == "begin" or op == "beginRO" or op == "end":
+                return Instruction(op, Instruction.number(arg, "T"), (), text)
+
+            if op == "R":
+                txn, item = arg.split(",")
+                return Instruction(op, Instruction.number(txn, "T"),
+                                   (Instruction.number(item, "x"), ), text)
+
+            if op == "RS":
+                txn, low, high = arg.split(",")
+                return Instruction(op, Instruction.number(txn, "T"),
+                                   (Instruction.number(low, "x"),
+                                    Instruction.number(high, "x")), text)
+
+            if op == "W":
+                txn, item, new_value = arg.split(",")
+                return Instruction(op, Instruction.number(txn, "T"),
+                                   (Instruction.number(item, "x"),
+                                    int(new_value)), text)
+
+            if op == "MR":
+                # items are locked in increasing order, whatever order they were given in
+                txn, *items = arg.split(",")
+                if len(items) == 0:
+                    raise ValueError(text)
+                return Instruction(op, Instruction.number(txn, "T"),
+                                   tuple(sorted(set(Instruction.number(item, "x") for item in items))), text)
+
+            if op == "MW":
+                # a later value of the same item replaces an earlier one, like two writes
+                txn, *writes = arg.split(",")
+                if len(writes) == 0:
+                    raise ValueError(text)
+                new_values = {}
+                for write in writes:
+                    item, new_value = write.split("=")
+                    new_values[Instruction.number(item, "x")] = int(new_value)
+                return Instruction(op, Instruction.number(txn, "T"),
+                                   tuple(sorted(new_values.items())), text)
+
+            if op == "fail" or op == "recover":
+                return Instruction(op, None, (int(arg), ), text)
+
+            if op == "dump":
+                return Instruction(op, None, (), text)
+
+            if op == "checkpoint":
+                return Instruction(op, None, (arg, ), text)
+
+        except (ValueError, IndexError):
+            pass
+
+        return Instruction(None, None, (), text)
+
+    @staticmethod
+    def number(token, prefix):
+        # the number in a token like "T1" or "x2"
+        if token[:1] != prefix:
+            raise ValueError(token)
+        return int(token[1:])
+
+    @staticmethod
+    def stream(f, chunk_size=1 << 20):
+        """Parses the instructions of a text stream, reading it in large chunks. Blank lines are skipped
+
+        Parameters:
+            f (file object): text stream, like an open input file or sys.stdin
+            chunk_size (int): number of characters read at a time
+
+        Return:
+            iterator(Instruction Object) in input order
+        """
+
+        rest = ""
+        while True:
+            chunk = f.read(chunk_size)
+            if chunk == "":
+                break
+
+            lines = (rest + chunk).split("\n")
+            rest = lines.pop()
+            for line in lines:
+                if not line.isspace() and line != "":
+                    yield Instruction.parse(line)
+
+        if not rest.isspace() and rest != "":
+            yield Instruction.parse(rest)
@@ -0,0 +1,24 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+import json
+from text_sink import Text_Sink
+
+
+class JSONL_Sink(Text_Sink):
+    """
+    JSONL_Sink writes every event as one JSON object per line, with its type under "event" and its fields by name.
+    Sets are written as sorted lists. Events are buffered and formatted the same way as by Text_Sink.
+
+    Attributes:
+        stream (file object): where the lines are written, None for whatever sys.stdout is at the time of the write
+        buffer_size (int): number of events kept before writing. 0 writes every event as it arrives
+        pending (list(tuple)): (event, fields) of the events not written yet
+    """
+    def format(self, event, fields):
+        record = {"event": event}
+        record.update(zip(self.FIELDS[event], fields))
+        return json.dumps(record, default=sorted)
@@ -0,0 +1,35 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from variable import Variable
+
+
+class Lazy_Table(dict):
+    """
+    Lazy_Table is the data table of a site restored from a checkpoint. It's a dict of item ID: Variable Object
+    where a Variable is only built, from the value in the checkpoint, the first time the item is looked up.
+
+    Attributes:
+        checkpoint (Checkpoint Object): checkpoint the site was restored from
+        site_id (int): ID of site
+    """
+    def __init__(self, checkpoint, site_id):
+        '''
+        Constructor
+
+        Parameters:
+            checkpoint (Checkpoint Object): checkpoint the site was restored from
+            site_id (int): ID of site
+        '''
+        super().__init__()
+        self.checkpoint = checkpoint
+        self.site_id = site_id
+
+    def __missing__(self, item_id):
+        variable = Variable(item_id)
+        variable.value = self.checkpoint.value(self.site_id, item_id)
+        self[item_id] = variable
+        return variable
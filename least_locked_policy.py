@@ -0,0 +1,21 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from replica_policy import Replica_Policy
+
+
+class Least_Locked_Policy(Replica_Policy):
+    """
+    Least_Locked_Policy sends a read to the replica with the fewest locked items, ties going to the smallest site ID.
+    A read looks at every replica of its item, which is every site for a replicated item.
+
+    Attributes:
+        lock_manager (Lock_Manager Object): the locks of the database
+    """
+    def choose(self, txn_id, item_id, site_ids):
+        if len(site_ids) == 1:
+            return site_ids[0]
+        return min(site_ids, key=self.lock_manager.site_load)
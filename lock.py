@@ -4,6 +4,8 @@ Created on Nov 28, 2019
 @author: Ian Lam, Yu Ting Chiu
 '''
 
+from lock_queue import Lock_Queue
+
 
 class Lock(object):
     '''
@@ -11,11 +13,14 @@ class Lock(object):
     
     Attributes: 
         lock_type (string): Type of Lock - "SL"/"XL"
-        txn_holding (list(int) ): List of transaction IDs that are sharing/holding this lock
+        txn_holding (set(int) ): Set of transaction IDs that are sharing/holding this lock
         site_id (int): ID of site of where the lock is located at.
-        item_locked (Variable Object): Item locked by this lock
+        item_id (int): ID of item locked by this lock
+        waiting (Lock_Queue Object): transactions waiting for this lock, in arrival order
     '''
-    def __init__(self, lock_type, txn_id, site_id, item):
+    __slots__ = ("lock_type", "txn_holding", "site_id", "item_id", "waiting")
+
+    def __init__(self, lock_type, txn_id, site_id, item_id):
         '''
         Constructor
         
@@ -23,9 +28,10 @@ class Lock(object):
             lock_type (string): Type of Lock - "SL"/"XL"
             txn_id (int): ID of transaction that holds lock
             site_id (int): ID of site of where the lock is located at.
-            item (Variable Object): Item locked by this lock
+            item_id (int): ID of item locked by this lock
         '''
         self.lock_type = lock_type
-        self.txn_holding = [txn_id]
+        self.txn_holding = {txn_id}
         self.site_id = site_id
-        self.item_locked = item
+        self.item_id = item_id
+        self.waiting = Lock_Queue()
@@ -0,0 +1,455 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from lock import Lock
+from range_lock import Range_Lock
+from site_lock import Site_Lock
+
+
+class Lock_Manager(object):
+    """
+    Lock_Manager owns every lock in the database. Locks are looked up by (site, item), and each transaction
+    has an index of the locks it holds so releasing them or checking for an existing lock never scans the lock table.
+    Locks are hierarchical: every item lock or range lock at a site comes with an intention lock on the site,
+    "IS" for shared locks and "IX" for exclusive locks, so a conflict between a range and an item is only searched for
+    when another transaction holds the opposite intention on the site.
+    When a transaction holds more item locks at a site than the escalation threshold, they are replaced by one site lock:
+    a shared site lock conflicts with exclusive locks of other transactions at the site, an exclusive site lock conflicts with every other lock at the site.
+
+    Attributes:
+        locks (dict ((int, int): Lock Object) ): (site_id, item_id): Lock on the item at the site. Only locked items are present
+        site_locks (dict (int: set(int)) ): site_id: IDs of the items locked at the site
+        txn_locks (dict (int: dict(int: list(Lock Object))) ): transaction ID: item_id: locks the transaction holds on the item
+        txn_exclusive (dict (int: set(int)) ): transaction ID: IDs of the items the transaction holds exclusive locks on at every site it could lock
+        site_ranges (dict (int: list(Range_Lock Object)) ): site_id: range locks at the site
+        txn_ranges (dict (int: list(Range_Lock Object)) ): transaction ID: range locks the transaction holds
+        site_intents (dict (int: dict(string: set(int))) ): site_id: "IS"/"IX": IDs of the transactions holding that intention lock on the site
+        txn_intents (dict (int: set((int, string))) ): transaction ID: (site_id, "IS"/"IX") intention locks the transaction holds
+        escalation_threshold (int): Number of item locks a transaction can hold at one site before escalation. None disables escalation
+        site_escalated (dict (int: dict(int: Site_Lock Object)) ): site_id: transaction ID: site lock the transaction holds on the site
+        txn_site_locks (dict (int: dict(int: Site_Lock Object)) ): transaction ID: site_id: site lock the transaction holds on the site
+        txn_site_counts (dict (int: dict(int: int)) ): transaction ID: site_id: number of item locks the transaction holds at the site
+        escalation_candidates (set((int, int)) ): (transaction ID, site_id) pairs that passed the escalation threshold
+    """
+    def __init__(self, escalation_threshold=None):
+        '''
+        Constructor
+
+        Parameters:
+            escalation_threshold (int): Number of item locks a transaction can hold at one site before escalation. None disables escalation
+        '''
+        self.locks = {}
+        self.site_locks = {}
+        self.txn_locks = {}
+        self.txn_exclusive = {}
+        self.site_ranges = {}
+        self.txn_ranges = {}
+        self.site_intents = {}
+        self.txn_intents = {}
+        self.escalation_threshold = escalation_threshold
+        self.site_escalated = {}
+        self.txn_site_locks = {}
+        self.txn_site_counts = {}
+        self.escalation_candidates = set()
+
+    def get(self, site_id, item_id):
+        """Finds the lock on an item at a site
+
+        Parameters:
+            site_id (int): ID of site
+            item_id (int): ID of item
+
+        Return:
+            Lock Object, or None if the item isn't locked
+        """
+
+        return self.locks.get((site_id, item_id))
+
+    def site_load(self, site_id):
+        # number of items locked at a site, a site lock counts as one
+        return len(self.site_locks.get(site_id, ())) + len(self.site_escalated.get(site_id, ()))
+
+    def is_current(self, lock):
+        # whether the lock is still in the lock table, it's wiped out when its site fails
+        if lock.lock_type == "RSL":
+            return lock in self.site_ranges.get(lock.site_id, ())
+        if lock.lock_type == "SSL" or lock.lock_type == "SXL":
+            txn_id = next(iter(lock.txn_holding))
+            return self.site_escalated.get(lock.site_id, {}).get(txn_id) is lock
+        return self.locks.get((lock.site_id, lock.item_id)) is lock
+
+    def create(self, lock_type, txn_id, site_id, item_id):
+        """Locks an item at a site for a transaction
+
+        Parameters:
+            lock_type (string): Type of Lock - "SL"/"XL"
+            txn_id (int): ID of transaction
+            site_id (int): ID of site
+            item_id (int): ID of item to lock
+
+        Return:
+            the new Lock Object
+        """
+
+        lock = Lock(lock_type, txn_id, site_id, item_id)
+        self.locks[(site_id, item_id)] = lock
+        self.site_locks.setdefault(site_id, set()).add(item_id)
+        self.index(txn_id, lock)
+        return lock
+
+    def share(self, lock, txn_id):
+        """Adds a transaction to the holders of a shared lock
+
+        Parameters:
+            lock (Lock Object): Lock of type 'SL'
+            txn_id (int): ID of transaction
+        """
+
+        lock.txn_holding.add(txn_id)
+        self.index(txn_id, lock)
+
+    def upgrade(self, lock, txn_id):
+        """Promotes the shared lock of its only holder to an exclusive lock
+
+        Parameters:
+            lock (Lock Object): Lock of type 'SL' held only by txn_id
+            txn_id (int): ID of transaction
+        """
+
+        lock.lock_type = "XL"
+        self.intend(txn_id, lock.site_id, "IX")
+
+    def index(self, txn_id, lock):
+        # record that the transaction holds the lock, and the intention lock it implies on the site
+        held = self.txn_locks.setdefault(txn_id, {}).setdefault(
+            lock.item_id, [])
+        if lock not in held:
+            held.append(lock)
+            counts = self.txn_site_counts.setdefault(txn_id, {})
+            counts[lock.site_id] = counts.get(lock.site_id, 0) + 1
+            if self.escalation_threshold != None and counts[
+                    lock.site_id] > self.escalation_threshold:
+                self.escalation_candidates.add((txn_id, lock.site_id))
+        self.intend(txn_id, lock.site_id,
+                    "IX" if lock.lock_type == "XL" else "IS")
+
+    def intend(self, txn_id, site_id, mode):
+        """Records an intention lock on a site
+
+        Parameters:
+            txn_id (int): ID of transaction
+            site_id (int): ID of site
+            mode (string): "IS"/"IX"
+        """
+
+        self.site_intents.setdefault(site_id, {}).setdefault(mode, set()).add(txn_id)
+        self.txn_intents.setdefault(txn_id, set()).add((site_id, mode))
+
+    def others_intend(self, txn_id, site_id, mode):
+        # whether a transaction other than txn_id holds the intention lock on the site
+        holders = self.site_intents.get(site_id, {}).get(mode, ())
+        return len(holders) > 1 or (len(holders) == 1 and txn_id not in holders)
+
+    def site_lock_of(self, txn_id, site_id):
+        # the site lock the transaction holds on the site, or None
+        return self.txn_site_locks.get(txn_id, {}).get(site_id)
+
+    def site_conflict(self, txn_id, site_id, lock_type):
+        """Finds a site lock of another transaction that conflicts with a lock request at a site
+
+        Parameters:
+            txn_id (int): ID of transaction asking for the lock
+            site_id (int): ID of site
+            lock_type (string): Type of Lock requested - "SL"/"XL"/"RSL"
+
+        Return:
+            the conflicting Site_Lock Object, or None
+        """
+
+        for other, lock in self.site_escalated.get(site_id, {}).items():
+            if other != txn_id and (lock.lock_type == "SXL" or lock_type == "XL"):
+                return lock
+        return None
+
+    def take_escalation_candidates(self):
+        # (transaction ID, site_id) pairs to try escalating, in a fixed order
+        candidates = sorted(self.escalation_candidates)
+        self.escalation_candidates = set()
+        return candidates
+
+    def escalate(self, txn_id, site_id):
+        """Replaces the item locks of a transaction at a site with one site lock. The site lock is exclusive if the transaction
+        holds an exclusive lock at the site, shared otherwise. Escalation is skipped if another transaction holds a lock it would conflict with
+
+        Parameters:
+            txn_id (int): ID of transaction
+            site_id (int): ID of site
+
+        Return:
+            if escalated: (the Site_Lock Object, list(Lock Object) of the item locks the transaction no longer holds)
+            else: None
+        """
+
+        if self.txn_site_counts.get(txn_id, {}).get(site_id, 0) <= self.escalation_threshold:
+            return None
+
+        intents = self.site_intents.get(site_id, {})
+        lock_type = "SXL" if txn_id in intents.get("IX", ()) else "SSL"
+
+        # another transaction writing at the site blocks both, another transaction reading at the site blocks an exclusive site lock
+        if self.others_intend(txn_id, site_id, "IX"):
+            return None
+        if lock_type == "SXL" and self.others_intend(txn_id, site_id, "IS"):
+            return None
+        for other, lock in self.site_escalated.get(site_id, {}).items():
+            if other != txn_id and (lock.lock_type == "SXL" or lock_type == "SXL"):
+                return None
+
+        site_lock = self.site_lock_of(txn_id, site_id)
+        if site_lock == None:
+            site_lock = Site_Lock(lock_type, txn_id, site_id)
+            self.site_escalated.setdefault(site_id, {})[txn_id] = site_lock
+            self.txn_site_locks.setdefault(txn_id, {})[site_id] = site_lock
+        elif lock_type == "SXL":
+            site_lock.lock_type = "SXL"
+
+        released = []
+        for held in list(self.txn_locks.get(txn_id, {}).values()):
+            for lock in list(held):
+                if lock.site_id == site_id:
+                    self._unindex(txn_id, lock)
+                    lock.txn_holding.discard(txn_id)
+                    released.append(lock)
+        return site_lock, released
+
+    def create_range(self, txn_id, site_id, low, high):
+        """Locks every item in [low, high] at a site for a range read
+
+        Parameters:
+            txn_id (int): ID of transaction
+            site_id (int): ID of site
+            low (int): ID of the first item
+            high (int): ID of the last item
+
+        Return:
+            the new Range_Lock Object
+        """
+
+        lock = Range_Lock(txn_id, site_id, low, high)
+        self.site_ranges.setdefault(site_id, []).append(lock)
+        self.txn_ranges.setdefault(txn_id, []).append(lock)
+        self.intend(txn_id, site_id, "IS")
+        return lock
+
+    def held_range(self, txn_id, site_id, low, high):
+        # a range lock of the transaction at the site covering [low, high], or None
+        for lock in self.txn_ranges.get(txn_id, ()):
+            if lock.site_id == site_id and lock.low <= low and high <= lock.high:
+                return lock
+        return None
+
+    def range_conflict(self, txn_id, site_id, low, high):
+        """Finds an exclusive lock of another transaction on an item in [low, high] at a site.
+        Nothing is searched unless another transaction holds an "IX" on the site.
+
+        Parameters:
+            txn_id (int): ID of transaction asking for the range
+            site_id (int): ID of site
+            low (int): ID of the first item
+            high (int): ID of the last item
+
+        Return:
+            the conflicting Lock Object with the smallest item ID, or None
+        """
+
+        if not self.others_intend(txn_id, site_id, "IX"):
+            return None
+
+        locked = self.site_locks.get(site_id, set())
+        if high - low + 1 < len(locked):
+            candidates = range(low, high + 1)
+        else:
+            candidates = sorted(i for i in locked if low <= i <= high)
+
+        for item_id in candidates:
+            lock = self.locks.get((site_id, item_id))
+            if lock != None and lock.lock_type == "XL" and txn_id not in lock.txn_holding:
+                return lock
+        return None
+
+    def range_blocking(self, txn_id, site_id, item_id):
+        """Finds a range lock of another transaction covering an item at a site.
+        Nothing is searched unless another transaction holds an "IS" on the site.
+
+        Parameters:
+            txn_id (int): ID of transaction that wants to write the item
+            site_id (int): ID of site
+            item_id (int): ID of item
+
+        Return:
+            Range_Lock Object, or None
+        """
+
+        if not self.others_intend(txn_id, site_id, "IS"):
+            return None
+
+        for lock in self.site_ranges.get(site_id, ()):
+            if lock.covers(item_id) and txn_id not in lock.txn_holding:
+                return lock
+        return None
+
+    def held(self, txn_id, item_id):
+        """Reentrant fast path for reads: the locks the transaction already holds on the item at any site
+
+        Parameters:
+            txn_id (int): ID of transaction
+            item_id (int): ID of item
+
+        Return:
+            list(Lock Object), empty if it holds none
+        """
+
+        return self.txn_locks.get(txn_id, {}).get(item_id, [])
+
+    def held_exclusive(self, txn_id, item_id):
+        """Reentrant fast path for writes: the exclusive locks the transaction already holds on the item
+
+        Parameters:
+            txn_id (int): ID of transaction
+            item_id (int): ID of item
+
+        Return:
+            list(Lock Object) of type 'XL', or None
+        """
+
+        if item_id not in self.txn_exclusive.get(txn_id, ()):
+            return None
+        return self.txn_locks[txn_id][item_id]
+
+    def is_written(self, item_id, site_ids):
+        """Whether some transaction may be writing an item: it holds an exclusive lock on the item at one of the sites,
+        or an exclusive site lock on one of them
+
+        Parameters:
+            item_id (int): ID of item
+            site_ids (iterable(int)): IDs of the sites holding the item
+
+        Return:
+            boolean
+        """
+
+        locks = self.locks
+        site_escalated = self.site_escalated
+        for site_id in site_ids:
+            lock = locks.get((site_id, item_id))
+            if lock != None and lock.lock_type == "XL" and len(lock.txn_holding) > 0:
+                return True
+            if site_id in site_escalated:
+                for site_lock in site_escalated[site_id].values():
+                    if site_lock.lock_type == "SXL":
+                        return True
+        return False
+
+    def mark_exclusive(self, txn_id, item_id):
+        # the transaction has locked every copy of the item it could
+        self.txn_exclusive.setdefault(txn_id, set()).add(item_id)
+
+    def grant_waiters(self, lock):
+        """Hands a lock over to the next waiters in its queue, and removes the lock if nobody holds it
+
+        Parameters:
+            lock (Lock Object): Lock that some transaction stopped holding or waiting for
+
+        Return:
+            list(int) of the IDs of the transactions that were granted the lock
+        """
+
+        granted = lock.waiting.grant(lock)
+        for txn_id in granted:
+            self.index(txn_id, lock)
+
+        if len(lock.txn_holding) == 0:
+            self._drop(lock)
+        return granted
+
+    def release(self, txn_id):
+        """Takes a transaction off every lock it holds
+
+        Parameters:
+            txn_id (int): ID of transaction
+
+        Return:
+            list(Lock Object and Range_Lock Object) of the locks it held that are still in the lock table
+        """
+
+        self.txn_exclusive.pop(txn_id, None)
+        released = []
+        for held in self.txn_locks.pop(txn_id, {}).values():
+            for lock in held:
+                if self.is_current(lock):
+                    lock.txn_holding.discard(txn_id)
+                    released.append(lock)
+
+        for lock in self.txn_ranges.pop(txn_id, ()):
+            if self.is_current(lock):
+                self.site_ranges[lock.site_id].remove(lock)
+                lock.txn_holding.discard(txn_id)
+                released.append(lock)
+
+        for site_id, lock in self.txn_site_locks.pop(txn_id, {}).items():
+            del self.site_escalated[site_id][txn_id]
+            released.append(lock)
+        self.txn_site_counts.pop(txn_id, None)
+
+        for site_id, mode in self.txn_intents.pop(txn_id, ()):
+            self.site_intents.get(site_id, {}).get(mode, set()).discard(txn_id)
+
+        return released
+
+    def wipe_site(self, site_id):
+        """Wipes out all the locks at a failed site
+
+        Parameters:
+            site_id (int): ID of site
+
+        Return:
+            list(Lock Object and Range_Lock Object) of the locks that were wiped out
+        """
+
+        wiped = []
+        for item_id in self.site_locks.pop(site_id, ()):
+            lock = self.locks.pop((site_id, item_id))
+            wiped.append(lock)
+            for txn_id in lock.txn_holding:
+                self._unindex(txn_id, lock)
+
+        for lock in self.site_ranges.pop(site_id, ()):
+            wiped.append(lock)
+            for txn_id in lock.txn_holding:
+                self.txn_ranges[txn_id].remove(lock)
+
+        for txn_id, lock in self.site_escalated.pop(site_id, {}).items():
+            wiped.append(lock)
+            del self.txn_site_locks[txn_id][site_id]
+
+        self.site_intents.pop(site_id, None)
+        return wiped
+
+    def _drop(self, lock):
+        # remove a lock nobody holds from the lock table
+        del self.locks[(lock.site_id, lock.item_id)]
+        self.site_locks[lock.site_id].discard(lock.item_id)
+
+    def _unindex(self, txn_id, lock):
+        # the transaction lost a lock to a site failure, so its exclusive locks on the item are no longer complete
+        item_id = lock.item_id
+        held = self.txn_locks[txn_id][item_id]
+        held.remove(lock)
+        if len(held) == 0:
+            del self.txn_locks[txn_id][item_id]
+        self.txn_site_counts[txn_id][lock.site_id] -= 1
+        if txn_id in self.txn_exclusive:
+            self.txn_exclusive[txn_id].discard(item_id)
@@ -0,0 +1,102 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from collections import OrderedDict
+
+
+class Lock_Queue(object):
+    """
+    Lock_Queue is the FIFO of transactions waiting for the Lock on one data item at one site.
+    When the holders of the lock release it, the lock is handed directly to the next waiters that can hold it together.
+
+    Attributes:
+        waiters (OrderedDict (int: string) ): transaction ID: type of lock requested - "SL"/"XL", in the order they arrived
+    """
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.waiters = OrderedDict()
+
+    def __len__(self):
+        return len(self.waiters)
+
+    def __contains__(self, txn_id):
+        return txn_id in self.waiters
+
+    def first(self):
+        # (transaction ID, type of lock requested) at the front of the queue
+        return next(iter(self.waiters.items()))
+
+    def enqueue(self, txn_id, lock_type):
+        """Adds a transaction to the end of the queue. A transaction already waiting keeps its place, an XL request upgrades its request
+
+        Parameters:
+            txn_id (int): ID of transaction
+            lock_type (string): Type of Lock requested - "SL"/"XL"
+        """
+
+        if txn_id in self.waiters:
+            if lock_type == "XL":
+                self.waiters[txn_id] = "XL"
+        else:
+            self.waiters[txn_id] = lock_type
+
+    def remove(self, txn_id):
+        """Removes a transaction from the queue, if it's waiting
+
+        Parameters:
+            txn_id (int): ID of transaction
+        """
+
+        self.waiters.pop(txn_id, None)
+
+    def ahead_of(self, txn_id):
+        # IDs of the transactions waiting in front of txn_id
+        ahead = []
+        for waiter in self.waiters:
+            if waiter == txn_id:
+                break
+            ahead.append(waiter)
+        return ahead
+
+    def grant(self, lock):
+        """Hands the lock to the waiters at the front of the queue that are compatible with its current holders.
+        Several SL waiters are admitted together, an XL waiter is admitted alone or as an upgrade of its own SL.
+
+        Parameters:
+            lock (Lock Object): the lock this queue is waiting for
+
+        Return:
+            list(int) of the IDs of the transactions that were granted the lock
+        """
+
+        granted = []
+        while len(self.waiters) > 0:
+            txn_id, lock_type = next(iter(self.waiters.items()))
+
+            if len(lock.txn_holding) == 0:
+                # free lock, the first waiter always gets it
+                lock.lock_type = lock_type
+                lock.txn_holding.add(txn_id)
+
+            elif lock_type == "SL" and lock.lock_type == "SL":
+                # share with the current readers
+                lock.txn_holding.add(txn_id)
+
+            elif lock_type == "XL" and lock.txn_holding == {txn_id}:
+                # the only reader left is the waiter, promote its SL
+                lock.lock_type = "XL"
+
+            else:
+                break
+
+            self.waiters.popitem(last=False)
+            granted.append(txn_id)
+            if lock.lock_type == "XL":
+                break
+
+        return granted
@@ -5,26 +5,89 @@ Created on Nov 26, 2019
 
 Advanced Database Systems Final Project
 
-The program accepts an inputfile from the command line and starts the Transaction Manager
+The program accepts input files from the command line, or reads standard input, and starts the Transaction Manager
+
+    python3 main.py [--output text|quiet|jsonl] [--buffer N] [--metrics FILE] [--profile FILE] [--profile-every N] [input_file ...]
 '''
+import argparse
 import sys
 from transaction_manager import Transaction_Manager
+from instruction import Instruction
+from event_sink import Event_Sink
+from text_sink import Text_Sink
+from jsonl_sink import JSONL_Sink
+from metrics import Metrics
+from metrics_registry import Metrics_Registry
+
+# characters read from an input at a time
+CHUNK_SIZE = 1 << 20
+
+
+def make_sink(output, buffer_size):
+    """ Builds the sink for an output mode
+
+    Parameters:
+        output (string): "text"/"quiet"/"jsonl"
+        buffer_size (int): number of events buffered before writing
+
+    Return:
+        Event_Sink Object
+    """
 
-tm = Transaction_Manager()
+    if output == "quiet":
+        return Event_Sink()
+    if output == "jsonl":
+        return JSONL_Sink(sys.stdout, buffer_size)
+    return Text_Sink(sys.stdout, buffer_size)
 
-# filename = sys.argv[1]
 
-filename = "input1"
+def main(paths, sink, metrics=None):
+    """ Streams the instructions of the inputs to a Transaction_Manager, in order
 
+    Parameters:
+        paths (list(string)): input file names, "-" for standard input. Empty reads standard input
+        sink (Event_Sink Object): receives the output
+        metrics (Metrics Object): receives the measurements, None records nothing
+    """
 
-with open(filename, "r") as f:
+    tm = Transaction_Manager(sink=sink, metrics=metrics)
 
-    for line in f:
-        tm.find_cycle()
-        tm.run_ready_transactions()
-        line = line.strip()
-        tm.read_instruction(line)
+    for path in paths or ["-"]:
+        if path == "-":
+            f = sys.stdin
+        else:
+            f = open(path, "r", buffering=CHUNK_SIZE)
+
+        with f:
+            for instr in Instruction.stream(f, CHUNK_SIZE):
+                tm.find_cycle()
+                tm.run_ready_transactions()
+                tm.run_instruction(instr)
 
     tm.find_cycle()
     tm.run_ready_transactions()
 
+    tm.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replicated concurrency control and recovery")
+    parser.add_argument("paths", nargs="*", help='input files, "-" or none for standard input')
+    parser.add_argument("--output", choices=("text", "quiet", "jsonl"), default="text",
+                        help="text keeps the usual output, quiet prints nothing, jsonl prints one JSON event per line")
+    parser.add_argument("--buffer", type=int, default=1024, help="number of events buffered before writing")
+    parser.add_argument("--metrics", help="write the counters and histograms of the run to this JSON file")
+    parser.add_argument("--profile", help="write the profile of the sampled ticks to this pstats file")
+    parser.add_argument("--profile-every", type=int, default=100, help="with --profile, profile every N-th tick")
+    args = parser.parse_args()
+
+    metrics = Metrics()
+    if args.metrics != None or args.profile != None:
+        metrics = Metrics_Registry(args.profile_every if args.profile != None else 0)
+
+    main(args.paths, make_sink(args.output, args.buffer), metrics)
+
+    if args.metrics != None:
+        metrics.export(args.metrics)
+    if args.profile != None:
+        metrics.dump_profile(args.profile)
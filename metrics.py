@@ -0,0 +1,89 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+import json
+
+
+class Metrics(object):
+    """
+    Metrics receives the measurements of the Transaction_Manager and the Site_Manager: counters, values for histograms,
+    the start and end of each tick and of each wait. This one is disabled and records nothing, callers check enabled
+    before taking a measurement so a disabled registry costs one attribute check.
+
+    Attributes:
+        enabled (bool): whether measurements are recorded
+    """
+
+    enabled = False
+
+    def increment(self, name, amount=1):
+        """Adds to a counter
+
+        Parameters:
+            name (string): name of the counter
+            amount (int): amount to add
+        """
+
+        pass
+
+    def observe(self, name, value):
+        """Records a value in a histogram
+
+        Parameters:
+            name (string): name of the histogram
+            value (int or float): value to record, latencies are in seconds
+        """
+
+        pass
+
+    def start_tick(self, tick):
+        # a tick starts running its instruction
+        pass
+
+    def end_tick(self):
+        # the instruction of the tick has run
+        pass
+
+    def begin_wait(self, txn_id, cause, tick):
+        """A transaction starts waiting
+
+        Parameters:
+            txn_id (int): ID of transaction
+            cause (string): "lock" for lock contention, "failure" for an item no site can serve
+            tick (int): tick the wait starts at
+        """
+
+        pass
+
+    def end_wait(self, txn_id, tick):
+        """A transaction stops waiting, because it's resumed or killed
+
+        Parameters:
+            txn_id (int): ID of transaction
+            tick (int): tick the wait ends at
+        """
+
+        pass
+
+    def snapshot(self):
+        """Current values of the counters and histograms
+
+        Return:
+            dict with "counters" (dict (string: int)) and "histograms" (dict (string: dict))
+        """
+
+        return {"counters": {}, "histograms": {}}
+
+    def export(self, path):
+        """Writes a snapshot to a JSON file
+
+        Parameters:
+            path (string): path of the file
+        """
+
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+            f.write("\n")
@@ -0,0 +1,98 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+import cProfile
+from time import perf_counter
+from metrics import Metrics
+from histogram import Histogram
+
+
+class Metrics_Registry(Metrics):
+    """
+    Metrics_Registry keeps counters and histograms by name, times every tick, and measures how long each wait lasts
+    in ticks, separately for lock contention and for waits caused by site failures.
+    Every profile_every-th tick can also be run under a profiler, which samples where the time of the program goes.
+
+    Attributes:
+        counters (dict (string: int)): name: value of the counter
+        histograms (dict (string: Histogram Object)): name: histogram
+        waits (dict (int: (string, int))): transaction ID: (cause, tick) of its current wait
+        profile_every (int): run every profile_every-th tick under the profiler, 0 never does
+        profiler (cProfile.Profile Object): profiler of the sampled ticks, anything with enable(), disable() and dump_stats(path) can stand in
+        profiling (bool): whether the current tick runs under the profiler
+        tick_started (float): perf_counter() when the current tick started
+    """
+    enabled = True
+
+    def __init__(self, profile_every=0, profiler=None):
+        '''
+        Constructor
+
+        Parameters:
+            profile_every (int): run every profile_every-th tick under the profiler, 0 never does
+            profiler (object with enable(), disable() and dump_stats(path)): profiler of the sampled ticks. Defaults to a cProfile.Profile
+        '''
+        if profile_every < 0:
+            raise ValueError("profile_every must not be negative")
+
+        self.counters = {}
+        self.histograms = {}
+        self.waits = {}
+        self.profile_every = profile_every
+        self.profiler = profiler
+        if profiler == None and profile_every > 0:
+            self.profiler = cProfile.Profile()
+        self.profiling = False
+        self.tick_started = 0
+
+    def increment(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram == None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(value)
+
+    def start_tick(self, tick):
+        if self.profile_every > 0 and tick % self.profile_every == 0:
+            self.profiling = True
+            self.profiler.enable()
+        self.tick_started = perf_counter()
+
+    def end_tick(self):
+        self.observe("tick.seconds", perf_counter() - self.tick_started)
+        if self.profiling:
+            self.profiler.disable()
+            self.profiling = False
+            self.increment("tick.profiled")
+
+    def begin_wait(self, txn_id, cause, tick):
+        self.increment(f'wait.{cause}')
+        self.waits[txn_id] = (cause, tick)
+
+    def end_wait(self, txn_id, tick):
+        wait = self.waits.pop(txn_id, None)
+        if wait != None:
+            cause, started = wait
+            self.observe(f'wait.{cause}.ticks', tick - started)
+
+    def snapshot(self):
+        return {
+            "counters": dict(self.counters),
+            "histograms": {name: h.to_dict() for name, h in self.histograms.items()},
+        }
+
+    def dump_profile(self, path):
+        """Writes the statistics of the profiled ticks in the pstats format
+
+        Parameters:
+            path (string): path of the file
+        """
+
+        if self.profiler == None:
+            raise ValueError("no ticks were profiled")
+        self.profiler.dump_stats(path)
@@ -4,7 +4,10 @@ Created on Nov 26, 2019
 @author: Ian Lam, Yu Ting Chiu
 '''
 
-from variable import Variable
+from array import array
+from variable import Variable, initial_value
+from lazy_table import Lazy_Table
+from readable_bitmap import Readable_Bitmap
 
 
 class Site(object):
@@ -13,46 +16,105 @@ class Site(object):
     
         Attributes:
         site_id (int): ID of site
+        config (Config Object): size and item placement of the database
         status (string): Status of the site - "normal" or "failed"
-        data_table (dict (int : Variable Object) ): Item ID: Variable  Object
-        lock_table (dict (int: Lock Object) ): Item ID: Lock holding that object
+        data_table (dict (int : Variable Object) ): Item ID: Variable  Object. A Lazy_Table if the site was restored from a checkpoint, None in compact mode
+        values (array(int)): compact mode: values of the items at the site, indexed by config.site_index. None otherwise
         last_fail_timestamp (int): time of last site failure
         last_recover_timestamp (int): time of last site recover
-        readable_items (set (int) ): Item IDs of all the data items that can be read from this site at the current time
+        readable_items (set (int) ): Item IDs of all the data items that can be read from this site at the current time. A Readable_Bitmap in compact mode or after a restore
+        checkpoint (Checkpoint Object): checkpoint the site was restored from, None if it wasn't
 
     """
-    def __init__(self, site_id):
+    def __init__(self, site_id, config, checkpoint=None):
         '''
         Constructor
         
         Parameters:
             site_id (int): ID of site
+            config (Config Object): size and item placement of the database
+            checkpoint (Checkpoint Object): checkpoint to restore the site from. None starts the site with the initial values
         '''
 
         self.site_id = site_id
+        self.config = config
         self.status = "normal"
         self.data_table = dict()
-        self.lock_table = dict()
         self.last_fail_timestamp = -1
         self.last_recover_timestamp = -1
         self.readable_variables = set()
+        self.checkpoint = checkpoint
+        self.values = None
+
+        if config.compact:
+            # one typed array of values and one bit per item, no object per item
+            self.data_table = None
+            if checkpoint != None:
+                self.status, self.last_fail_timestamp, self.last_recover_timestamp = checkpoint.site_state(
+                    site_id)
+                self.values = checkpoint.site_values(site_id)
+                self.readable_variables = checkpoint.readable(site_id)
+            else:
+                self.values = array('q', map(initial_value, config.replicated_items))
+                self.values.extend(map(initial_value, config.local_items[site_id]))
+                self.readable_variables = Readable_Bitmap(config.num_variables)
+                self.readable_variables.update(config.replicated_items)
+                self.readable_variables.update(config.local_items[site_id])
+            return
+
+        if checkpoint != None:
+            # values are loaded from the checkpoint when the items are first used
+            self.status, self.last_fail_timestamp, self.last_recover_timestamp = checkpoint.site_state(
+                site_id)
+            self.data_table = Lazy_Table(checkpoint, site_id)
+            self.readable_variables = checkpoint.readable(site_id)
+            return
+
+        for i in config.site_items(site_id):
+            self.data_table[i] = Variable(i)
+            self.readable_variables.add(i)
+
+    def dump_site(self, sink):
+        # dump info of this site
+        sink.emit("dump_site", self.site_id,
+                  [(k, self.value(k)) for k in self.config.site_items(self.site_id)])
 
-        for i in range(1, 21):
-            if i % 2 == 0 or (i % 10) + 1 == self.site_id:
-                self.data_table[i] = Variable(i)
-                self.lock_table[i] = None
-                self.readable_variables.add(i)
+    def value(self, item_id):
+        # value of an item at this site, without loading it from the checkpoint
+        if self.values != None:
+            return self.values[self.config.site_index(self.site_id, item_id)]
 
-    def dump_site(self):
-        # dump info of this site
-        print(f'Site {self.site_id} - ', end="")
-        s = ""
-        for k, v in self.data_table.items():
-            s += f'x{k}: {v.value}, '
-        print(s[:-2])
+        variable = self.data_table.get(item_id)
+        if variable == None:
+            return self.checkpoint.value(self.site_id, item_id)
+        return variable.value
+
+    def apply(self, batch):
+        """Writes committed values to the data table and makes the items readable
+    
+        Parameters:
+            batch (list(tuple(int, int))): (item ID, new value) of the items written
+
+        Return:
+            list(int) of the IDs of the items that were not readable before
+        """
+
+        data_table = self.data_table
+        values = self.values
+        readable_variables = self.readable_variables
+        became_readable = []
+        for item_id, new_val in batch:
+            if values != None:
+                values[self.config.site_index(self.site_id, item_id)] = new_val
+            else:
+                data_table[item_id].value = new_val
+            if item_id not in readable_variables:
+                readable_variables.add(item_id)
+                became_readable.append(item_id)
+        return became_readable
 
     def fail(self, ts):
-        """Fails a site, wipes out the lock table, and wipes out readable_variables
+        """Fails a site and wipes out readable_variables. The Lock_Manager wipes out the locks at the site
     
         Parameters:
             ts (int): time of site failure
@@ -60,18 +122,15 @@ class Site(object):
 
         self.status = "failed"
 
-        # wipe out all the locks in the lock table
-        for item_id, _ in self.lock_table.items():
-            self.lock_table[item_id] = None
-
         # set the time of the site failure
         self.last_fail_timestamp = ts
 
         # wipe out all the variables in readable_variables
-        self.readable_variables = set()
+        self.readable_variables.clear()
 
     def recover(self, ts):
-        """Recovers a site, and puts back unreplicated items into the readable_variables. Replicated items need to wait for committed write to happen.
+        """Recovers a site, and puts back unreplicated items into the readable_variables. Replicated items need to wait for committed write to happen,
+        except with quorums, where a read takes the newest copy of its quorum
     
         Parameters:
             ts (int): time of site recovery
@@ -81,9 +140,9 @@ class Site(object):
         self.status = "normal"
 
         # if item is not replicated, add back to readable_variables
-        for item_id in self.data_table.keys():
-            if item_id % 2 != 0:
-                self.readable_variables.add(item_id)
+        self.readable_variables.update(self.config.local_items[self.site_id])
+        if self.config.read_quorum != None:
+            self.readable_variables.update(self.config.replicated_items)
 
         # set the timestamp of the site recovery
         self.last_recover_timestamp = ts
@@ -0,0 +1,44 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from lock_queue import Lock_Queue
+
+
+class Range_Lock(object):
+    '''
+    Range_Lock is a shared lock on every item in [low, high] at one site. It's taken by a range read together with an
+    intention shared lock on the site, so a scan takes one lock per site instead of one lock per item.
+
+    Attributes:
+        lock_type (string): Type of Lock - always "RSL"
+        txn_holding (set(int) ): Set with the ID of the transaction holding this lock
+        site_id (int): ID of site of where the lock is located at.
+        low (int): ID of the first item covered
+        high (int): ID of the last item covered
+        waiting (Lock_Queue Object): transactions waiting to write an item covered by this lock, in arrival order
+    '''
+    __slots__ = ("lock_type", "txn_holding", "site_id", "low", "high", "waiting")
+
+    def __init__(self, txn_id, site_id, low, high):
+        '''
+        Constructor
+
+        Parameters:
+            txn_id (int): ID of transaction that holds lock
+            site_id (int): ID of site of where the lock is located at.
+            low (int): ID of the first item covered
+            high (int): ID of the last item covered
+        '''
+        self.lock_type = "RSL"
+        self.txn_holding = {txn_id}
+        self.site_id = site_id
+        self.low = low
+        self.high = high
+        self.waiting = Lock_Queue()
+
+    def covers(self, item_id):
+        # whether the item is in the range
+        return self.low <= item_id <= self.high
@@ -0,0 +1,54 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+
+class Readable_Bitmap(object):
+    """
+    Readable_Bitmap is a set of item IDs stored as one bit per item. It's used for the readable items of a site
+    in compact mode or restored from a checkpoint, so a site needs one bit per item instead of a set entry, and restoring
+    a site copies bytes instead of building a set of every item.
+
+    Attributes:
+        bits (bytearray): bit i is set if item i is in the set
+    """
+    def __init__(self, num_variables, bits=None):
+        '''
+        Constructor
+
+        Parameters:
+            num_variables (int): Number of data items
+            bits (bytes): Initial bits, as returned by tobytes(). None for an empty set
+        '''
+        if bits == None:
+            self.bits = bytearray((num_variables + 8) // 8)
+        else:
+            self.bits = bytearray(bits)
+
+    def __contains__(self, item_id):
+        return self.bits[item_id >> 3] >> (item_id & 7) & 1 == 1
+
+    def __iter__(self):
+        for i, byte in enumerate(self.bits):
+            while byte:
+                low = byte & -byte
+                yield (i << 3) + low.bit_length() - 1
+                byte ^= low
+
+    def add(self, item_id):
+        self.bits[item_id >> 3] |= 1 << (item_id & 7)
+
+    def discard(self, item_id):
+        self.bits[item_id >> 3] &= ~(1 << (item_id & 7)) & 0xFF
+
+    def clear(self):
+        self.bits = bytearray(len(self.bits))
+
+    def update(self, item_ids):
+        for item_id in item_ids:
+            self.add(item_id)
+
+    def tobytes(self):
+        return bytes(self.bits)
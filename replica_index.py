@@ -0,0 +1,129 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+
+class Replica_Index(object):
+    """
+    Replica_Index keeps, for every item, the IDs of the sites it can be read from right now: sites that are up and
+    where the item is readable. Reads look the sites up instead of walking every site that stores the item.
+    Items with the same readable sites share one tuple, so the index needs one reference per item. A tuple is dropped once
+    no item uses it, so failures and recoveries don't pile up tuples of sites that are no longer readable together.
+
+    Attributes:
+        config (Config Object): size and item placement of the database
+        readable (list(tuple(int))): item_id: IDs of the sites the item can be read from, in increasing order. Index 0 is unused
+        tuples (dict (tuple(int): tuple(int))): every tuple of site IDs in use, to share equal tuples
+        uses (dict (tuple(int): int)): tuple of site IDs: number of entries of readable that are the tuple
+    """
+    def __init__(self, config, sites):
+        '''
+        Constructor
+
+        Parameters:
+            config (Config Object): size and item placement of the database
+            sites (list(Site Object)): the sites, in order of site ID
+        '''
+        self.config = config
+        self.tuples = {}
+
+        if all(s.status == "normal" and s.last_fail_timestamp == -1 for s in sites):
+            # a new database: every item is readable wherever it's stored
+            self.readable = list(config.item_sites)
+            for site_ids in self.readable:
+                self.tuples.setdefault(site_ids, site_ids)
+
+            # the replicated items and index 0 share their tuples, the unreplicated items of a site share one
+            self.uses = {site_ids: 0 for site_ids in self.tuples}
+            self.uses[self.readable[0]] += 1
+            if len(config.replicated_items) > 0:
+                self.uses[config.site_ids] += len(config.replicated_items)
+            for site_id in config.site_ids:
+                if len(config.local_items[site_id]) > 0:
+                    self.uses[(site_id, )] += len(config.local_items[site_id])
+            return
+
+        # a restored database: ask the sites
+        self.readable = [()] * (config.num_variables + 1)
+        for item_id in config.items():
+            self.readable[item_id] = self.share(tuple(
+                i for i in config.item_sites[item_id]
+                if sites[i - 1].status == "normal" and item_id in sites[i - 1].readable_variables))
+        self.uses = {}
+        for site_ids in self.readable:
+            self.uses[site_ids] = self.uses.get(site_ids, 0) + 1
+
+    def share(self, site_ids):
+        # the tuple in use equal to site_ids
+        return self.tuples.setdefault(site_ids, site_ids)
+
+    def move(self, old_ids, new_ids, count):
+        # count items leave the tuple old_ids for new_ids, old_ids is dropped once no item uses it
+        uses = self.uses
+        uses[new_ids] = uses.get(new_ids, 0) + count
+        left = uses[old_ids] - count
+        if left == 0:
+            del uses[old_ids]
+            del self.tuples[old_ids]
+        else:
+            uses[old_ids] = left
+
+    def sites(self, item_id):
+        """Sites an item can be read from
+
+        Parameters:
+            item_id (int): ID of item
+
+        Return:
+            tuple(int) of site IDs in increasing order, empty if no site can serve the item
+        """
+
+        return self.readable[item_id]
+
+    def add(self, item_id, site_id):
+        # the item became readable at a site
+        site_ids = self.readable[item_id]
+        if site_id not in site_ids:
+            new_ids = self.share(tuple(sorted(site_ids + (site_id, ))))
+            self.readable[item_id] = new_ids
+            self.move(site_ids, new_ids, 1)
+
+    def fail(self, site_id):
+        # nothing can be read from a failed site. Items sharing a tuple share its replacement
+        readable = self.readable
+        replaced = {}
+        for item_id in self.config.site_items(site_id):
+            site_ids = readable[item_id]
+            moved = replaced.get(site_ids)
+            if moved == None:
+                moved = [self.share(tuple(i for i in site_ids if i != site_id)), 0]
+                replaced[site_ids] = moved
+            readable[item_id] = moved[0]
+            moved[1] += 1
+        for site_ids, (new_ids, count) in replaced.items():
+            self.move(site_ids, new_ids, count)
+
+    def recover(self, site_id):
+        # the unreplicated items of a recovered site are readable again, replicated items wait for a committed write.
+        # With quorums every item is readable again, a read takes the newest copy of its quorum
+        items = self.config.local_items[site_id]
+        if self.config.read_quorum != None:
+            items = self.config.site_items(site_id)
+
+        readable = self.readable
+        replaced = {}
+        for item_id in items:
+            site_ids = readable[item_id]
+            moved = replaced.get(site_ids)
+            if moved == None:
+                new_ids = site_ids
+                if site_id not in site_ids:
+                    new_ids = self.share(tuple(sorted(site_ids + (site_id, ))))
+                moved = [new_ids, 0]
+                replaced[site_ids] = moved
+            readable[item_id] = moved[0]
+            moved[1] += 1
+        for site_ids, (new_ids, count) in replaced.items():
+            self.move(site_ids, new_ids, count)
@@ -0,0 +1,42 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+
+class Replica_Policy(object):
+    """
+    Replica_Policy chooses which of the sites an item can be read from serves a read. This one takes the first,
+    the site with the smallest ID, so every replicated read goes to the same site while it's up.
+    Other policies spread the reads over the replicas.
+
+    Attributes:
+        lock_manager (Lock_Manager Object): the locks of the database, for policies that look at the load of a site
+    """
+    def __init__(self, lock_manager):
+        '''
+        Constructor
+
+        Parameters:
+            lock_manager (Lock_Manager Object): the locks of the database
+        '''
+        self.lock_manager = lock_manager
+
+    def choose(self, txn_id, item_id, site_ids):
+        """Chooses the site a read is served by
+
+        Parameters:
+            txn_id (int): ID of the reading transaction
+            item_id (int): ID of item read
+            site_ids (tuple(int)): IDs of the sites the item can be read from, in increasing order, never empty
+
+        Return:
+            site ID (int), one of site_ids
+        """
+
+        return site_ids[0]
+
+    def forget(self, txn_id):
+        # the transaction has ended
+        pass
@@ -0,0 +1,31 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from replica_policy import Replica_Policy
+
+
+class Round_Robin_Policy(Replica_Policy):
+    """
+    Round_Robin_Policy hands reads to the replicas of an item in turn, so replicated reads are spread evenly over the
+    sites that are up.
+
+    Attributes:
+        lock_manager (Lock_Manager Object): the locks of the database
+        turn (int): number of reads chosen so far
+    """
+    def __init__(self, lock_manager):
+        '''
+        Constructor
+
+        Parameters:
+            lock_manager (Lock_Manager Object): the locks of the database
+        '''
+        Replica_Policy.__init__(self, lock_manager)
+        self.turn = 0
+
+    def choose(self, txn_id, item_id, site_ids):
+        self.turn += 1
+        return site_ids[self.turn % len(site_ids)]
@@ -0,0 +1,266 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+
+Serves a Transaction_Manager over TCP or a Unix socket. Clients send instructions in the input grammar, one per line,
+and get one JSON line back for each once the operation has completed:
+
+    {"instruction": "R(T1,x2)", "status": "running", "output": ["x2: 20"]}
+
+status is the status of the transaction after the operation, "ok" for an operation of no transaction, or "error".
+A blocked operation gets no answer until the transaction is resumed or aborted, so a client sends its next
+instruction only after the answer to the previous one. Instructions of all clients run one at a time in the order
+they arrive, each at the next tick.
+
+    python3 server.py [--host HOST] [--port PORT] [--unix PATH] [--sites N] [--variables N]
+'''
+import argparse
+import asyncio
+import json
+from itertools import count
+from config import Config
+from instruction import Instruction
+from session_sink import Session_Sink
+from transaction_manager import Transaction_Manager
+
+
+class Server(object):
+    """
+    Server runs the instructions of many client sessions on one Transaction_Manager. A session owns the
+    transactions it began, and an operation that blocks keeps a future that is resolved when it completes.
+    After every instruction deadlocks and resumes are settled, since no more input may come to do it.
+
+    Attributes:
+        tm (Transaction_Manager Object): the database
+        sink (Session_Sink Object): sorts the events of tm by transaction and session
+        pending (dict (int: (Future Object, string))): transaction ID: future and text of its blocked operation
+        owners (dict (int: int)): transaction ID: ID of the session that began it
+        session_ids (iterator(int)): IDs of new sessions
+        synced (Future Object): resolved by the next group sync of the write-ahead log, None if none is scheduled
+    """
+    def __init__(self, config=None, metrics=None):
+        '''
+        Constructor
+
+        Parameters:
+            config (Config Object): size and item placement of the database. Defaults to 10 sites and 20 variables
+            metrics (Metrics Object): receives the measurements of the database, None records nothing
+        '''
+        self.sink = Session_Sink()
+        self.tm = Transaction_Manager(config, self.sink, metrics)
+        self.pending = {}
+        self.owners = {}
+        self.session_ids = count(1)
+        self.synced = None
+
+        # answers wait for the log instead, so the commits of many sessions share one fsync
+        self.tm.defer_sync = True
+
+    def validate(self, instr, session_id):
+        """Checks an instruction a client sent, the Transaction_Manager trusts its input
+
+        Parameters:
+            instr (Instruction Object): the parsed instruction
+            session_id (int): ID of the session that sent it
+
+        Return:
+            error message (string), None if the instruction can run
+        """
+
+        config = self.tm.config
+        if instr.op == None:
+            return "invalid instruction"
+
+        if instr.op == "begin" or instr.op == "beginRO":
+            if instr.txn_id in self.tm.txns:
+                return f'Transaction {instr.txn_id} already exists'
+        elif instr.txn_id != None:
+            if self.owners.get(instr.txn_id) != session_id:
+                return f'Transaction {instr.txn_id} was not begun by this session'
+            if (instr.op == "W" or instr.op == "MW") and self.tm.txns[instr.txn_id].transaction_type == "read_only":
+                return f'Transaction {instr.txn_id} is read-only'
+
+        if instr.op == "R" or instr.op == "W":
+            if not 1 <= instr.args[0] <= config.num_variables:
+                return f'x{instr.args[0]} does not exist'
+        elif instr.op == "fail" or instr.op == "recover":
+            if not 1 <= instr.args[0] <= config.num_sites:
+                return f'Site {instr.args[0]} does not exist'
+        elif instr.op == "checkpoint":
+            # clients can't choose where files are written
+            if instr.args[0] != "":
+                return "checkpoint() only writes the configured checkpoint path"
+        return None
+
+    def submit(self, session_id, line):
+        """Runs an instruction of a session at the next tick
+
+        Parameters:
+            session_id (int): ID of the session that sent it
+            line (string): the instruction
+
+        Return:
+            Future Object resolved with the answer (dict) once the operation completes
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        instr = Instruction.parse(line)
+
+        error = self.validate(instr, session_id)
+        if error != None:
+            future.set_result({"instruction": instr.text, "status": "error", "output": [error]})
+            return future
+
+        if instr.op == "begin" or instr.op == "beginRO":
+            self.owners[instr.txn_id] = session_id
+
+        owner = instr.txn_id if instr.txn_id != None else ("session", session_id)
+        self.sink.current = owner
+        self.tm.run_instruction(instr)
+        self.settle()
+
+        if instr.txn_id == None:
+            future.set_result({"instruction": instr.text, "status": "ok", "output": self.sink.take(owner)})
+        else:
+            self.pending[instr.txn_id] = (future, instr.text)
+        self.complete(instr.txn_id)
+        return future
+
+    def settle(self):
+        # detects deadlocks, aborts deadlock prevention victims and resumes ready transactions until none changes anything.
+        # A resumed transaction can block again and close a cycle, and killing one transaction of a cycle can leave a smaller one.
+        # Locks handed on by an abandoned transaction can choose victims outside of any instruction
+        tm = self.tm
+        while True:
+            if len(tm.site_manager.victims) > 0:
+                tm.abort_victims()
+            cycles = tm.find_cycle()
+            if len(cycles) == 0 and len(tm.site_manager.txns_ready_list) == 0:
+                return
+            tm.run_ready_transactions()
+
+    def complete(self, txn_id=None):
+        # answers the operations of the transactions that received events, and of txn_id, that are no longer blocked
+        touched = self.sink.take_touched()
+        if txn_id != None:
+            touched.add(txn_id)
+
+        for txn_id in touched:
+            if txn_id not in self.pending:
+                continue
+
+            status = self.tm.txns[txn_id].status
+            if status == "blocked":
+                continue
+
+            future, text = self.pending.pop(txn_id)
+            if not future.done():
+                future.set_result({"instruction": text, "status": status, "output": self.sink.take(txn_id)})
+
+            # an ended transaction gets no more instructions
+            if status == "committed" or status == "aborted":
+                self.owners.pop(txn_id, None)
+                self.sink.take(txn_id)
+
+    async def durable(self):
+        # waits until every record logged so far is synced, so no answer reports a commit a crash could lose.
+        # Sessions waiting together share one sync, done once the group commit window of the oldest record expires
+        log = self.tm.site_manager.log
+        if log == None or log.pending == 0:
+            return
+
+        if self.synced == None:
+            self.synced = asyncio.get_running_loop().create_future()
+            asyncio.get_running_loop().call_later(log.due(), self.sync_log)
+        await asyncio.shield(self.synced)
+
+    def sync_log(self):
+        # the group commit window expired, answers waiting for the log can go
+        self.tm.site_manager.flush_log()
+        synced = self.synced
+        self.synced = None
+        synced.set_result(None)
+
+    def close_session(self, session_id):
+        # aborts the transactions a session left unfinished, so their locks go to the transactions waiting for them
+        abandoned = [txn_id for txn_id, owner in self.owners.items() if owner == session_id]
+        for txn_id in abandoned:
+            del self.owners[txn_id]
+            self.pending.pop(txn_id, None)
+            self.tm.abandon(txn_id)
+            self.sink.take(txn_id)
+
+        if len(abandoned) > 0:
+            self.settle()
+            self.complete()
+        self.sink.take(("session", session_id))
+
+    async def handle(self, reader, writer):
+        """Serves one client connection
+
+        Parameters:
+            reader (StreamReader Object): instructions from the client
+            writer (StreamWriter Object): answers to the client
+        """
+
+        session_id = next(self.session_ids)
+        try:
+            while True:
+                line = await reader.readline()
+                if line == b"":
+                    break
+
+                line = line.decode("utf-8", "replace").strip()
+                if line == "":
+                    continue
+
+                try:
+                    answer = await self.submit(session_id, line)
+                except Exception as e:
+                    # a bug in one operation answers with an error instead of dropping the session
+                    answer = {"instruction": line, "status": "error", "output": [f'internal error: {e!r}']}
+                await self.durable()
+                writer.write(json.dumps(answer).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.close_session(session_id)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=7000, path=None, backlog=4096):
+        """Accepts clients until cancelled
+
+        Parameters:
+            host (string): address to listen on
+            port (int): TCP port to listen on
+            path (string): path of a Unix socket to listen on instead of TCP, None for TCP
+            backlog (int): number of connections waiting to be accepted
+        """
+
+        if path != None:
+            server = await asyncio.start_unix_server(self.handle, path, backlog=backlog)
+        else:
+            server = await asyncio.start_server(self.handle, host, port, backlog=backlog)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.tm.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves the database to many clients")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--sites", type=int, default=10)
+    parser.add_argument("--variables", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(Server(Config(args.sites, args.variables)).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,79 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from event_sink import Event_Sink
+from text_sink import Text_Sink
+
+
+class Session_Sink(Event_Sink):
+    """
+    Session_Sink sorts events by the transaction they are about, so a server can answer each client with the lines of
+    its own operations. An event with a transaction ID field goes to that transaction, a deadlock cycle goes to the
+    transaction killed to break it, and any other event goes to the current owner: the transaction whose instruction is running or
+    was just resumed, or the session that sent an operation of no transaction. Lines are formatted like Text_Sink's
+    when they are taken.
+
+    Attributes:
+        current (int or object): owner of the events that name no transaction
+        cycle (tuple): fields of the last cycle event, kept for the kill that follows it
+        outputs (dict (int or object: list(tuple))): owner: (event, fields) of the events not taken yet
+        touched (set(int)): IDs of the transactions that received events since the last take_touched()
+    """
+    TXN_FIELD = {event: names.index("txn_id") for event, names in Event_Sink.FIELDS.items() if "txn_id" in names}
+
+    enabled = True
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.current = None
+        self.cycle = None
+        self.outputs = {}
+        self.touched = set()
+
+    def emit(self, event, *fields):
+        if event == "tick":
+            # the server knows which instruction it's running
+            return
+
+        if event == "resume":
+            self.current = fields[0]
+
+        if event == "cycle":
+            self.cycle = fields
+            return
+
+        if event == "kill" and self.cycle != None:
+            self.add(fields[0], "cycle", self.cycle)
+            self.cycle = None
+
+        index = self.TXN_FIELD.get(event)
+        self.add(self.current if index == None else fields[index], event, fields)
+
+    def add(self, owner, event, fields):
+        # keep an event for its owner
+        self.outputs.setdefault(owner, []).append((event, fields))
+        if isinstance(owner, int):
+            self.touched.add(owner)
+
+    def take(self, owner):
+        """Takes the lines kept for an owner
+
+        Parameters:
+            owner (int or object): transaction ID or session
+
+        Return:
+            list(string) of lines, in the order of their events
+        """
+
+        return [Text_Sink.FORMATS[event](*fields).rstrip("\n") for event, fields in self.outputs.pop(owner, ())]
+
+    def take_touched(self):
+        # IDs of the transactions that received events since the last call
+        touched = self.touched
+        self.touched = set()
+        return touched
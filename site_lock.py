@@ -0,0 +1,35 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from lock_queue import Lock_Queue
+
+
+class Site_Lock(object):
+    '''
+    Site_Lock locks every data item at one site for one transaction. It replaces the item locks of a transaction
+    once the transaction holds more locks at the site than the escalation threshold.
+
+    Attributes:
+        lock_type (string): Type of Lock - "SSL" for a shared site lock / "SXL" for an exclusive site lock
+        txn_holding (set(int) ): Set with the ID of the transaction holding this lock
+        site_id (int): ID of site of where the lock is located at.
+        waiting (Lock_Queue Object): transactions waiting for this lock to be released, in arrival order
+    '''
+    __slots__ = ("lock_type", "txn_holding", "site_id", "waiting")
+
+    def __init__(self, lock_type, txn_id, site_id):
+        '''
+        Constructor
+
+        Parameters:
+            lock_type (string): Type of Lock - "SSL"/"SXL"
+            txn_id (int): ID of transaction that holds lock
+            site_id (int): ID of site of where the lock is located at.
+        '''
+        self.lock_type = lock_type
+        self.txn_holding = {txn_id}
+        self.site_id = site_id
+        self.waiting = Lock_Queue()
@@ -4,9 +4,34 @@ Created on Nov 27, 2019
 @author: Ian Lam, Yu Ting Chiu
 '''
 
+import os
+import shutil
+import tempfile
+from time import perf_counter
 from one_site import Site
-from lock import Lock
-from collections import OrderedDict
+from site_process import Site_Process
+from lock_manager import Lock_Manager
+from replica_index import Replica_Index
+from replica_policy import Replica_Policy
+from round_robin_policy import Round_Robin_Policy
+from least_locked_policy import Least_Locked_Policy
+from affinity_policy import Affinity_Policy
+from wait_for_graph import Wait_For_Graph
+from version_store import Version_Store
+from waiter_registry import Waiter_Registry
+from write_ahead_log import Write_Ahead_Log
+from checkpoint import Checkpoint
+from catch_up import Catch_Up
+from variable import initial_value
+from metrics import Metrics
+
+# Config.replica_policy: class of the policy
+REPLICA_POLICIES = {
+    "first": Replica_Policy,
+    "round_robin": Round_Robin_Policy,
+    "least_locked": Least_Locked_Policy,
+    "affinity": Affinity_Policy,
+}
 
 
 class Site_Manager(object):
@@ -16,38 +41,180 @@ class Site_Manager(object):
     where the deadlocks are, deciding whether to commit or abort a transaction
     
     Attributes:
-        sites (list(Site Object)): List of Site Objects
-        data_site_map (dict (int: list(int) ): Mapping of the data item and the sites that contains it
-        item_txns_waiting_map (dict (int: OrderedDict) ): Mapping of the data item and the transactions waiting for item
-        txns_waiting_list (list(int)): List of transaction_ids that are unable to obtain item due to site failure or items not committed after site failure
+        config (Config Object): size and item placement of the database
+        sites (list(Site Object)): List of Site Objects, Site_Process Objects if every site runs in its own process
+        data_site_map (list (list(Site Object) ): item_id: the sites that contains it. Index 0 is unused
+        replicas (Replica_Index Object): item_id: the sites the item can be read from now
+        replica_policy (Replica_Policy Object): chooses the site a read is served by
+        timestamps (dict (int: int) ): transaction ID: timestamp of the read-write transactions that haven't ended, for deadlock prevention
+        victims (dict (int: list(int)) ): transaction ID: the transactions it conflicted with, for the transactions the deadlock prevention policy aborts
+        site_txns (dict (int: dict (int: int)) ): site_id: transaction ID: tick of the earliest access to the site, of the read-write transactions that haven't ended, with eager_abort. None otherwise
+        catching_up (Catch_Up Object): replicated items recovered sites still have to copy from their peers, None if sites don't catch up, or use quorums
+        copy_versions (dict ((int, int): int) ): (site_id, item_id): tick of the commit that wrote the copy of a replicated item, with quorums. Copies not written since the database was built or restored are missing
+        lock_manager (Lock_Manager Object): owns every lock, indexed by (site, item) and by transaction
+        txns_waiting_lock (dict (int: Lock Object) ): transaction ID: the Lock whose queue the transaction is waiting in
+        wait_for_graph (Wait_For_Graph Object): wait-for graph between transactions, updated as transactions block and release locks
+        versions (Version_Store Object): committed versions of the data items, read by read-only transactions
+        txns_waiting (Waiter_Registry Object): transactions that are unable to obtain item due to site failure or items not committed after site failure, indexed by item and site
         txns_ready_list (list(int)): List of transaction_ids that are ready to be run because the data item they are waiting for is available
         txns_ended_list (list(int, str)): List of transaction_ids that have ended and their respective status
+        log (Write_Ahead_Log Object): log of the commits and site events, None if the database is in memory only
+        restored_tick (int): clock of the earlier run the database was restored to, -1 for a new database
+        sink (Event_Sink Object): receives the events of the Site_Manager
+        metrics (Metrics Object): receives the measurements of the Site_Manager
+        prepared (dict (int: list(Site_Process Object))): transaction ID: sites that voted to commit it, between the two phases of two-phase commit
+        site_dir (string): directory of the site processes' logs, None if the sites run in this process
+        own_site_dir (bool): whether site_dir is a temporary directory to remove on close
     """
-    def __init__(self):
+    def __init__(self, config, sink, metrics=None):
+        self.config = config
+        self.sink = sink
+        self.metrics = metrics if metrics != None else Metrics()
         self.sites = []
-        self.data_site_map = {}
-        self.item_txns_waiting_map = {}
-        self.txns_waiting_list = []
+        self.data_site_map = []
+        self.lock_manager = Lock_Manager(config.escalation_threshold)
+        self.txns_waiting_lock = {}
+        self.wait_for_graph = Wait_For_Graph()
+        self.txns_waiting = Waiter_Registry(config)
         self.txns_ready_list = []
         self.txns_ended_list = []
-
-        # initialize the 10 sites
-        for i in range(10):
-            s = Site(i + 1)
+        self.log = None
+        self.restored_tick = -1
+        self.prepared = {}
+        self.site_dir = None
+        self.own_site_dir = False
+        self.copy_versions = {}
+        self.timestamps = {}
+        self.victims = {}
+
+        # with eager abort a site failure finds the transactions that accessed the site without walking them all
+        self.site_txns = None
+        if config.eager_abort != None:
+            self.site_txns = {site_id: {} for site_id in config.site_ids}
+
+        # restore from the checkpoint of an earlier run, if there is one
+        checkpoint = None
+        if config.checkpoint_path != None and os.path.exists(
+                config.checkpoint_path):
+            checkpoint = Checkpoint(config.checkpoint_path, config)
+            self.restored_tick = checkpoint.tick
+            self.versions = Version_Store(checkpoint.committed_value)
+        else:
+            self.versions = Version_Store(initial_value)
+
+        # initialize the sites, in this process or each in its own
+        if config.distributed:
+            self.site_dir = config.site_dir
+            if self.site_dir == None:
+                self.site_dir = tempfile.mkdtemp(prefix="sites")
+                self.own_site_dir = True
+            os.makedirs(self.site_dir, exist_ok=True)
+
+        for site_id in config.site_ids:
+            if config.distributed:
+                s = Site_Process(site_id, config, checkpoint, self.site_dir)
+            else:
+                s = Site(site_id, config, checkpoint)
             self.sites.append(s)
 
-        # initialize the data_site_map
-        for i in range(1, 21):
-            if i % 2 == 0:
-                # even items replicated at all sites
-                self.data_site_map[i] = self.sites
-            else:
-                # odd items only at specific sites
-                self.data_site_map[i] = [self.sites[i % 10]]
+        # initialize the data_site_map from the precomputed placement, items with the same placement share one list
+        site_lists = {}
+        for site_ids in config.item_sites:
+            if site_ids not in site_lists:
+                site_lists[site_ids] = [self.sites[i - 1] for i in site_ids]
+            self.data_site_map.append(site_lists[site_ids])
+
+        self.replicas = Replica_Index(config, self.sites)
+        self.replica_policy = REPLICA_POLICIES[config.replica_policy](self.lock_manager)
+
+        # replay the log of an earlier run on top of the checkpoint, then keep appending to it
+        if config.wal_path != None:
+            self.restore(config.wal_path)
+            self.log = Write_Ahead_Log(config.wal_path, config.fsync_policy,
+                                       config.group_commit_window)
+
+        # with quorums a recovered site can be read at once, there is nothing to catch up
+        self.catching_up = None
+        if config.catch_up_batch != None and config.read_quorum == None:
+            self.catching_up = Catch_Up(config, config.catch_up_batch)
+
+            # copies made before a restart aren't in the log, sites that are up copy what they miss again
+            if self.restored_tick != -1:
+                for s in self.sites:
+                    if s.status == "normal":
+                        self.catching_up.start(s.site_id, self.unreadable_items(s))
+
+    def restore(self, path):
+        """Rebuilds the sites from a write-ahead log. Records already in the checkpoint are skipped,
+        and the clock resumes from the last record
+    
+        Parameters:
+            path (string): path of the log file
+
+        Side Effect:
+            restored_tick is the tick of the last record replayed
+        """
+
+        for record in Write_Ahead_Log.replay(path):
+            ts = record["ts"]
+            if ts <= self.restored_tick:
+                continue
 
-        # initialize the item_txns_waiting_map with all 20 item_ids
-        for i in range(1, 21):
-            self.item_txns_waiting_map[i] = OrderedDict()
+            if record["op"] == "commit":
+                new_values = {}
+                destinations = {}
+                for item_id, new_val, site_ids in record["writes"]:
+                    new_values[item_id] = new_val
+                    destinations[item_id] = site_ids
+                self.write(new_values, destinations, ts)
+
+            elif record["op"] == "fail":
+                self.sites[record["site"] - 1].fail(ts)
+                self.replicas.fail(record["site"])
+
+            elif record["op"] == "recover":
+                self.sites[record["site"] - 1].recover(ts)
+                self.replicas.recover(record["site"])
+
+            self.restored_tick = ts
+
+    def checkpoint(self, path, tick):
+        """Writes the committed state of every site to a checkpoint file. The log records it holds are dropped
+    
+        Parameters:
+            path (string): path of the checkpoint file
+            tick (int): time of the checkpoint
+        """
+
+        if self.log != None:
+            self.log.sync()
+        Checkpoint.write(path, self.config, self.sites, self.versions, tick)
+        if self.log != None:
+            self.log.truncate()
+
+    def sync_log(self):
+        # the commits of a tick share one flush of the log, later ticks may join it within the group commit window
+        if self.log != None:
+            self.log.end_tick()
+
+    def flush_log(self):
+        # syncs the records logged so far, before a commit is reported
+        if self.log != None and self.log.pending > 0:
+            self.log.sync()
+
+    def close_log(self):
+        if self.log != None:
+            self.log.close()
+            self.log = None
+
+    def close(self):
+        # closes the log and stops the site processes, if there are any
+        self.close_log()
+        if self.config.distributed:
+            for site in self.sites:
+                site.stop()
+            if self.own_site_dir:
+                shutil.rmtree(self.site_dir, ignore_errors=True)
 
     def fail(self, siteID, timestamp):
         """Fails a site with siteID
@@ -55,9 +222,32 @@ class Site_Manager(object):
         Parameters:
             siteID (int): ID of site to be failed
             timestamp (int): time of this action
+
+        Return:
+            list(int) of the IDs of the read-write transactions that accessed the site before it failed, in increasing order.
+            They can't commit anymore. Empty without eager_abort
+
+        Side Effect:
+            Transactions waiting for locks at the site are added to txns_ready_list, since the locks are wiped out
         """
 
+        if self.log != None:
+            self.log.append_site("fail", timestamp, int(siteID))
+
+        doomed = []
+        if self.site_txns != None:
+            doomed = sorted(txn_id for txn_id, ts in self.site_txns[int(siteID)].items() if ts < timestamp)
+
+        for lock in self.lock_manager.wipe_site(int(siteID)):
+            for txn_id in list(lock.waiting.waiters):
+                self.stop_waiting(txn_id)
+                self.txns_ready_list.append(txn_id)
+
         self.sites[int(siteID) - 1].fail(timestamp)
+        self.replicas.fail(int(siteID))
+        if self.catching_up != None:
+            self.catching_up.stop(int(siteID))
+        return doomed
 
     def recover(self, siteID, timestamp):
         """Recovers a site with siteID
@@ -65,15 +255,70 @@ class Site_Manager(object):
         Parameters:
             siteID (int): ID of site to be recover
             timestamp (int): time of this action
+
+        Side Effect:
+            Transactions waiting for items that the recovered site can serve are added to txns_ready_list
         """
 
+        if self.log != None:
+            self.log.append_site("recover", timestamp, int(siteID))
+
         self.sites[int(siteID) - 1].recover(timestamp)
+        self.replicas.recover(int(siteID))
+        self.txns_ready_list.extend(self.txns_waiting.wake_site(int(siteID)))
+        if self.catching_up != None:
+            self.catching_up.start(int(siteID), self.unreadable_items(self.sites[int(siteID) - 1]))
+
+    def unreadable_items(self, site):
+        # IDs of the replicated items a site that is up can't serve, in increasing order
+        readable_variables = site.readable_variables
+        return [i for i in self.config.replicated_items if i not in readable_variables]
+
+    def catch_up(self):
+        """Copies the next batch of replicated items to recovered sites, from peer sites where they are readable.
+        An item that some transaction may be writing is copied later: the writer didn't lock the recovered site,
+        so its commit would not reach the copy
+
+        Side Effect:
+            The items copied become readable at the recovered sites
+        """
+
+        if self.catching_up == None or len(self.catching_up) == 0:
+            return
+
+        copies = {}
+        for site_id, item_id in self.catching_up.take():
+            if item_id in self.sites[site_id - 1].readable_variables:
+                # a committed write got there first
+                continue
+
+            peers = self.replicas.sites(item_id)
+            if len(peers) == 0:
+                # no copy is up to date, the next committed write makes the item readable
+                continue
+
+            if self.lock_manager.is_written(item_id, self.config.item_sites[item_id]):
+                self.catching_up.defer(site_id, item_id)
+                continue
+
+            copies.setdefault(site_id, []).append(
+                (item_id, self.sites[peers[0] - 1].value(item_id)))
+
+        for site_id, batch in copies.items():
+            if self.metrics.enabled:
+                self.metrics.increment("catch_up.items", len(batch))
+            for item_id in self.sites[site_id - 1].apply(batch):
+                self.replicas.add(item_id, site_id)
+                self.txns_ready_list.extend(self.txns_waiting.wake_readers(item_id))
 
     def dump(self):
         # Dump all the sites and their data variable and values
 
+        if not self.sink.enabled:
+            return
+
         for s in self.sites:
-            s.dump_site()
+            s.dump_site(self.sink)
 
     def acquire_share_lock(self, txn_id, item_id):
         """Acquire shared locks for Transaction txn_id for data item item_id
@@ -83,62 +328,196 @@ class Site_Manager(object):
             item_id (int): ID of item wanted
             
         Return:
-            if successful: A Lock object of type 'SL' 
+            if successful: A Lock object of type 'SL', or the Site_Lock of the transaction covering the item
             else: None
         
         Side Effect:
-            If lock not acquired due to another transaction holding, the txn_id is added to the item_txns_waiting_map.
-            If lock not acquired due to site failures, the txn_id is added to txns_waiting_list
+            If lock not acquired due to another transaction holding, the txn_id is added to the lock's waiting queue.
+            If lock not acquired due to site failures, the txn_id is added to txns_waiting
+            The transaction's item locks may be escalated to a site lock
         """
 
-        locations = self.data_site_map[item_id]
-        for location in locations:
-            # check whether the site is normal
-            if location.status == "normal":
+        if self.config.is_quorum(item_id):
+            return self.acquire_share_quorum(txn_id, item_id)
+
+        # the transaction already holding a SL or XL on the item at a site it can read from, just return the current lock
+        for lock in self.lock_manager.held(txn_id, item_id):
+            location = self.sites[lock.site_id - 1]
+            if location.status == "normal" and item_id in location.readable_variables:
+                return lock
 
-                # check whether the item is available for read in this site
-                if item_id in location.readable_variables:
-
-                    # check the lock table of that item
-                    if location.lock_table[item_id] == None:
-
-                        # nothing holding the item, make a new lock for the item
-                        location.lock_table[item_id] = Lock(
-                            "SL", txn_id, location.site_id,
-                            location.data_table[item_id])
-                        return location.lock_table[item_id]
-
-                    elif location.lock_table[item_id].lock_type == "SL" and len(
-                            self.item_txns_waiting_map[item_id]) == 0:
-                        # if the item already has a SL from another transaction, and there is no other transactions waiting for item, then share lock
-                        location.lock_table[item_id].txn_holding.append(txn_id)
-                        return location.lock_table[item_id]
-
-                    elif location.lock_table[
-                            item_id].lock_type == "XL" and location.lock_table[
-                                item_id].txn_holding[0] == txn_id:
-                        # the transaction already holding an Exclusive lock on the item, just return the current lock
-                        return location.lock_table[item_id]
-
-                    else:
-                        # item locked by exclusive lock from other transactions
-                        txn_blocking = location.lock_table[item_id].txn_holding
-                        transactions_ahead = list(
-                            self.item_txns_waiting_map[item_id].keys())
-                        self.item_txns_waiting_map[item_id][txn_id] = set(
-                            transactions_ahead + txn_blocking)
-                        print(
-                            f'Transaction {txn_id} fails to acquire shared lock because Transaction {txn_blocking} currently locked x{item_id}. It needs to wait for Transactions {set(transactions_ahead + txn_blocking)}.'
-                        )
-                        return None
+        # the policy chooses among the sites the item can be read from
+        site_ids = self.replicas.sites(item_id)
+        if len(site_ids) > 0:
+            site_id = self.replica_policy.choose(txn_id, item_id, site_ids)
+            if self.metrics.enabled:
+                self.metrics.increment(f'read.site{site_id}')
+            return self.share_at(txn_id, site_id, item_id)
 
         # All sites not available
-        print(
-            f'Transaction {txn_id} is not able to acquire shared lock for x{item_id} either due to site failure or the data item not updated.'
-        )
-        self.txns_waiting_list.append(txn_id)
+        self.sink.emit("unavailable_read", txn_id, item_id)
+        self.txns_waiting.add(txn_id, item_id, "read")
         return None
 
+    def acquire_share_locks(self, txn_id, item_ids):
+        """Acquire shared locks for Transaction txn_id for several data items, one after another in the order given,
+        stopping at the first that can't be acquired
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            item_ids (list(int)): IDs of items wanted, in increasing order so that bulk reads lock in one order
+            
+        Return:
+            List of the locks acquired, as acquire_share_lock returns them, for the first items of item_ids.
+            Shorter than item_ids if the transaction has to wait for the next item
+        
+        Side Effect:
+            The item that can't be locked is waited for as with acquire_share_lock
+        """
+
+        locks = []
+        for item_id in item_ids:
+            lock = self.acquire_share_lock(txn_id, item_id)
+            if lock == None:
+                break
+            locks.append(lock)
+        return locks
+
+    def share_at(self, txn_id, site_id, item_id):
+        """Acquire a shared lock for Transaction txn_id on data item item_id at one site
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            site_id (int): ID of a site the item can be read from
+            item_id (int): ID of item wanted
+            
+        Return:
+            if successful: A Lock object of type 'SL', or the Site_Lock of the transaction covering the item
+            else: None, the txn_id is added to the waiting queue of the lock it conflicts with
+        """
+
+        # a site lock of the transaction covers every item at the site
+        site_lock = self.lock_manager.site_lock_of(txn_id, site_id)
+        if site_lock != None:
+            return site_lock
+
+        # check whether another transaction holds an exclusive site lock
+        site_lock = self.lock_manager.site_conflict(txn_id, site_id, "SL")
+        if site_lock != None:
+            self.wait_for_site_lock(txn_id, "SL", site_lock)
+            return None
+
+        lock = self.lock_manager.get(site_id, item_id)
+
+        # check the lock table of that item
+        if lock == None:
+
+            # nothing holding the item, make a new lock for the item
+            lock = self.lock_manager.create("SL", txn_id, site_id, item_id)
+            self.escalate_locks()
+            return lock
+
+        elif txn_id in lock.txn_holding:
+            # a shared or exclusive lock the transaction already holds
+            return lock
+
+        elif lock.lock_type == "SL" and len(lock.waiting) == 0:
+            # if the item already has a SL from another transaction, and there is no other transactions waiting for item, then share lock
+            self.lock_manager.share(lock, txn_id)
+            self.escalate_locks()
+            return lock
+
+        else:
+            # item locked by exclusive lock from other transactions, or others are queued before
+            txn_blocking = sorted(lock.txn_holding)
+            transactions_before = self.wait_for_lock(txn_id, "SL", lock)
+            self.sink.emit("wait_shared", txn_id, item_id,
+                           txn_blocking, transactions_before)
+            return None
+
+    def acquire_share_quorum(self, txn_id, item_id):
+        """Acquire shared locks for Transaction txn_id on a read quorum of the copies of a replicated item.
+        Locks the transaction already holds on the item count toward the quorum
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            item_id (int): ID of a replicated item
+            
+        Return:
+            if successful: the lock at the copy with the newest version, the read is served by it
+            else: None
+        
+        Side Effect:
+            If a lock is not acquired due to another transaction holding, the txn_id is added to the lock's waiting queue.
+            The locks acquired at the other sites stay with the transaction.
+            If fewer sites than the read quorum can serve the item, the txn_id is added to txns_waiting
+        """
+
+        locks = self.quorum_locks(txn_id, item_id, self.config.read_quorum, self.share_at)
+        if locks == None:
+            self.sink.emit("unavailable_read", txn_id, item_id)
+            self.txns_waiting.add(txn_id, item_id, "read")
+            return None
+        if len(locks) == 0:
+            return None
+
+        lock = max(locks, key=lambda l: self.copy_version(l.site_id, item_id))
+        if self.metrics.enabled:
+            self.metrics.increment(f'read.site{lock.site_id}')
+        return lock
+
+    def quorum_locks(self, txn_id, item_id, quorum, lock_at):
+        """Locks a quorum of the copies of an item. Sites where the transaction already holds a lock on the item come first,
+        exclusive ones before shared ones, then the sites in the order of the replica policy
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            item_id (int): ID of a replicated item
+            quorum (int): number of copies to lock
+            lock_at (function): locks the item at one site, share_at or exclusive_at
+            
+        Return:
+            list(Lock Object) of the quorum's locks, an empty list if the transaction waits for a lock,
+            None if fewer sites than the quorum are up
+        """
+
+        site_ids = self.replicas.sites(item_id)
+        if len(site_ids) < quorum:
+            return None
+
+        held = sorted(self.lock_manager.held(txn_id, item_id), key=lambda l: l.lock_type == "SL")
+        chosen = [l.site_id for l in held if l.site_id in site_ids]
+        if len(chosen) < quorum:
+            start = site_ids.index(self.replica_policy.choose(txn_id, item_id, site_ids))
+            for k in range(len(site_ids)):
+                site_id = site_ids[(start + k) % len(site_ids)]
+                if site_id not in chosen:
+                    chosen.append(site_id)
+                    if len(chosen) == quorum:
+                        break
+
+        locks = []
+        for site_id in chosen[:quorum]:
+            lock = lock_at(txn_id, site_id, item_id)
+            if lock == None:
+                return []
+            locks.append(lock)
+        return locks
+
+    def read_sites(self, txn_id, item_id):
+        """Sites a read of a replicated item under quorums relies on: every up site where the transaction locks the item
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            item_id (int): ID of item read
+            
+        Return:
+            list(int) of site IDs
+        """
+
+        site_ids = self.replicas.sites(item_id)
+        return sorted(l.site_id for l in self.lock_manager.held(txn_id, item_id) if l.site_id in site_ids)
+
     def acquire_exclusive_lock(self, txn_id, item_id):
         """Acquire exclusive locks for Transaction txn_id for data item item_id
         
@@ -147,62 +526,457 @@ class Site_Manager(object):
             item_id (int): ID of item wanted
             
         Return:
-            if successful: List of Lock objects of type 'XL' 
+            if successful: List of Lock objects of type 'XL', with the exclusive Site_Lock of the transaction for sites it has escalated
             else: Empty list
         
         Side Effect:
             If transaction already holds SL for the item and no other transaction is waiting for item, the SL is promoted to XL
-            If lock not acquired due to another transaction holding, the txn_id is added to the item_txns_waiting_map.
+            If lock not acquired due to another transaction holding, the txn_id is added to the lock's waiting queue.
+            If no site holding the item is up, the txn_id is added to txns_waiting
+            The transaction's item locks may be escalated to a site lock
         """
 
-        acquired_exclusive_locks = []
-        locations = self.data_site_map[item_id]
+        if self.config.is_quorum(item_id):
+            return self.acquire_exclusive_quorum(txn_id, item_id)
+
+        # exclusive locks already held by transaction at every site it could lock
+        held = self.lock_manager.held_exclusive(txn_id, item_id)
+        if held != None:
+            return list(held)
 
-        for location in locations:
+        acquired_exclusive_locks = []
+        for location in self.data_site_map[item_id]:
 
             # check whether the site is normal
             if location.status == "normal":
-
-                # check the lock table of that item
-                if location.lock_table[item_id] == None:
-                    # nothing holding the item, make a new lock for the item
-                    location.lock_table[item_id] = Lock(
-                        "XL", txn_id, location.site_id,
-                        location.data_table[item_id])
-                    acquired_exclusive_locks.append(
-                        location.lock_table[item_id])
-
-                elif location.lock_table[item_id].lock_type == "SL" and len(
-                        self.item_txns_waiting_map[item_id]
-                ) == 0 and location.lock_table[item_id].txn_holding[
-                        0] == txn_id and len(
-                            location.lock_table[item_id].txn_holding) == 1:
-                    # if item is locked with SL, and no other transaction waiting for item, and this current transaction is the one holding the SL, and no other transaction is reading the item
-                    location.lock_table[item_id].lock_type = "XL"
-                    acquired_exclusive_locks.append(
-                        location.lock_table[item_id])
-
-                elif location.lock_table[
-                        item_id].lock_type == "XL" and location.lock_table[
-                            item_id].txn_holding[0] == txn_id:
-                    # exclusive lock already held by transaction
-                    acquired_exclusive_locks.append(
-                        location.lock_table[item_id])
-
-                else:
-                    # someone is reading or writing it
-                    txn_blocking = location.lock_table[item_id].txn_holding
-                    transactions_ahead = list(
-                        self.item_txns_waiting_map[item_id].keys())
-                    self.item_txns_waiting_map[item_id][txn_id] = set(
-                        transactions_ahead + txn_blocking)
-                    print(
-                        f'Transaction {txn_id} fails to acquire exclusive lock because Transactions {txn_blocking} currently locked x{item_id}. It needs to wait for Transactions {set(transactions_ahead + txn_blocking)}.'
-                    )
+                lock = self.exclusive_at(txn_id, location.site_id, item_id)
+                if lock == None:
+                    # the locks already acquired at the other sites stay with the transaction
                     return []
+                acquired_exclusive_locks.append(lock)
+
+        if len(acquired_exclusive_locks) == 0:
+            # All sites not available
+            self.sink.emit("unavailable_write", txn_id, item_id)
+            self.txns_waiting.add(txn_id, item_id, "write")
+        else:
+            # the fast path only knows about item locks
+            if all(l.lock_type == "XL" for l in acquired_exclusive_locks):
+                self.lock_manager.mark_exclusive(txn_id, item_id)
+            self.escalate_locks()
 
         return acquired_exclusive_locks
 
+    def acquire_exclusive_locks(self, txn_id, item_ids):
+        """Acquire exclusive locks for Transaction txn_id for several data items, one after another in the order given,
+        stopping at the first that can't be acquired
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            item_ids (list(int)): IDs of items wanted, in increasing order so that bulk writes lock in one order
+            
+        Return:
+            List of the lists of locks acquired, as acquire_exclusive_lock returns them, for the first items of item_ids.
+            Shorter than item_ids if the transaction has to wait for the next item
+        
+        Side Effect:
+            The item that can't be locked is waited for as with acquire_exclusive_lock
+        """
+
+        locks = []
+        for item_id in item_ids:
+            item_locks = self.acquire_exclusive_lock(txn_id, item_id)
+            if len(item_locks) == 0:
+                break
+            locks.append(item_locks)
+        return locks
+
+    def exclusive_at(self, txn_id, site_id, item_id):
+        """Acquire an exclusive lock for Transaction txn_id on data item item_id at one site
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            site_id (int): ID of a site that is up and stores the item
+            item_id (int): ID of item wanted
+            
+        Return:
+            if successful: A Lock object of type 'XL', or the exclusive Site_Lock of the transaction
+            else: None, the txn_id is added to the waiting queue of the lock it conflicts with
+        """
+
+        # an exclusive site lock of the transaction covers every item at the site
+        site_lock = self.lock_manager.site_lock_of(txn_id, site_id)
+        if site_lock != None and site_lock.lock_type == "SXL":
+            return site_lock
+
+        # check whether another transaction holds a site lock
+        site_lock = self.lock_manager.site_conflict(txn_id, site_id, "XL")
+        if site_lock != None:
+            self.wait_for_site_lock(txn_id, "XL", site_lock)
+            return None
+
+        # check whether a range read of another transaction covers the item at this site
+        range_lock = self.lock_manager.range_blocking(txn_id, site_id, item_id)
+        if range_lock != None:
+            txn_blocking = sorted(range_lock.txn_holding)
+            transactions_before = self.wait_for_lock(txn_id, "XL", range_lock)
+            self.sink.emit("wait_exclusive_range", txn_id,
+                           range_lock.low, range_lock.high,
+                           txn_blocking, transactions_before)
+            return None
+
+        lock = self.lock_manager.get(site_id, item_id)
+
+        # check the lock table of that item
+        if lock == None:
+            # nothing holding the item, make a new lock for the item
+            return self.lock_manager.create("XL", txn_id, site_id, item_id)
+
+        elif lock.lock_type == "SL" and lock.txn_holding == {
+                txn_id
+        } and len(lock.waiting) == 0:
+            # if item is locked with SL, and no other transaction waiting for item, and this current transaction is the one holding the SL, and no other transaction is reading the item
+            self.lock_manager.upgrade(lock, txn_id)
+            return lock
+
+        elif lock.lock_type == "XL" and txn_id in lock.txn_holding:
+            # exclusive lock already held by transaction
+            return lock
+
+        else:
+            # someone is reading or writing it
+            txn_blocking = sorted(lock.txn_holding)
+            transactions_before = self.wait_for_lock(txn_id, "XL", lock)
+            self.sink.emit("wait_exclusive", txn_id, item_id,
+                           txn_blocking, transactions_before)
+            return None
+
+    def acquire_exclusive_quorum(self, txn_id, item_id):
+        """Acquire exclusive locks for Transaction txn_id on a write quorum of the copies of a replicated item.
+        Sites where the transaction already holds a lock on the item count toward the quorum
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            item_id (int): ID of a replicated item
+            
+        Return:
+            if successful: List of the quorum's Lock objects of type 'XL', with the exclusive Site_Lock of the transaction for sites it has escalated
+            else: Empty list
+        
+        Side Effect:
+            If a lock is not acquired due to another transaction holding, the txn_id is added to the lock's waiting queue.
+            The locks acquired at the other sites stay with the transaction.
+            If fewer sites than the write quorum are up, the txn_id is added to txns_waiting
+        """
+
+        locks = self.quorum_locks(txn_id, item_id, self.config.write_quorum, self.exclusive_at)
+        if locks == None:
+            self.sink.emit("unavailable_write", txn_id, item_id)
+            self.txns_waiting.add(txn_id, item_id, "write")
+            return []
+
+        # the fast path of held_exclusive isn't used, the transaction may also hold shared locks outside the quorum
+        if len(locks) > 0:
+            self.escalate_locks()
+        return locks
+
+    def acquire_range_lock(self, txn_id, low, high):
+        """Acquire shared locks for Transaction txn_id on every data item from low to high.
+        Each item is read from the first site it's available at, or the first sites of its read quorum, and one range lock
+        (with an intention shared lock on the site) is taken at each of those sites instead of one lock per item
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            low (int): ID of the first item wanted
+            high (int): ID of the last item wanted
+            
+        Return:
+            if successful: list((int, int, tuple(int))) of (item_id, value, IDs of the sites read) for every item in the range
+            else: None
+        
+        Side Effect:
+            If a range lock is not acquired because another transaction holds an exclusive lock on an item in the range, the txn_id is added to that lock's waiting queue.
+            If an item is not available in any site, the txn_id is added to txns_waiting
+        """
+
+        reads = []
+        range_sites = set()
+        for item_id in range(low, high + 1):
+            # the first sites the item can be read from, as many as its read quorum
+            site_ids = self.replicas.sites(item_id)
+            needed = self.config.read_quorum if self.config.is_quorum(item_id) else 1
+            if len(site_ids) < needed:
+                self.sink.emit("unavailable_read", txn_id, item_id)
+                self.txns_waiting.add(txn_id, item_id, "read")
+                return None
+            reads.append((item_id, site_ids[:needed]))
+            range_sites.update(site_ids[:needed])
+
+        # check every site first, so the range is either locked everywhere or nowhere.
+        # Sites where the transaction already has a covering range or a site lock need no new lock
+        range_sites = [
+            site_id for site_id in sorted(range_sites)
+            if self.lock_manager.held_range(txn_id, site_id, low, high) == None
+            and self.lock_manager.site_lock_of(txn_id, site_id) == None
+        ]
+        for site_id in range_sites:
+            site_lock = self.lock_manager.site_conflict(txn_id, site_id, "RSL")
+            if site_lock != None:
+                self.wait_for_site_lock(txn_id, "SL", site_lock)
+                return None
+
+            lock = self.lock_manager.range_conflict(txn_id, site_id, low, high)
+            if lock != None:
+                txn_blocking = sorted(lock.txn_holding)
+                transactions_before = self.wait_for_lock(txn_id, "SL", lock)
+                self.sink.emit("wait_range", txn_id, low, high, lock.item_id,
+                               txn_blocking, transactions_before)
+                return None
+
+        for site_id in range_sites:
+            self.lock_manager.create_range(txn_id, site_id, low, high)
+
+        return [(item_id, self.newest_copy(item_id, site_ids), site_ids)
+                for item_id, site_ids in reads]
+
+    def newest_copy(self, item_id, site_ids):
+        # value of the copy of an item with the newest version among some sites
+        site_id = site_ids[0]
+        if len(site_ids) > 1:
+            site_id = max(site_ids, key=lambda i: self.copy_version(i, item_id))
+        return self.sites[site_id - 1].value(item_id)
+
+    def read_value(self, site_id, item_id):
+        # committed value of an item at a site
+        return self.sites[site_id - 1].value(item_id)
+
+    def locate_read(self, txn_id, item_id):
+        """Site an optimistic read is served by. No lock is taken, the read is validated when the transaction commits
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            item_id (int): ID of item wanted
+            
+        Return:
+            if the item can be read from some site: ID (int) of the site chosen by the replica policy
+            else: None
+        
+        Side Effect:
+            If the item can't be read from any site, the txn_id is added to txns_waiting
+        """
+
+        site_ids = self.replicas.sites(item_id)
+        if len(site_ids) > 0:
+            site_id = self.replica_policy.choose(txn_id, item_id, site_ids)
+            if self.metrics.enabled:
+                self.metrics.increment(f'read.site{site_id}')
+            return site_id
+
+        self.sink.emit("unserved_read", txn_id, item_id)
+        self.txns_waiting.add(txn_id, item_id, "read")
+        return None
+
+    def locate_range(self, txn_id, low, high):
+        """Reads every data item from low to high for an optimistic transaction, each from the first site it's available at.
+        No lock is taken, the reads are validated when the transaction commits
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            low (int): ID of the first item wanted
+            high (int): ID of the last item wanted
+            
+        Return:
+            if every item can be read: list((int, int, tuple(int))) of (item_id, value, IDs of the sites read) for every item in the range
+            else: None
+        
+        Side Effect:
+            If an item is not available in any site, the txn_id is added to txns_waiting
+        """
+
+        reads = []
+        for item_id in range(low, high + 1):
+            site_ids = self.replicas.sites(item_id)
+            if len(site_ids) == 0:
+                self.sink.emit("unserved_read", txn_id, item_id)
+                self.txns_waiting.add(txn_id, item_id, "read")
+                return None
+            reads.append((item_id, self.sites[site_ids[0] - 1].value(item_id), site_ids[:1]))
+        return reads
+
+    def writable_sites(self, txn_id, item_id):
+        """Sites an optimistic write goes to: every site holding the item that is up. No lock is taken
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            item_id (int): ID of item written
+            
+        Return:
+            list(int) of site IDs, empty if no site holding the item is up
+        
+        Side Effect:
+            If no site holding the item is up, the txn_id is added to txns_waiting
+        """
+
+        site_ids = [s.site_id for s in self.data_site_map[item_id] if s.status == "normal"]
+        if len(site_ids) == 0:
+            self.sink.emit("unserved_write", txn_id, item_id)
+            self.txns_waiting.add(txn_id, item_id, "write")
+        return site_ids
+
+    def commit_version(self, item_id):
+        # tick of the last commit of an item, what an optimistic read is validated against
+        return self.versions.last_commit(item_id)
+
+    def touch(self, txn, site_ids, ts):
+        """Records an access of a read-write transaction to some sites. With eager_abort the transaction is also indexed
+        by the sites, so their failure finds it
+
+        Parameters:
+            txn (Transaction Object): Read-write transaction
+            site_ids (iterable(int)): IDs of the sites accessed
+            ts (int): time of the access
+        """
+
+        txn.touch(site_ids, ts)
+        if self.site_txns != None:
+            for s in site_ids:
+                self.site_txns[s].setdefault(txn.id, ts)
+
+    def begin(self, txn):
+        # a read-write transaction began, its age decides lock conflicts under deadlock prevention
+        self.timestamps[txn.id] = txn.timestamp
+
+    def wait_for_lock(self, txn_id, lock_type, lock):
+        """Queues a transaction for a lock and records who it waits for in the wait-for graph,
+        or lets the deadlock prevention policy decide who aborts
+        
+        Parameters:
+            txn_id (int): Transaction ID
+            lock_type (string): Type of Lock requested - "SL"/"XL"
+            lock (Lock Object): Lock held by other transactions
+            
+        Return:
+            set(int) of the transactions holding the lock or queued before txn_id
+        """
+
+        lock.waiting.enqueue(txn_id, lock_type)
+        self.txns_waiting_lock[txn_id] = lock
+        if self.metrics.enabled:
+            self.metrics.observe("lock.queue_length", len(lock.waiting))
+        transactions_before = set(lock.waiting.ahead_of(txn_id)) | lock.txn_holding
+        if self.config.deadlock_policy == "detect":
+            self.wait_for_graph.add_edges(txn_id, transactions_before)
+        else:
+            self.prevent_deadlock(txn_id, transactions_before)
+        return transactions_before
+
+    def prevent_deadlock(self, txn_id, transactions_before):
+        """Decides a lock conflict by the age of the transactions, so a transaction only waits for younger ones (wait-die),
+        only for older ones (wound-wait) or for none (no-wait), and no cycle can form
+        
+        Parameters:
+            txn_id (int): ID of the transaction that has to wait
+            transactions_before (set(int)): the transactions holding the lock or queued before txn_id
+            
+        Side Effect:
+            The transactions to abort are added to victims: txn_id itself if it conflicts with an older transaction (wait-die) or
+            with any (no-wait), the younger transactions it conflicts with (wound-wait)
+        """
+
+        policy = self.config.deadlock_policy
+        ts = self.timestamps[txn_id]
+        conflicts = sorted(t for t in transactions_before if t != txn_id)
+
+        if policy == "no_wait":
+            dies_for = conflicts
+        elif policy == "wait_die":
+            dies_for = [t for t in conflicts if self.timestamps[t] < ts]
+        else:
+            dies_for = []
+            for t in conflicts:
+                if self.timestamps[t] > ts:
+                    self.victims.setdefault(t, []).append(txn_id)
+
+        if len(dies_for) > 0:
+            self.victims.setdefault(txn_id, []).extend(dies_for)
+
+    def wait_for_site_lock(self, txn_id, lock_type, site_lock):
+        """Queues a transaction behind the site lock of another transaction
+
+        Parameters:
+            txn_id (int): Transaction ID
+            lock_type (string): Type of Lock requested - "SL"/"XL"
+            site_lock (Site_Lock Object): Site lock the request conflicts with
+        """
+
+        txn_blocking = sorted(site_lock.txn_holding)
+        transactions_before = self.wait_for_lock(txn_id, lock_type, site_lock)
+        access = "exclusive" if lock_type == "XL" else "shared"
+        self.sink.emit("wait_site_lock", txn_id, access, site_lock.site_id,
+                       txn_blocking, transactions_before)
+
+    def blocked_by(self, txn_id):
+        # what a transaction waits for - "lock" for another transaction's lock, "failure" for an item no site can serve, or None
+        if txn_id in self.txns_waiting_lock:
+            return "lock"
+        if txn_id in self.txns_waiting.txn_item:
+            return "failure"
+        return None
+
+    def escalate_locks(self):
+        # replace the item locks of transactions that passed the escalation threshold at a site with a site lock
+        for txn_id, site_id in self.lock_manager.take_escalation_candidates():
+            escalated = self.lock_manager.escalate(txn_id, site_id)
+            if escalated == None:
+                continue
+
+            site_lock, released = escalated
+            access = "exclusive" if site_lock.lock_type == "SXL" else "shared"
+            self.sink.emit("escalate", txn_id, site_id, access)
+            for lock in released:
+                self.grant_waiters(lock)
+
+    def stop_waiting(self, txn_id):
+        # take the transaction out of the lock queue it's waiting in, it no longer waits for anyone
+        lock = self.txns_waiting_lock.pop(txn_id, None)
+        if lock != None:
+            lock.waiting.remove(txn_id)
+        self.wait_for_graph.remove_waiter(txn_id)
+        return lock
+
+    def grant_waiters(self, lock):
+        """Hands a lock over to the next waiters in its queue that can hold it, and frees the lock if nobody holds it.
+        A range lock or a site lock can't be handed over, once released all its waiters try again
+        
+        Parameters:
+            lock (Lock Object, Range_Lock Object or Site_Lock Object): Lock that some transaction stopped holding or waiting for
+            
+        Side Effect:
+            Transactions given the lock are added to txns_ready_list
+        """
+
+        if lock.lock_type != "SL" and lock.lock_type != "XL":
+            if not self.lock_manager.is_current(lock):
+                for txn_id in list(lock.waiting.waiters):
+                    self.stop_waiting(txn_id)
+                    self.txns_ready_list.append(txn_id)
+            return
+
+        # waiters the site lock of another transaction conflicts with move to that site lock's queue
+        while len(lock.waiting) > 0:
+            txn_id, lock_type = lock.waiting.first()
+            site_lock = self.lock_manager.site_conflict(
+                txn_id, lock.site_id, lock_type)
+            if site_lock == None:
+                break
+            self.stop_waiting(txn_id)
+            self.wait_for_lock(txn_id, lock_type, site_lock)
+
+        for txn_id in self.lock_manager.grant_waiters(lock):
+            self.txns_waiting_lock.pop(txn_id, None)
+            self.wait_for_graph.remove_waiter(txn_id)
+            self.txns_ready_list.append(txn_id)
+
     def check_commit(self, txn):
         """Check whether the transaction should commit based on the timestamp of its operations and the timestamps of touched sites
         
@@ -214,32 +988,99 @@ class Site_Manager(object):
         """
 
         if txn.transaction_type == "read_write":
-            for ts, action in txn.cache.items():
-                _, _, touched_sites = action[1]
-                for s in touched_sites:
-                    if self.sites[s - 1].last_fail_timestamp > ts:
-                        print(
-                            f'Site {s} has failed after Transaction {txn.id} obtained lock.'
-                        )
-                        return False
-
+            # a site that failed after the earliest access failed after some access
+            for s, ts in txn.first_access.items():
+                if self.sites[s - 1].last_fail_timestamp > ts:
+                    self.sink.emit("site_failed", s, txn.id)
+                    if self.metrics.enabled:
+                        self.metrics.increment("abort.site_failed")
+                    return False
+
+            # an optimistic transaction is valid if no item it read was committed by another transaction since
+            for item_id, version in txn.read_versions.items():
+                if self.versions.last_commit(item_id) != version:
+                    self.sink.emit("stale_read", txn.id, item_id)
+                    if self.metrics.enabled:
+                        self.metrics.increment("abort.validation")
+                    return False
+            if self.config.concurrency_control == "optimistic":
+                self.widen_writes(txn)
+
+            # sites in their own processes vote first
+            if self.config.distributed and not self.prepare(txn):
+                if self.metrics.enabled:
+                    self.metrics.increment("abort.vote")
+                return False
+
+            if self.metrics.enabled:
+                self.metrics.increment("commit.read_write")
             return True
 
-    def commit(self, txn):
+    def widen_writes(self, txn):
+        """The writes of an optimistic transaction go to every site holding the item that is up when it commits, not only to
+        the sites that were up when it wrote. A site that recovered in between could otherwise get a later write of the item
+        from another transaction and keep it, readable, after this commit
+        
+        Parameters:
+            txn (Transaction Object): Optimistic transaction about to commit
+        """
+
+        for item_id, site_ids in txn.write_sites.items():
+            if self.config.is_replicated(item_id):
+                site_ids.update(s.site_id for s in self.data_site_map[item_id] if s.status == "normal")
+
+    def prepare(self, txn):
+        """First phase of two-phase commit. Every site the transaction writes to gets its batch, then the votes are collected,
+        so the sites prepare in parallel
+        
+        Parameters:
+            txn (Transaction Object): Transaction to prepare
+            
+        Return:
+            boolean for whether every site voted to commit
+        """
+
+        participants = []
+        for site_id, batch in self.make_batches(txn.uncommit_values, txn.write_sites).items():
+            site = self.sites[site_id - 1]
+            site.prepare(txn.id, batch)
+            participants.append(site)
+
+        for site in participants:
+            if not site.vote():
+                # the process of the site is gone
+                self.sink.emit("site_failed", site.site_id, txn.id)
+                for p in participants:
+                    p.abort(txn.id)
+                return False
+
+        self.prepared[txn.id] = participants
+        return True
+
+    def commit(self, txn, timestamp):
         """ Commits transaction by actually writing to sites with new value and release all the locks it holds
         
         Parameters:
             txn (Transaction Object): Transaction to commit
+            timestamp (int): time of this action
             
         Side Effects:
             Sites are updated with the new written values
         """
 
-        # first write the items
-        for _, action in txn.cache.items():
-            if action[0] == "write":
-                item_id, new_val, destinations = action[1]
-                self.write(item_id, new_val, destinations)
+        # a committing transaction waits for nothing, its own writes must not wake it up
+        self.txns_waiting.remove(txn.id)
+
+        # log the write set before any site changes
+        if self.log != None and len(txn.uncommit_values) > 0:
+            self.log.append_commit(timestamp, txn.id, txn.uncommit_values,
+                                   txn.write_sites)
+
+        # first write the items, only the last value of each item is written
+        if self.config.distributed:
+            self.commit_prepared(txn, timestamp)
+        else:
+            self.write(txn.uncommit_values, txn.write_sites, timestamp)
 
         # second release all locks hold by that transaction
         self.release_locks(txn)
@@ -247,6 +1088,11 @@ class Site_Manager(object):
         self.txns_ended_list.append((txn.id, "committed"))
 
     def commitRO(self, txn):
+        # read-only transaction no longer needs its versions or waits for an item
+        if self.metrics.enabled:
+            self.metrics.increment("commit.read_only")
+        self.versions.remove_reader(txn.id)
+        self.txns_waiting.remove(txn.id)
         self.txns_ended_list.append((txn.id, "committed"))
 
     def abort(self, txn):
@@ -257,43 +1103,30 @@ class Site_Manager(object):
         """
 
         # just release all locks since the transaction will abort
+        for site in self.prepared.pop(txn.id, ()):
+            site.abort(txn.id)
         self.release_locks(txn)
         self.txns_ended_list.append((txn.id, "aborted"))
 
     def kill(self, txn):
-        """ Kills transaction, removes transaction in the item_txns_waiting_map, releases all the locks it holds
+        """ Kills transaction, removes transaction from the lock queue it's waiting in, releases all the locks it holds
         
         Parameters:
             txn (Transaction Object): Transaction to abort  
         """
-        # get rid of transaction in the item_waiting map
-        for _, transaction_waiting in self.item_txns_waiting_map.items():
-            if txn.id in transaction_waiting:
-                del transaction_waiting[txn.id]
 
-        # release the locks
+        # release the locks, this also takes the transaction out of the lock queue
         self.release_locks(txn)
 
-        # delete txn_id from the items_txns_waiting map
-        for item_id, transaction_waiting in self.item_txns_waiting_map.items():
-
-            to_delete = False
-            for transaction_after, transaction_before in transaction_waiting.items():
-                if txn.id in transaction_before:
-                    transaction_before.remove(txn.id)
-                if len(transaction_waiting) == 1 and len(
-                        transaction_before) == 0:
-                    # the transction_after doesn't have anymore transaction to wait for
-                    self.txns_ready_list.append(transaction_after)
-                    to_delete = True
-
-            if to_delete:
-                self.item_txns_waiting_map[item_id] = OrderedDict()
+        # a read-only transaction no longer needs the versions of its snapshot
+        if txn.transaction_type == "read_only":
+            self.versions.remove_reader(txn.id)
 
         self.txns_ended_list.append((txn.id, "killed"))
 
     def release_locks(self, txn):
-        """ Releases all locks from the transaction, updates the lock_table of where the lock is from
+        """ Releases all locks from the transaction and hands each lock to the next transactions waiting for it.
+        The cost depends only on the number of locks the transaction holds
         
         Parameters:
             txn (Transaction Object): Transaction to release locks from
@@ -302,167 +1135,180 @@ class Site_Manager(object):
             Add new transaction to txns_ready_list if the transaction can use the free data item
         """
 
-        for l in txn.locks_holding:
-            if l.lock_type == "SL" and len(l.txn_holding) > 1:
-                l.txn_holding.remove(txn.id)
-
-            else:
-                location = self.sites[l.site_id - 1]
-                location.lock_table[l.item_locked.id] = None
-
-            # remove the transaction in the item_txns_waiting_map
-            for _, transaction_before in self.item_txns_waiting_map[
-                    l.item_locked.id].items():
-                if txn.id in transaction_before:
-                    transaction_before.remove(txn.id)
-
-            # check if any new transaction can proceed
-            for transaction_waiting, transaction_before in self.item_txns_waiting_map[
-                    l.item_locked.id].items():
-                if len(transaction_before) == 0:
-                    self.txns_ready_list.append(transaction_waiting)
-                    del self.item_txns_waiting_map[
-                        l.item_locked.id][transaction_waiting]
-
-                elif len(transaction_before) == 1:
-                    if list(transaction_before)[0] == transaction_waiting:
-                        self.txns_ready_list.append(transaction_waiting)
-                        del self.item_txns_waiting_map[
-                            l.item_locked.id][transaction_waiting]
-
-                break
-
-        txn.locks_holding = []
-
-    def write(self, item_id, new_val, destinations):
-        """ Writes the new value to the database
+        # an ended transaction no longer waits for an item or a lock, the transactions behind it may now be able to go
+        self.txns_waiting.remove(txn.id)
+        lock = self.stop_waiting(txn.id)
+        if lock != None and self.lock_manager.is_current(lock):
+            self.grant_waiters(lock)
+
+        # locks wiped out by a site failure are not returned
+        for l in self.lock_manager.release(txn.id):
+            self.grant_waiters(l)
+
+        # the transaction has ended, nobody waits for it anymore and it waits for nobody
+        self.wait_for_graph.remove(txn.id)
+        self.timestamps.pop(txn.id, None)
+        self.replica_policy.forget(txn.id)
+        if self.site_txns != None and txn.transaction_type == "read_write":
+            for s in txn.first_access:
+                self.site_txns[s].pop(txn.id, None)
+
+    def write(self, new_values, destinations, timestamp):
+        """ Writes the new values of a transaction to the database as one batch per site and records them as new committed versions
         
         Parameters:
-            item_id (int): ID of item to be written to
-            new_val (int): new value of the item
-            destinations (list(int)): list of site IDs of where the new value should be written to
+            new_values (dict (int: int)): item_id: new value of the item
+            destinations (dict (int: iterable(int))): item_id: site IDs of where the new value should be written to
+            timestamp (int): time of the commit
+
+        Side Effect:
+            If an item becomes readable at a site, the transactions waiting to read it are added to txns_ready_list
         """
 
-        for i in destinations:
-            destination = self.sites[i - 1]
-            destination.data_table[item_id].value = new_val
+        for item_id, new_val in new_values.items():
+            self.versions.add(item_id, timestamp, new_val)
+        if self.config.read_quorum != None:
+            self.record_copies(destinations, timestamp)
 
+        for i, batch in self.make_batches(new_values, destinations).items():
             # this is for updating the readable_variables
-            destination.readable_variables.add(item_id)
+            for item_id in self.sites[i - 1].apply(batch):
+                self.replicas.add(item_id, i)
+                self.txns_ready_list.extend(self.txns_waiting.wake_readers(item_id))
 
+    def commit_prepared(self, txn, timestamp):
+        """Second phase of two-phase commit. Every site that voted writes the batch it was prepared with, the site processes
+        write in parallel. The new values are recorded as committed versions
+        
+        Parameters:
+            txn (Transaction Object): Prepared transaction
+            timestamp (int): time of the commit
 
+        Side Effect:
+            If an item becomes readable at a site, the transactions waiting to read it are added to txns_ready_list
+        """
 
-    def acquire_snapshot(self, txn_id):
-        """ Acquires snapshot of database with each data item and its value
+        for item_id, new_val in txn.uncommit_values.items():
+            self.versions.add(item_id, timestamp, new_val)
+        if self.config.read_quorum != None:
+            self.record_copies(txn.write_sites, timestamp)
+
+        for site in self.prepared.pop(txn.id, ()):
+            for item_id in site.commit(txn.id):
+                self.replicas.add(item_id, site.site_id)
+                self.txns_ready_list.extend(self.txns_waiting.wake_readers(item_id))
+
+    def record_copies(self, destinations, timestamp):
+        # the copies of replicated items written by a commit now have its tick as their version
+        for item_id, site_ids in destinations.items():
+            if self.config.is_replicated(item_id):
+                for i in site_ids:
+                    self.copy_versions[(i, item_id)] = timestamp
+
+    def copy_version(self, site_id, item_id):
+        """Version of the copy of an item at a site: the tick of the commit that wrote it. A copy not written since the
+        database was built or restored is current if it holds the value committed at that time
+        
         Parameters:
-            txn_id: Transaction ID that's acquiring snapshot
+            site_id (int): ID of site
+            item_id (int): ID of item
             
         Return:
-            dict(int: int) of snapshot. {item_id: item value}
-        """
-        snapshot = {}
-
-        for i in range(1, 21):
-            locations = self.data_site_map[i]
-            snapshot[i] = None
-            for location in locations:
-                if location.status == "normal" and i in location.readable_variables:
-                    snapshot[i] = location.data_table[i].value
-                    break
-
-            if snapshot[i] == None:
-                print(
-                    f'Transaction {txn_id} cannot acquire x{i} for the snapshot because it\'s not available in any site. It will need to wait.'
-                )
-                self.txns_waiting_list.append(txn_id)
-                return None
+            version (int), a newer copy has a larger version
+        """
 
-        return snapshot
+        version = self.copy_versions.get((site_id, item_id))
+        if version != None:
+            return version
+        if self.sites[site_id - 1].value(item_id) == self.versions.base_value(item_id):
+            return 0
+        return -1
 
-    def find_cycle(self):
-        """ Check for deadlock. Use Tarjan’s Algorithm to find Strongly Connected Components (cycles)
+    def make_batches(self, new_values, destinations):
+        """Groups new values by the site they are written to
         
+        Parameters:
+            new_values (dict (int: int)): item_id: new value of the item
+            destinations (dict (int: iterable(int))): item_id: site IDs of where the new value should be written to
+
         Return:
-            list( list(int) ): List of cycles. Each cycle is a list of Transaction IDs
+            dict (int: list(tuple(int, int))) of site ID: (item ID, new value) of the items written at the site
         """
 
-        # turn item_txns_waiting_map into a graph
-        graph = self.create_graph()
-
-        disc = {}
-        for vertex in list(graph.keys()):
-            disc[vertex] = -1
-
-        low = {}
-        for vertex in list(graph.keys()):
-            low[vertex] = -1
+        batches = {}
+        for item_id, new_val in new_values.items():
+            for i in destinations[item_id]:
+                if i in batches:
+                    batches[i].append((item_id, new_val))
+                else:
+                    batches[i] = [(item_id, new_val)]
+        return batches
 
-        stackMember = {}
-        for vertex in list(graph.keys()):
-            stackMember[vertex] = False
 
-        st = []
-        time = 0
+    def begin_snapshot(self, txn):
+        """ Starts the snapshot of a read-only transaction. Only its start time is recorded, values are resolved when read
+        
+        Parameters:
+            txn (Transaction Object): Read-only transaction
+        """
 
-        ans = []
+        if not self.metrics.enabled:
+            self.versions.add_reader(txn.id, txn.timestamp)
+            return
 
-        def find_cycle_helper(u, low, disc, stackMember, st, time, graph):
-            disc[u] = time
-            low[u] = time
-            time += 1
-            stackMember[u] = True
-            st.append(u)
+        started = perf_counter()
+        self.versions.add_reader(txn.id, txn.timestamp)
+        self.metrics.observe("snapshot.begin.seconds", perf_counter() - started)
 
-            for v in graph[u]:
-                if disc[v] == -1:
-                    find_cycle_helper(v, low, disc, stackMember, st, time,
-                                      graph)
-                    low[u] = min(low[u], low[v])
-                elif stackMember[v] == True:
-                    low[u] = min(low[u], disc[v])
+    def read_snapshot(self, txn, item_id):
+        """ Reads the version of an item that was committed when the read-only transaction began
+        
+        Parameters:
+            txn (Transaction Object): Read-only transaction
+            item_id (int): ID of item to be read
+            
+        Return:
+            if item is available at some site, or at a read quorum of sites: value (int) of the item
+            else: None
+        
+        Side Effect:
+            If item is not available in any site, the txn_id is added to txns_waiting
+        """
 
-            w = -1
-            if low[u] == disc[u]:
-                cycle = []
-                while w != u:
-                    w = st.pop()
-                    cycle.append(w)
-                    stackMember[w] = False
+        needed = self.config.read_quorum if self.config.is_quorum(item_id) else 1
+        if len(self.replicas.sites(item_id)) >= needed:
+            if not self.metrics.enabled:
+                return self.versions.read(item_id, txn.timestamp)
 
-                if len(cycle) > 1:
-                    ans.append(cycle)
+            started = perf_counter()
+            value = self.versions.read(item_id, txn.timestamp)
+            self.metrics.observe("snapshot.read.seconds", perf_counter() - started)
+            return value
 
-        for i in list(graph.keys()):
-            if disc[i] == -1:
-                find_cycle_helper(i, low, disc, stackMember, st, time, graph)
+        self.sink.emit("snapshot_wait", txn.id, item_id)
+        self.txns_waiting.add(txn.id, item_id, "read")
+        return None
 
-        return (ans)
+    def find_cycle(self):
+        """ Check for deadlock. Only the transactions that blocked since the last check are searched from,
+        so the cost depends on the part of the wait-for graph they can reach, not on every waiting transaction
 
-    def create_graph(self):
-        """ Creats a wait-for graph from item_txns_waiting_map
-        
         Return:
-            graph (dict(int, set()) ): transaction and the transactions it's waiting for 
+            list( list(int) ): List of cycles. Each cycle is a list of Transaction IDs. Empty under deadlock prevention
+            or optimistic concurrency control, which build no graph
         """
 
-        graph = {}
-
-        vertices_seen = set()
-
-        for _, txns_waiting in self.item_txns_waiting_map.items():
-            for txns_second, txns_first in txns_waiting.items():
-                vertices_seen = vertices_seen.union(txns_first)
-                if txns_second in graph:
-                    graph[txns_second].union(txns_first)
-                else:
-                    graph[txns_second] = txns_first
-
-        for vertex in list(vertices_seen):
-            if vertex not in graph:
-                graph[vertex] = set()
+        if self.config.deadlock_policy != "detect" or self.config.concurrency_control == "optimistic":
+            return []
 
-        for txns_second, txns_first in graph.items():
-            if txns_second in txns_first:
-                txns_first.remove(txns_second)
+        if not self.metrics.enabled:
+            return self.wait_for_graph.find_cycles()
 
-        return graph
+        graph = self.wait_for_graph
+        self.metrics.observe("deadlock.waiting", len(graph.waits_for))
+        self.metrics.observe("deadlock.searched_from", len(graph.newly_blocked))
+        started = perf_counter()
+        cycles = graph.find_cycles()
+        self.metrics.observe("deadlock.seconds", perf_counter() - started)
+        self.metrics.increment("deadlock.cycles", len(cycles))
+        return cycles
@@ -0,0 +1,238 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+import multiprocessing
+import os
+from readable_bitmap import Readable_Bitmap
+from site_worker import Site_Worker
+
+
+class Site_Process(object):
+    """
+    Site_Process stands in the Site_Manager for a site that runs in its own process. The values of the items live in
+    the process, a Site_Worker, and are read and written through messages. The status of the site and its readable
+    items are kept here, since the Site_Manager checks them on every lock request.
+    A failure kills the process and a recovery starts a new one, which rebuilds its values from the site's log.
+
+    Attributes:
+        site_id (int): ID of site
+        config (Config Object): size and item placement of the database
+        status (string): Status of the site - "normal" or "failed"
+        last_fail_timestamp (int): time of last site failure
+        last_recover_timestamp (int): time of last site recover
+        readable_variables (set (int) ): Item IDs of all the data items that can be read from this site at the current time. A Readable_Bitmap in compact mode or after a restore
+        log_path (string): path of the site's log of written batches
+        process (Process Object): process of the site, None while the site is failed
+        conn (Connection Object): pipe to the process
+        staged (tuple(int, list)): transaction ID and batch of the transaction prepared at the site, None if there is none
+        failed_values (dict (int: int)): item ID: value of the items of the failed site, read from its log once needed. None otherwise
+    """
+    def __init__(self, site_id, config, checkpoint, site_dir):
+        '''
+        Constructor
+
+        Parameters:
+            site_id (int): ID of site
+            config (Config Object): size and item placement of the database
+            checkpoint (Checkpoint Object): checkpoint the database is restored from, None starts with the initial values
+            site_dir (string): directory of the sites' logs
+        '''
+        self.site_id = site_id
+        self.config = config
+        self.status = "normal"
+        self.last_fail_timestamp = -1
+        self.last_recover_timestamp = -1
+        self.log_path = os.path.join(site_dir, f'site{site_id}.log')
+        self.process = None
+        self.conn = None
+        self.staged = None
+        self.failed_values = None
+
+        if checkpoint != None:
+            self.status, self.last_fail_timestamp, self.last_recover_timestamp = checkpoint.site_state(
+                site_id)
+            self.readable_variables = checkpoint.readable(site_id)
+        else:
+            self.readable_variables = Readable_Bitmap(config.num_variables) if config.compact else set()
+            self.readable_variables.update(config.replicated_items)
+            self.readable_variables.update(config.local_items[site_id])
+
+        # a site restored as failed has no process until it recovers, and nothing was written to it yet
+        if self.status == "normal":
+            self.start(True)
+        elif os.path.exists(self.log_path):
+            os.remove(self.log_path)
+
+    def start(self, fresh):
+        """Starts the process of the site
+
+        Parameters:
+            fresh (bool): whether the site starts with the database or restarts after a failure
+        """
+
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=Site_Worker.main,
+            args=(self.site_id, self.config, child, self.log_path, fresh),
+            daemon=True)
+        self.process.start()
+        child.close()
+
+    def value(self, item_id):
+        # value of an item at this site
+        if self.process == None:
+            return self.stored_values()[item_id]
+        self.conn.send(("read", item_id))
+        return self.conn.recv()
+
+    def stored_values(self):
+        # values of the items of the failed site. They are in its log, a short-lived process reads them once
+        if self.failed_values == None:
+            self.start(False)
+            self.conn.send(("read_all", ))
+            self.failed_values = dict(self.conn.recv())
+            self.stop()
+        return self.failed_values
+
+    def dump_site(self, sink):
+        # dump info of this site
+        if self.process == None:
+            values = list(self.stored_values().items())
+        else:
+            self.conn.send(("read_all", ))
+            values = self.conn.recv()
+        sink.emit("dump_site", self.site_id, values)
+
+    def mark_readable(self, batch):
+        # makes the items of a written batch readable, returns the IDs of the items that were not readable before
+        readable_variables = self.readable_variables
+        became_readable = []
+        for item_id, _ in batch:
+            if item_id not in readable_variables:
+                readable_variables.add(item_id)
+                became_readable.append(item_id)
+        return became_readable
+
+    def apply(self, batch):
+        """Writes committed values without a vote, like a log replayed on restart. The process writes them while the caller goes on
+
+        Parameters:
+            batch (list(tuple(int, int))): (item ID, new value) of the items written
+
+        Return:
+            list(int) of the IDs of the items that were not readable before
+        """
+
+        self.conn.send(("apply", batch))
+        return self.mark_readable(batch)
+
+    def prepare(self, txn_id, batch):
+        """First phase of two-phase commit: sends the batch of a transaction to the site. The vote is collected by vote(),
+        so the sites of a transaction are prepared together
+
+        Parameters:
+            txn_id (int): ID of transaction
+            batch (list(tuple(int, int))): (item ID, new value) of the items the transaction writes at the site
+        """
+
+        self.staged = (txn_id, batch)
+        try:
+            self.conn.send(("prepare", txn_id, batch))
+        except (OSError, ValueError):
+            pass
+
+    def vote(self):
+        # the site's vote on the prepared transaction, False if its process is gone
+        try:
+            return self.conn.recv() == True
+        except (EOFError, OSError, ValueError):
+            return False
+
+    def commit(self, txn_id):
+        """Second phase of two-phase commit: the site writes the prepared batch. The process writes it while the caller goes on
+
+        Parameters:
+            txn_id (int): ID of transaction
+
+        Return:
+            list(int) of the IDs of the items that were not readable before
+        """
+
+        batch = self.staged[1]
+        self.staged = None
+        self.conn.send(("commit", txn_id))
+        return self.mark_readable(batch)
+
+    def abort(self, txn_id):
+        # the prepared transaction aborts, the site drops its batch
+        if self.staged == None or self.staged[0] != txn_id:
+            return
+        self.staged = None
+        if self.process != None:
+            try:
+                self.conn.send(("abort", txn_id))
+            except (OSError, ValueError):
+                pass
+
+    def fail(self, ts):
+        """Fails a site: its process is killed and readable_variables is wiped out. The Lock_Manager wipes out the locks at the site
+
+        Parameters:
+            ts (int): time of site failure
+        """
+
+        self.status = "failed"
+        self.last_fail_timestamp = ts
+        self.readable_variables.clear()
+        self.staged = None
+        self.failed_values = None
+
+        if self.process != None:
+            # what was committed before the failure is in the site's log
+            self.sync()
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+            self.process = None
+            self.conn = None
+
+    def recover(self, ts):
+        """Recovers a site: a new process rebuilds the values from the site's log, and unreplicated items are readable again.
+        Replicated items need to wait for committed write to happen, except with quorums.
+
+        Parameters:
+            ts (int): time of site recovery
+        """
+
+        self.status = "normal"
+        self.readable_variables.update(self.config.local_items[self.site_id])
+        if self.config.read_quorum != None:
+            self.readable_variables.update(self.config.replicated_items)
+        self.last_recover_timestamp = ts
+        self.failed_values = None
+        if self.process == None:
+            self.start(False)
+
+    def sync(self):
+        # waits until the process has handled every message sent to it, False if the process is gone
+        try:
+            self.conn.send(("sync", ))
+            return self.conn.recv() == True
+        except (EOFError, OSError, ValueError):
+            return False
+
+    def stop(self):
+        # stops the process of the site, waiting for it to write what it was sent
+        if self.process == None:
+            return
+        try:
+            self.conn.send(("stop", ))
+        except (OSError, ValueError):
+            pass
+        self.process.join()
+        self.conn.close()
+        self.process = None
+        self.conn = None
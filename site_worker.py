@@ -0,0 +1,106 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+import json
+import os
+from one_site import Site
+from checkpoint import Checkpoint
+
+
+class Site_Worker(object):
+    """
+    Site_Worker runs in the process of one site and keeps the values of its items. It answers the messages of the
+    Site_Process standing for it in the Site_Manager, one at a time in the order they were sent:
+
+        ("read", item_id)            -> value of the item
+        ("read_all",)                -> list of (item_id, value) of every item at the site
+        ("prepare", txn_id, batch)   -> True once the batch is staged, the site's vote
+        ("commit", txn_id)           -> nothing, writes the staged batch
+        ("abort", txn_id)            -> nothing, drops the staged batch
+        ("apply", batch)             -> nothing, writes a batch that needs no vote, like a log replayed on restart
+        ("sync",)                    -> True once every message sent before has been handled
+        ("stop",)                    -> nothing, the process exits
+
+    Every written batch is appended to the site's own log, so a site whose process was killed by a failure comes back
+    with the values it had.
+
+    Attributes:
+        site (Site Object): values of the items at the site. Its status and readable items are kept by the Site_Process
+        conn (Connection Object): pipe to the Site_Process
+        log (file object): the site's log of written batches, one JSON list per line
+        staged (tuple(int, list)): transaction ID and batch of the prepared transaction, None if there is none
+    """
+    def __init__(self, site_id, config, conn, log_path, fresh):
+        '''
+        Constructor
+
+        Parameters:
+            site_id (int): ID of site
+            config (Config Object): size and item placement of the database
+            conn (Connection Object): pipe to the Site_Process
+            log_path (string): path of the site's log
+            fresh (bool): whether the site starts with the database, so an old log is dropped, or restarts after a failure
+        '''
+        checkpoint = None
+        if config.checkpoint_path != None and os.path.exists(config.checkpoint_path):
+            checkpoint = Checkpoint(config.checkpoint_path, config)
+
+        self.site = Site(site_id, config, checkpoint)
+        self.conn = conn
+        self.staged = None
+
+        if not fresh and os.path.exists(log_path):
+            with open(log_path) as f:
+                for line in f:
+                    self.site.apply(json.loads(line))
+        self.log = open(log_path, "w" if fresh else "a")
+
+    def write(self, batch):
+        # writes a batch to the site and to its log. The log is flushed, a killed process doesn't lose what the OS has
+        self.site.apply(batch)
+        self.log.write(json.dumps(batch) + "\n")
+        self.log.flush()
+
+    def run(self):
+        # answers messages until told to stop
+        site = self.site
+        conn = self.conn
+        while True:
+            message = conn.recv()
+            op = message[0]
+
+            if op == "read":
+                conn.send(site.value(message[1]))
+
+            elif op == "read_all":
+                conn.send([(i, site.value(i)) for i in site.config.site_items(site.site_id)])
+
+            elif op == "prepare":
+                self.staged = (message[1], message[2])
+                conn.send(True)
+
+            elif op == "commit":
+                if self.staged != None and self.staged[0] == message[1]:
+                    self.write(self.staged[1])
+                self.staged = None
+
+            elif op == "abort":
+                self.staged = None
+
+            elif op == "apply":
+                self.write(message[1])
+
+            elif op == "sync":
+                conn.send(True)
+
+            elif op == "stop":
+                self.log.close()
+                return
+
+    @staticmethod
+    def main(site_id, config, conn, log_path, fresh):
+        # entry point of a site process
+        Site_Worker(site_id, config, conn, log_path, fresh).run()
@@ -0,0 +1,100 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+import sys
+from event_sink import Event_Sink
+
+
+class Text_Sink(Event_Sink):
+    """
+    Text_Sink writes events as the lines the program has always printed. Events are kept unformatted until
+    buffer_size of them are waiting, then they are formatted and written with one write call.
+
+    Attributes:
+        stream (file object): where the lines are written, None for whatever sys.stdout is at the time of the write
+        buffer_size (int): number of events kept before writing. 0 writes every event as it arrives
+        pending (list(tuple)): (event, fields) of the events not written yet
+    """
+    FORMATS = {
+        "tick": lambda tick, instruction: f'tick {tick}: {instruction}',
+        "invalid": lambda: "invalid instruction",
+        "read": lambda item_id, value: f'x{item_id}: {value}',
+        "range_read": lambda values: ", ".join(f'x{item_id}: {value}' for item_id, value in values),
+        "multi_read": lambda values: ", ".join(f'x{item_id}: {value}' for item_id, value in values),
+        "write": lambda txn_id, item_id, value: f'Transaction {txn_id} writes {value} to x{item_id}',
+        "multi_write": lambda txn_id, values:
+            f'Transaction {txn_id} writes ' + ", ".join(f'{value} to x{item_id}' for item_id, value in values),
+        "checkpoint": lambda path, tick: f'Checkpoint written to {path} at tick {tick}',
+        "already_ended": lambda txn_id, status: f'Transaction {txn_id} has already been {status}',
+        "commit": lambda txn_id: f'Transaction {txn_id} commits.',
+        "commit_read_only": lambda txn_id: f'Transaction {txn_id} commits',
+        "abort": lambda txn_id: f'Transaction {txn_id} aborts.',
+        "resume": lambda txn_id: f'Resume Transaction {txn_id}',
+        "cycle": lambda txns: f'Cycle detected in Transactions {txns}',
+        "kill": lambda txn_id: f'Killing the youngest Transaction {txn_id}\n',
+        "prevent": lambda txn_id, policy, txns: f'Aborting Transaction {txn_id} by {policy.replace("_", "-")}, it conflicts with Transactions {txns}\n',
+        "state": lambda txns: "Transaction State:" + "".join(f'\nT{txn_id}: {status}' for txn_id, status in txns),
+        "wait_shared": lambda txn_id, item_id, blocking, waits_for:
+            f'Transaction {txn_id} fails to acquire shared lock because Transaction {blocking} currently locked x{item_id}. It needs to wait for Transactions {waits_for}.',
+        "wait_exclusive": lambda txn_id, item_id, blocking, waits_for:
+            f'Transaction {txn_id} fails to acquire exclusive lock because Transactions {blocking} currently locked x{item_id}. It needs to wait for Transactions {waits_for}.',
+        "wait_exclusive_range": lambda txn_id, low, high, blocking, waits_for:
+            f'Transaction {txn_id} fails to acquire exclusive lock because Transactions {blocking} currently locked x{low} to x{high}. It needs to wait for Transactions {waits_for}.',
+        "wait_range": lambda txn_id, low, high, item_id, blocking, waits_for:
+            f'Transaction {txn_id} fails to acquire shared lock for x{low} to x{high} because Transaction {blocking} currently locked x{item_id}. It needs to wait for Transactions {waits_for}.',
+        "wait_site_lock": lambda txn_id, access, site_id, blocking, waits_for:
+            f'Transaction {txn_id} fails to acquire {access} lock because Transaction {blocking} currently locked Site {site_id}. It needs to wait for Transactions {waits_for}.',
+        "unavailable_read": lambda txn_id, item_id:
+            f'Transaction {txn_id} is not able to acquire shared lock for x{item_id} either due to site failure or the data item not updated.',
+        "unavailable_write": lambda txn_id, item_id:
+            f'Transaction {txn_id} is not able to acquire exclusive lock for x{item_id} due to site failure.',
+        "unserved_read": lambda txn_id, item_id:
+            f'Transaction {txn_id} waits because no site can serve the read of x{item_id}.',
+        "unserved_write": lambda txn_id, item_id:
+            f'Transaction {txn_id} waits because no site can serve the write of x{item_id}.',
+        "escalate": lambda txn_id, site_id, access:
+            f'Transaction {txn_id} escalates its locks at Site {site_id} to {"an exclusive" if access == "exclusive" else "a shared"} site lock.',
+        "site_failed": lambda site_id, txn_id: f'Site {site_id} has failed after Transaction {txn_id} obtained lock.',
+        "doomed": lambda txn_id, site_id:
+            f'Transaction {txn_id} can\'t go on because Site {site_id} has failed after it obtained lock. It will abort at its end.',
+        "stale_read": lambda txn_id, item_id:
+            f'Transaction {txn_id} fails validation because x{item_id} was committed by another transaction after it was read.',
+        "snapshot_wait": lambda txn_id, item_id:
+            f'Transaction {txn_id} cannot read x{item_id} from its snapshot because it\'s not available in any site. It will need to wait.',
+        "dump_site": lambda site_id, values: f'Site {site_id} - ' + ", ".join(f'x{item_id}: {value}' for item_id, value in values),
+    }
+
+    enabled = True
+
+    def __init__(self, stream=None, buffer_size=0):
+        '''
+        Constructor
+
+        Parameters:
+            stream (file object): where the lines are written, None for sys.stdout
+            buffer_size (int): number of events kept before writing. 0 writes every event as it arrives
+        '''
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.pending = []
+
+    def emit(self, event, *fields):
+        self.pending.append((event, fields))
+        if len(self.pending) > self.buffer_size:
+            self.flush()
+
+    def format(self, event, fields):
+        # the line of an event
+        return self.FORMATS[event](*fields)
+
+    def flush(self):
+        if len(self.pending) == 0:
+            return
+
+        lines = [self.format(event, fields) for event, fields in self.pending]
+        self.pending = []
+        stream = self.stream if self.stream != None else sys.stdout
+        stream.write("\n".join(lines) + "\n")
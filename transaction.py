@@ -11,10 +11,13 @@ class Transaction(object):
     
     Attributes:
         id (int): ID of transaction
-        current_instruction (string): current instruction that it's running
+        current_instruction (Instruction Object): current instruction that it's running
         timestamp (int): timestamp of when the transaction started
-        status (string): status of transaction - "running"/"blocked"/"committed"/"aborted"
+        status (string): status of transaction - "running"/"blocked"/"doomed"/"committed"/"aborted"
+        bulk_done (list(tuple(int, int))): (item ID, value) of the items the current MR or MW instruction has read or written so far, so it resumes from where it blocked. None outside of one
     """
+    __slots__ = ("id", "current_instruction", "timestamp", "status", "bulk_done")
+
     def __init__(self, t_id, ts):
         '''
         Constructor
@@ -24,9 +27,10 @@ class Transaction(object):
             ts (int): Timestamp of when the transaction began
         '''
         self.id = t_id
-        self.current_instruction = ""
+        self.current_instruction = None
         self.timestamp = ts
         self.status = "running"
+        self.bulk_done = None
 
 
 class ReadWrite_Transaction(Transaction):
@@ -35,14 +39,19 @@ class ReadWrite_Transaction(Transaction):
     
     Attributes:
         id (int) --- ID of transaction
-        current_instruction (string) --- current instruction that it's running
+        current_instruction (Instruction Object) --- current instruction that it's running
         timestamp (int) --- timestamp of when the transaction started
-        status (string) --- status of transaction - "running"/"blocked"/"committed"/"aborted"
+        status (string) --- status of transaction - "running"/"blocked"/"doomed"/"committed"/"aborted". A doomed transaction accessed a site that failed, it only waits for its end to abort
         transaction_type (string) --- Type of transaction
-        locks_holding (list (Locks Object) ) --- List of Lock objects the transaction holds
         cache (dict (int: tuple) ) ---  timestamp: (read/write actions)
         uncommit_values (dict (int: int)) --- item_id: the uncommitted newest value
+        write_sites (dict (int: set(int))) --- item_id: IDs of the sites the transaction locked to write the item
+        first_access (dict (int: int)) --- site_id: timestamp of the transaction's earliest access to the site
+        read_versions (dict (int: int)) --- item_id: tick of the last commit of the item when the transaction first read it, under optimistic concurrency control
     """
+    __slots__ = ("transaction_type", "cache", "uncommit_values", "write_sites",
+                 "first_access", "read_versions")
+
     def __init__(self, t_id, ts):
         '''
         Constructor
@@ -54,9 +63,49 @@ class ReadWrite_Transaction(Transaction):
 
         super().__init__(t_id, ts)
         self.transaction_type = "read_write"
-        self.locks_holding = []
         self.cache = {}
         self.uncommit_values = {}
+        self.write_sites = {}
+        self.first_access = {}
+        self.read_versions = {}
+
+    def touch(self, sites, ts):
+        """Records an access to some sites, only the earliest access to each site is kept
+
+        Parameters:
+            sites (list(int)): IDs of the sites accessed
+            ts (int): time of the access
+        """
+
+        for s in sites:
+            if s not in self.first_access:
+                self.first_access[s] = ts
+
+    def add_read(self, item_id, version):
+        """Adds an item to the read set. Only the version seen by the first read of each item is kept
+
+        Parameters:
+            item_id (int): ID of item read
+            version (int): tick of the last commit of the item when it was read
+        """
+
+        if item_id not in self.read_versions:
+            self.read_versions[item_id] = version
+
+    def add_write(self, item_id, new_value, sites):
+        """Adds a write to the write set. A later write of the same item replaces the value of an earlier one
+
+        Parameters:
+            item_id (int): ID of item written
+            new_value (int): new value of the item
+            sites (list(int)): IDs of the sites the transaction locked to write the item
+        """
+
+        self.uncommit_values[item_id] = new_value
+        if item_id in self.write_sites:
+            self.write_sites[item_id].update(sites)
+        else:
+            self.write_sites[item_id] = set(sites)
 
 
 class ReadOnly_Transaction(Transaction):
@@ -65,12 +114,13 @@ class ReadOnly_Transaction(Transaction):
 
     Attributes:
         id (int) --- ID of transaction
-        current_instruction (string) --- current instruction that it's running
+        current_instruction (Instruction Object) --- current instruction that it's running
         timestamp (int) --- timestamp of when the transaction started
         status (string) --- status of transaction - "running"/"blocked"/"committed"/"aborted"
         transaction_type (string) --- Type of transaction
-        snapshot (dict (int: int) ) --- snapshot of database when this ReadOnly_Transaction begins. {item id: item value}
     """
+    __slots__ = ("transaction_type", )
+
     def __init__(self, t_id, ts):
         '''
         Constructor
@@ -82,4 +132,3 @@ class ReadOnly_Transaction(Transaction):
 
         super().__init__(t_id, ts)
         self.transaction_type = "read_only"
-        self.snapshot = {}
@@ -4,8 +4,13 @@ Created on Nov 26, 2019
 @author: Ian Lam, Yu Ting Chiu
 '''
 
+from time import perf_counter
 from transaction import ReadWrite_Transaction, ReadOnly_Transaction
 from site_manager import Site_Manager
+from config import Config
+from instruction import Instruction
+from text_sink import Text_Sink
+from metrics import Metrics
 
 
 class Transaction_Manager(object):
@@ -13,21 +18,38 @@ class Transaction_Manager(object):
     Transaction_Manager is responsible for parsing inputs and delegating any operation that requires site interaction to the site manager.
     
     Attributes:
+        config (Config Object): size and item placement of the database
         txns (dict(int: Transaction Object) ): mapping of transaction_id to transaction object
         tick (int): clock for the Transaction_Manager
         site_manager (Site_Manager Object): site_manager that handles data item operations and site events
+        sink (Event_Sink Object): receives everything the Transaction_Manager and the Site_Manager report
+        metrics (Metrics Object): receives the measurements of the Transaction_Manager and the Site_Manager
+        defer_sync (bool): whether the caller syncs the write-ahead log before it reports anything, like the server. Otherwise every commit is synced before it's reported
+        doomed (dict(int: int) ): transaction ID: ID of the failed site, of the transactions eager_abort "end" aborted that haven't reached their end
 
     """
-    def __init__(self):
+    def __init__(self, config=None, sink=None, metrics=None):
         '''
         Constructor
+
+        Parameters:
+            config (Config Object): size and item placement of the database. Defaults to 10 sites and 20 variables
+            sink (Event_Sink Object): receives the output. Defaults to a Text_Sink writing every event to standard output
+            metrics (Metrics Object): receives the measurements. Defaults to a disabled Metrics that records nothing
         '''
+        self.config = config if config is not None else Config()
+        self.sink = sink if sink is not None else Text_Sink()
+        self.metrics = metrics if metrics is not None else Metrics()
         self.txns = {}
-        self.tick = -1
-        self.site_manager = Site_Manager()
+        self.doomed = {}
+        self.defer_sync = False
+        self.site_manager = Site_Manager(self.config, self.sink, self.metrics)
+
+        # a restored database continues the clock of the run it was restored from
+        self.tick = self.site_manager.restored_tick
 
     def read_instruction(self, instr):
-        """ Reads instructions and translates to a corresponding Transaction_Manager method
+        """ Parses an instruction and runs it
     
         Parameters:
             instr (string): Instruction received from input file or standard input
@@ -36,52 +58,89 @@ class Transaction_Manager(object):
             Each time this function is called, the clock of the Transaction_Manager increases by 1
         """
 
+        self.run_instruction(Instruction.parse(instr))
+
+    def run_instruction(self, instr):
+        """ Runs a new instruction at the next tick
+    
+        Parameters:
+            instr (Instruction Object): Instruction received from input file or standard input
+            
+        Side Effect:
+            Each time this function is called, the clock of the Transaction_Manager increases by 1
+        """
+
+        # the previous tick is over, the commits it logged can be flushed and recovered sites copy a batch of items
+        self.site_manager.sync_log()
+        self.site_manager.catch_up()
+
         self.tick += 1
-        print(f'tick {self.tick}: {instr}')
+        self.sink.emit("tick", self.tick, instr.text)
+
+        if not self.metrics.enabled:
+            self.dispatch(instr)
+            return
+
+        self.metrics.start_tick(self.tick)
+        self.dispatch(instr)
+        self.metrics.end_tick()
+
+    def dispatch(self, instr):
+        """ Translates an instruction to the corresponding Transaction_Manager method
+    
+        Parameters:
+            instr (Instruction Object): Instruction to run
+        """
 
-        instr = instr.replace(" ", "")
-        instruction = instr[:-1].split("(")
-        op = instruction[0]
-        arg = instruction[1]
+        op = instr.op
         if op == 'begin':
-            txn = arg[1:]
-            self.begin(instr, int(txn))
+            self.begin(instr, instr.txn_id)
 
         elif op == 'beginRO':
-            txn = arg[1:]
-            self.beginRO(instr, int(txn))
+            self.beginRO(instr, instr.txn_id)
 
         elif op == 'R':
-            txn, item = arg.split(",")
-            self.read(instr, int(txn[1:]), int(item[1:]))
+            self.read(instr, instr.txn_id, instr.args[0])
+
+        elif op == 'RS':
+            self.range_read(instr, instr.txn_id, instr.args[0], instr.args[1])
 
         elif op == 'W':
-            txn, item, new_value = arg.split(",")
-            self.write(instr, int(txn[1:]), int(item[1:]), int(new_value))
+            self.write(instr, instr.txn_id, instr.args[0], instr.args[1])
+
+        elif op == 'MR':
+            self.multi_read(instr, instr.txn_id, instr.args)
+
+        elif op == 'MW':
+            self.multi_write(instr, instr.txn_id, instr.args)
 
         elif op == 'fail':
-            site_id = int(arg)
-            self.fail(int(site_id))
+            self.fail(instr.args[0])
 
         elif op == 'recover':
-            site_id = int(arg)
-            self.recover(int(site_id))
+            self.recover(instr.args[0])
 
         elif op == 'end':
-            txn = arg
-            self.end(instr, int(txn[1:]))
+            self.end(instr, instr.txn_id)
 
         elif op == 'dump':
             self.dump()
 
+        elif op == 'checkpoint':
+            self.checkpoint(instr.args[0])
+
         else:
-            print("invalid instruction")
+            self.sink.emit("invalid")
+
+        # a lock conflict under deadlock prevention may have chosen transactions to abort
+        if len(self.site_manager.victims) > 0:
+            self.abort_victims()
 
     def begin(self, instr, txn_id):
         """ Begins a read-write transaction and adds the new Transaction Object to txns
     
         Parameters:
-            instr (string): The original instruction string.
+            instr (Instruction Object): The parsed instruction.
             txn_id (int): ID of transaction
         
         """
@@ -89,12 +148,13 @@ class Transaction_Manager(object):
         txn = ReadWrite_Transaction(txn_id, self.tick)
         txn.current_instruction = instr
         self.txns[txn_id] = txn
+        self.site_manager.begin(txn)
 
     def beginRO(self, instr, txn_id):
-        """Begins a read-only transaction, adds the new Transaction Object to txns, acquires snapshot of database
+        """Begins a read-only transaction, adds the new Transaction Object to txns, starts its snapshot of database
     
         Parameters:
-            instr (string): The original instruction string.
+            instr (Instruction Object): The parsed instruction.
             txn_id (int): ID of transaction
             
         """
@@ -103,62 +163,217 @@ class Transaction_Manager(object):
         txn.current_instruction = instr
         self.txns[txn_id] = txn
 
-        # acquire snapshot from site manager
-        txn.snapshot = self.site_manager.acquire_snapshot(txn_id)
-
-        if txn.snapshot == None:
-            txn.status = "blocked"
+        # the snapshot is the database as of this tick, site manager resolves it lazily on reads
+        self.site_manager.begin_snapshot(txn)
 
     def read(self, instr, txn_id, item_id):
-        """ If transaction is ReadWrite, asks Site_Manager to acquire shared lock for item, if successful then read item from database
+        """ If transaction is ReadWrite, asks Site_Manager to acquire shared lock for item, if successful then read item from database.
+        Under optimistic concurrency control it reads without a lock
         If transaction is ReadOnly, read from snapshot
     
         Parameters:
-            instr (string): The original instruction string.
+            instr (Instruction Object): The parsed instruction.
             txn_id (int): ID of transaction
             item_id (int): ID of item to be read
         """
 
         txn = self.txns[txn_id]
+        if self.rejected(txn):
+            return
         txn.current_instruction = instr
 
-        if txn.transaction_type == "read_write":
+        if txn.transaction_type == "read_write" and self.config.concurrency_control == "optimistic":
+            self.read_optimistic(txn, item_id)
+
+        elif txn.transaction_type == "read_write":
             # go acquire shared lock from site manager
-            share_lock = self.site_manager.acquire_share_lock(txn_id, item_id)
+            share_lock = self.timed_acquire("share", txn_id, self.site_manager.acquire_share_lock, txn_id, item_id)
 
             if share_lock != None:
-                # check if the returned lock is one that transaction already has (due to lock promotion)
-                if share_lock not in self.txns[txn_id].locks_holding:
-                    self.txns[txn_id].locks_holding.append(share_lock)
-
-                # check if transaction is reading from an item it has written earlier
-                if item_id in txn.uncommit_values:
-                    read_item_value = txn.uncommit_values[item_id]
-                else:
-                    read_item_value = share_lock.item_locked.value
-
-                print(f'x{item_id}: {read_item_value}')
+                read_item_value, read_sites = self.locked_value(txn, item_id, share_lock)
+                self.sink.emit("read", item_id, read_item_value)
 
                 # add this operation to the transaction's cache
                 txn.cache[self.tick] = [
-                    "read", (item_id, read_item_value, [share_lock.site_id])
+                    "read", (item_id, read_item_value, read_sites)
                 ]
+                self.site_manager.touch(txn, read_sites, self.tick)
 
             else:
                 txn.status = "blocked"
 
         if txn.transaction_type == "read_only":
             # read from snapshot
-            read_item_value = txn.snapshot[item_id]
+            read_item_value = self.site_manager.read_snapshot(txn, item_id)
             if read_item_value != None:
-                print(f'x{item_id}: {read_item_value}')
+                self.sink.emit("read", item_id, read_item_value)
+            else:
+                txn.status = "blocked"
+                if self.metrics.enabled:
+                    self.metrics.begin_wait(txn_id, "failure", self.tick)
+
+    def rejected(self, txn):
+        """ Rejects an operation of a transaction that has ended, or that is doomed by a site failure
+
+        Parameters:
+            txn (Transaction Object): transaction of the operation
+
+        Return:
+            boolean for whether the operation was rejected
+        """
+
+        if txn.status == "committed" or txn.status == "aborted":
+            # a killed transaction takes no more locks
+            self.sink.emit("already_ended", txn.id, txn.status)
+            return True
+        if txn.status == "doomed":
+            # a site it accessed failed, it takes no more locks and aborts at its end
+            self.sink.emit("doomed", txn.id, self.doomed[txn.id])
+            return True
+        return False
+
+    def locked_value(self, txn, item_id, share_lock):
+        """ Value of an item read by a read-write transaction holding a shared lock on it
+    
+        Parameters:
+            txn (Transaction Object): Read-write transaction
+            item_id (int): ID of item read
+            share_lock (Lock Object): the lock acquire_share_lock returned
+
+        Return:
+            (value, IDs of the sites the read relies on)
+        """
+
+        # check if transaction is reading from an item it has written earlier
+        if item_id in txn.uncommit_values:
+            read_item_value = txn.uncommit_values[item_id]
+        else:
+            read_item_value = self.site_manager.read_value(
+                share_lock.site_id, item_id)
+
+        # a read under quorums relies on every site of its quorum
+        read_sites = [share_lock.site_id]
+        if self.config.is_quorum(item_id):
+            read_sites = self.site_manager.read_sites(txn.id, item_id)
+        return read_item_value, read_sites
+
+    def unlocked_value(self, txn, item_id):
+        """ Value of an item read by a read-write transaction under optimistic concurrency control. No lock is taken, the version
+        of the item read is kept so that end can check no other transaction committed it since
+    
+        Parameters:
+            txn (Transaction Object): Read-write transaction
+            item_id (int): ID of item read
+
+        Return:
+            (value, IDs of the sites the read relies on), None if no site can serve the item. The transaction is then blocked
+        """
+
+        # a transaction reading an item it has written earlier needs no site
+        if item_id in txn.uncommit_values:
+            return txn.uncommit_values[item_id], []
+
+        site_id = self.site_manager.locate_read(txn.id, item_id)
+        if site_id == None:
+            txn.status = "blocked"
+            if self.metrics.enabled:
+                self.metrics.begin_wait(txn.id, "failure", self.tick)
+            return None
+
+        txn.add_read(item_id, self.site_manager.commit_version(item_id))
+        return self.site_manager.read_value(site_id, item_id), [site_id]
+
+    def read_optimistic(self, txn, item_id):
+        """ Reads an item for a read-write transaction under optimistic concurrency control
+    
+        Parameters:
+            txn (Transaction Object): Read-write transaction
+            item_id (int): ID of item to be read
+        """
+
+        read = self.unlocked_value(txn, item_id)
+        if read == None:
+            return
+
+        read_item_value, read_sites = read
+        self.sink.emit("read", item_id, read_item_value)
+
+        # add this operation to the transaction's cache
+        txn.cache[self.tick] = [
+            "read", (item_id, read_item_value, read_sites)
+        ]
+        self.site_manager.touch(txn, read_sites, self.tick)
+
+    def range_read(self, instr, txn_id, low, high):
+        """ If transaction is ReadWrite, asks Site_Manager to acquire range locks for the items from low to high, if successful then read them from database.
+        Under optimistic concurrency control it reads them without locks
+        If transaction is ReadOnly, read them from snapshot
+    
+        Parameters:
+            instr (Instruction Object): The parsed instruction.
+            txn_id (int): ID of transaction
+            low (int): ID of the first item to be read
+            high (int): ID of the last item to be read
+        """
+
+        txn = self.txns[txn_id]
+        if self.rejected(txn):
+            return
+        txn.current_instruction = instr
+
+        if low < 1 or low > high or high > self.config.num_variables:
+            self.sink.emit("invalid")
+            return
+
+        values = []
+        optimistic = self.config.concurrency_control == "optimistic"
+        if txn.transaction_type == "read_write":
+            # go acquire range locks from site manager, or read without them
+            if optimistic:
+                reads = self.site_manager.locate_range(txn_id, low, high)
+            else:
+                reads = self.timed_acquire("range", txn_id, self.site_manager.acquire_range_lock, txn_id, low, high)
+            if reads == None:
+                txn.status = "blocked"
+                if optimistic and self.metrics.enabled:
+                    self.metrics.begin_wait(txn_id, "failure", self.tick)
+                return
+
+            touched_sites = set()
+            for item_id, read_item_value, site_ids in reads:
+                # check if transaction is reading from an item it has written earlier
+                if item_id in txn.uncommit_values:
+                    read_item_value = txn.uncommit_values[item_id]
+                elif optimistic:
+                    txn.add_read(item_id, self.site_manager.commit_version(item_id))
+                values.append((item_id, read_item_value))
+                touched_sites.update(site_ids)
+
+            # add this operation to the transaction's cache
+            txn.cache[self.tick] = [
+                "read", ((low, high), values, sorted(touched_sites))
+            ]
+            self.site_manager.touch(txn, touched_sites, self.tick)
+
+        if txn.transaction_type == "read_only":
+            # read from snapshot
+            for item_id in range(low, high + 1):
+                read_item_value = self.site_manager.read_snapshot(txn, item_id)
+                if read_item_value == None:
+                    txn.status = "blocked"
+                    if self.metrics.enabled:
+                        self.metrics.begin_wait(txn_id, "failure", self.tick)
+                    return
+                values.append((item_id, read_item_value))
+
+        self.sink.emit("range_read", values)
 
     def write(self, instr, txn_id, item_id, new_value):
-        """ Acquires exclusive locks for the data item. If successful, records this action to transaction's cache
+        """ Acquires exclusive locks for the data item, or only finds the sites to write under optimistic concurrency control. If successful, records this action to transaction's cache
         This doesn't actually write to the actual database, since we only write when we can commit
 
         Parameters:
-            instr (string): The original instruction string.
+            instr (Instruction Object): The parsed instruction.
             txn_id (int): ID of transaction
             item_id (int): ID of item to be written
             new_value (int): new value of item
@@ -166,32 +381,202 @@ class Transaction_Manager(object):
 
 
         txn = self.txns[txn_id]
+        if self.rejected(txn):
+            return
         txn.current_instruction = instr
 
-        # go acquire exclusive locks for the item
-        exclusive_locks = self.site_manager.acquire_exclusive_lock(
-            txn_id, item_id)
-        if len(exclusive_locks) > 0:
+        if self.config.concurrency_control == "optimistic":
+            # no lock, the write goes to every site holding the item that is up
+            locked_sites = self.site_manager.writable_sites(txn_id, item_id)
+            if len(locked_sites) == 0 and self.metrics.enabled:
+                self.metrics.begin_wait(txn_id, "failure", self.tick)
+        else:
+            # go acquire exclusive locks for the item
+            exclusive_locks = self.timed_acquire("exclusive", txn_id, self.site_manager.acquire_exclusive_lock,
+                                                 txn_id, item_id)
 
             # for each exclusive lock returned, record down the sites
             locked_sites = []
             for l in exclusive_locks:
-                if l not in txn.locks_holding:
-                    txn.locks_holding.append(l)
                 locked_sites.append(l.site_id)
 
-            # add this new uncommitted value to transaction's uncommitted values dictionary
-            txn.uncommit_values[item_id] = new_value
+        if len(locked_sites) > 0:
+
+            # add this new uncommitted value to transaction's write set
+            txn.add_write(item_id, new_value, locked_sites)
 
             # add this operation to the transaction's cache
             txn.cache[self.tick] = [
                 "write", (item_id, new_value, locked_sites)
             ]
+            self.site_manager.touch(txn, locked_sites, self.tick)
             
-            print(f'Transaction {txn_id} writes {new_value} to x{item_id}')
+            self.sink.emit("write", txn_id, item_id, new_value)
         else:
             txn.status = "blocked"
 
+    def multi_read(self, instr, txn_id, item_ids):
+        """ Reads several items in one instruction. A read-write transaction locks them in increasing order with one call to
+        the Site_Manager and stops at the first it has to wait for. When it resumes, it goes on from that item.
+        The values are reported together once every item is read
+    
+        Parameters:
+            instr (Instruction Object): The parsed instruction.
+            txn_id (int): ID of transaction
+            item_ids (tuple(int)): IDs of items to be read, in increasing order
+        """
+
+        txn = self.txns[txn_id]
+        if self.rejected(txn):
+            return
+        # a resumed instruction goes on from where it blocked, a new one starts over
+        if txn.current_instruction is not instr or txn.bulk_done == None:
+            txn.bulk_done = []
+        txn.current_instruction = instr
+
+        if item_ids[0] < 1 or item_ids[-1] > self.config.num_variables:
+            self.sink.emit("invalid")
+            return
+
+        done = txn.bulk_done
+        remaining = item_ids[len(done):]
+
+        if txn.transaction_type == "read_write":
+            values = []
+            touched_sites = set()
+            if self.config.concurrency_control == "optimistic":
+                for item_id in remaining:
+                    read = self.unlocked_value(txn, item_id)
+                    if read == None:
+                        break
+                    values.append((item_id, read[0]))
+                    touched_sites.update(read[1])
+            else:
+                # go acquire shared locks from site manager, in one call
+                share_locks = self.timed_acquire("bulk_share", txn_id, self.site_manager.acquire_share_locks,
+                                                 txn_id, remaining)
+
+                for item_id, share_lock in zip(remaining, share_locks):
+                    read_item_value, read_sites = self.locked_value(txn, item_id, share_lock)
+                    values.append((item_id, read_item_value))
+                    touched_sites.update(read_sites)
+                if len(share_locks) < len(remaining):
+                    txn.status = "blocked"
+
+            if len(values) > 0:
+                # add the items read at this tick to the transaction's cache
+                txn.cache[self.tick] = [
+                    "read", (tuple(item_id for item_id, _ in values), values, sorted(touched_sites))
+                ]
+                self.site_manager.touch(txn, touched_sites, self.tick)
+                done.extend(values)
+
+        if txn.transaction_type == "read_only":
+            # read from snapshot
+            for item_id in remaining:
+                read_item_value = self.site_manager.read_snapshot(txn, item_id)
+                if read_item_value == None:
+                    txn.status = "blocked"
+                    if self.metrics.enabled:
+                        self.metrics.begin_wait(txn_id, "failure", self.tick)
+                    break
+                done.append((item_id, read_item_value))
+
+        if len(done) == len(item_ids):
+            txn.bulk_done = None
+            self.sink.emit("multi_read", done)
+
+    def multi_write(self, instr, txn_id, new_values):
+        """ Writes several items in one instruction. Exclusive locks are acquired in increasing order of item with one call to
+        the Site_Manager, stopping at the first item the transaction has to wait for. When it resumes, it goes on from that item.
+        Like write, the values only reach the database when the transaction commits
+    
+        Parameters:
+            instr (Instruction Object): The parsed instruction.
+            txn_id (int): ID of transaction
+            new_values (tuple(tuple(int, int))): (item ID, new value) of the items to be written, in increasing order of item ID
+        """
+
+        txn = self.txns[txn_id]
+        if self.rejected(txn):
+            return
+        # a resumed instruction goes on from where it blocked, a new one starts over
+        if txn.current_instruction is not instr or txn.bulk_done == None:
+            txn.bulk_done = []
+        txn.current_instruction = instr
+
+        if new_values[0][0] < 1 or new_values[-1][0] > self.config.num_variables:
+            self.sink.emit("invalid")
+            return
+
+        done = txn.bulk_done
+        remaining = new_values[len(done):]
+
+        if self.config.concurrency_control == "optimistic":
+            # no locks, each write goes to every site holding the item that is up
+            item_sites = []
+            for item_id, _ in remaining:
+                locked_sites = self.site_manager.writable_sites(txn_id, item_id)
+                if len(locked_sites) == 0:
+                    if self.metrics.enabled:
+                        self.metrics.begin_wait(txn_id, "failure", self.tick)
+                    break
+                item_sites.append(locked_sites)
+        else:
+            # go acquire exclusive locks for the items, in one call
+            item_ids = [item_id for item_id, _ in remaining]
+            exclusive_locks = self.timed_acquire("bulk_exclusive", txn_id, self.site_manager.acquire_exclusive_locks,
+                                                 txn_id, item_ids)
+            item_sites = [[l.site_id for l in locks] for locks in exclusive_locks]
+
+        written = remaining[:len(item_sites)]
+        if len(written) > 0:
+            touched_sites = set()
+            for (item_id, new_value), locked_sites in zip(written, item_sites):
+                # add this new uncommitted value to transaction's write set
+                txn.add_write(item_id, new_value, locked_sites)
+                touched_sites.update(locked_sites)
+
+            # add the items written at this tick to the transaction's cache
+            txn.cache[self.tick] = [
+                "write", (written, sorted(touched_sites))
+            ]
+            self.site_manager.touch(txn, touched_sites, self.tick)
+            done.extend(written)
+
+        if len(done) == len(new_values):
+            txn.bulk_done = None
+            self.sink.emit("multi_write", txn_id, done)
+        else:
+            txn.status = "blocked"
+
+    def timed_acquire(self, kind, txn_id, acquire, *args):
+        """ Makes a lock request. With metrics enabled, records its outcome and latency, and the start of a wait if the transaction blocked
+
+        Parameters:
+            kind (string): kind of lock requested - "share"/"exclusive"/"range"/"bulk_share"/"bulk_exclusive"
+            txn_id (int): ID of transaction
+            acquire (function): the Site_Manager method making the request
+            args: arguments of acquire
+
+        Return:
+            what acquire returns
+        """
+
+        if not self.metrics.enabled:
+            return acquire(*args)
+
+        started = perf_counter()
+        result = acquire(*args)
+        self.metrics.observe(f'lock.{kind}.seconds', perf_counter() - started)
+        cause = self.site_manager.blocked_by(txn_id)
+        if cause == None:
+            self.metrics.increment(f'lock.{kind}.granted')
+        else:
+            self.metrics.increment(f'lock.{kind}.{cause}_wait')
+            self.metrics.begin_wait(txn_id, cause, self.tick)
+        return result
+
     def fail(self, site_id):
         """ Tells the Site_manager to fail a site
 
@@ -199,12 +584,40 @@ class Transaction_Manager(object):
             site_id (int): ID of site to be failed
         """
 
-        self.site_manager.fail(site_id, self.tick)
+        for txn_id in self.site_manager.fail(site_id, self.tick):
+            self.doom(self.txns[txn_id], site_id)
+
+    def doom(self, txn, site_id):
+        """ Aborts a read-write transaction that accessed a site before the site failed, since it can't commit anymore,
+        and hands its locks to the transactions waiting for them. With eager_abort "immediate" the abort is reported now.
+        With "end" the transaction rejects its operations until its end reports the abort
+
+        Parameters:
+            txn (Transaction Object): Transaction that accessed the failed site
+            site_id (int): ID of the failed site
+        """
+
+        blocked = txn.status == "blocked"
+        if self.metrics.enabled:
+            self.metrics.increment("abort.site_failed")
+            self.metrics.end_wait(txn.id, self.tick)
+        self.site_manager.abort(txn)
 
+        if self.config.eager_abort == "immediate":
+            self.sink.emit("site_failed", site_id, txn.id)
+            self.sink.emit("abort", txn.id)
+            txn.status = "aborted"
+            return
+
+        txn.status = "doomed"
+        self.doomed[txn.id] = site_id
+        if blocked:
+            # the instruction it was blocked on is rejected
+            self.sink.emit("doomed", txn.id, site_id)
 
     def recover(self, site_id):
         """ Tells the Site_manager to recover a site
-        Add all the transactions in txns_waiting_list back to the txns_ready_list to see if any can proceed
+        The Site_manager moves the transactions waiting for items this site can serve to the txns_ready_list
 
         Parameters:
             site_id (int): ID of site to be recovered
@@ -212,24 +625,36 @@ class Transaction_Manager(object):
 
         self.site_manager.recover(site_id, self.tick)
 
-        self.site_manager.txns_ready_list = self.site_manager.txns_ready_list + self.site_manager.txns_waiting_list
-        self.site_manager.txns_waiting_list = []
-
     def dump(self):
         """ Tells the Site_manager to dump all the variables and their values
         """
 
         self.site_manager.dump()
 
+    def checkpoint(self, path):
+        """ Tells the Site_manager to write the committed state of the database to a checkpoint file
+
+        Parameters:
+            path (string): path of the checkpoint file. Empty for the checkpoint path of the config
+        """
+
+        if path == "":
+            path = self.config.checkpoint_path
+        if path == None:
+            self.sink.emit("invalid")
+            return
+
+        self.site_manager.checkpoint(path, self.tick)
+        self.sink.emit("checkpoint", path, self.tick)
+
     def end(self, instr, txn_id):
         """ Ends transaction. 
-        Asks site_manager if the transaction should commit based on the timestamp of operations vs site_failures
-        If okay, asks site_manager to commit
+        Asks site_manager if the transaction should commit based on the timestamp of operations vs site_failures, and on the versions it read under optimistic concurrency control
+        If okay, asks site_manager to commit. Transactions waiting to read an item the commit makes readable are woken up by the site_manager
         Else, ask site_manager to abort
-        In the end, add all the transactions in txns_waiting_list back to the txns_ready_list to see if any can proceed
 
         Parameters:
-            instr (string): The original instruction string.
+            instr (Instruction Object): The parsed instruction.
             txn_id (int): ID of transaction to be ended
         """
 
@@ -238,54 +663,69 @@ class Transaction_Manager(object):
 
         # Check if transaction has already been committed or aborted
         if txn.status == "committed" or txn.status == "aborted":
-            print(f'Transaction {txn_id} has already been {txn.status}')
+            self.sink.emit("already_ended", txn_id, txn.status)
+
+        elif txn.status == "doomed":
+            # its locks were released when the site failed
+            self.sink.emit("site_failed", self.doomed.pop(txn_id), txn_id)
+            self.sink.emit("abort", txn_id)
+            txn.status = "aborted"
 
         elif txn.transaction_type == "read_write":
 
             # Ask site manager to check if transaction can commit
             if self.site_manager.check_commit(txn):
-                print(f'Transaction {txn_id} commits.')
 
-                # ask site manager to commit
-                self.site_manager.commit(txn)
+                # ask site manager to commit. The commit is in the log on disk before it's reported
+                self.site_manager.commit(txn, self.tick)
+                if not self.defer_sync:
+                    self.site_manager.flush_log()
+                self.sink.emit("commit", txn_id)
                 txn.status = "committed"
             else:
-                print(f'Transaction {txn_id} aborts.')
+                self.sink.emit("abort", txn_id)
 
                 # ask site manager to abort
                 self.site_manager.abort(txn)
                 txn.status = "aborted"
         else:
-            print(f'Transaction {txn_id} commits')
+            self.sink.emit("commit_read_only", txn_id)
 
             # ask site manager to commit a Read Only transaction
             self.site_manager.commitRO(txn)
             txn.status = "committed"
 
-        # add all the transactions in txns_waiting_list back to the txns_ready_list to see if any can proceed in the next tick
-        self.site_manager.txns_ready_list = self.site_manager.txns_ready_list + self.site_manager.txns_waiting_list
-        self.site_manager.txns_waiting_list = []
-
     def run_ready_transactions(self):
         # Run transactions that are ready
 
         while len(self.site_manager.txns_ready_list) > 0:
 
-            # pop the transaction out
+            # pop the transaction out. A transaction aborted or doomed after it was woken up stays so
             ready_txn_id = self.site_manager.txns_ready_list.pop(0)
-            print(f'Resume Transaction {ready_txn_id}')
+            if self.txns[ready_txn_id].status == "aborted" or self.txns[ready_txn_id].status == "doomed":
+                continue
+            self.sink.emit("resume", ready_txn_id)
             self.txns[ready_txn_id].status = "running"
-            self.read_instruction(self.txns[ready_txn_id].current_instruction)
+            if self.metrics.enabled:
+                self.metrics.increment("ready.retries")
+                self.metrics.end_wait(ready_txn_id, self.tick)
+
+            # the blocked instruction runs again within the current tick, it's not parsed again
+            self.dispatch(self.txns[ready_txn_id].current_instruction)
+
+            if self.metrics.enabled and self.txns[ready_txn_id].status == "blocked":
+                self.metrics.increment("ready.blocked_again")
 
     def find_cycle(self):
-        # Tell site_manager to detect cycle, if cycle found, kill the youngest cycle
+        # Tell site_manager to detect cycle, if cycle found, kill the youngest cycle. Returns the cycles found
 
         cycles = self.site_manager.find_cycle()
         if len(cycles) > 0:
 
             for cycle in cycles:
-                print(f'Cycle detected in Transactions {cycle}')
+                self.sink.emit("cycle", list(cycle))
                 self.kill_youngest(cycle)
+        return cycles
 
     def kill_youngest(self, cycle):
         """ Finds the youngest transaction in the cycle and tells the site_manager to kill that transaction
@@ -297,13 +737,62 @@ class Transaction_Manager(object):
         cycle.sort(key=lambda txn_id: self.txns[txn_id].timestamp,
                    reverse=True)
         youngest_txn = self.txns[cycle[0]]
-        print(f'Killing the youngest Transaction {cycle[0]}')
+        self.sink.emit("kill", cycle[0])
         youngest_txn.status = "aborted"
+        if self.metrics.enabled:
+            self.metrics.increment("abort.deadlock")
+            self.metrics.end_wait(youngest_txn.id, self.tick)
         self.site_manager.kill(youngest_txn)
-        print()
+
+    def abort_victims(self):
+        """ Aborts the transactions the deadlock prevention policy chose at lock conflicts. Their locks go to the transactions
+        waiting for them, which resume in run_ready_transactions
+        """
+
+        victims = self.site_manager.victims
+        while len(victims) > 0:
+            txn_id = next(iter(victims))
+            conflicts = victims.pop(txn_id)
+            txn = self.txns[txn_id]
+            if txn.status == "committed" or txn.status == "aborted" or txn.status == "doomed":
+                continue
+
+            self.sink.emit("prevent", txn_id, self.config.deadlock_policy, sorted(set(conflicts)))
+            txn.status = "aborted"
+            if self.metrics.enabled:
+                self.metrics.increment(f'abort.{self.config.deadlock_policy}')
+                self.metrics.end_wait(txn_id, self.tick)
+            self.site_manager.kill(txn)
+
+    def abandon(self, txn_id):
+        """ Aborts a transaction that will get no more instructions, like the transaction of a client that went away.
+        It's taken out of any queue it waits in and its locks are released
+        
+        Parameters:
+           txn_id (int): ID of transaction
+        """
+
+        txn = self.txns[txn_id]
+        if txn.status == "committed" or txn.status == "aborted":
+            return
+
+        self.sink.emit("abort", txn_id)
+        if txn.status == "doomed":
+            # its locks were released when the site failed
+            del self.doomed[txn_id]
+            txn.status = "aborted"
+            return
+        txn.status = "aborted"
+        if self.metrics.enabled:
+            self.metrics.increment("abort.abandoned")
+            self.metrics.end_wait(txn_id, self.tick)
+        self.site_manager.kill(txn)
+
+    def close(self):
+        # flush and close the write-ahead log, if there is one, stop the site processes, if there are any, and close the sink
+        self.site_manager.close()
+        self.sink.close()
 
     def query_state(self):
-        # prints info of all the transactions in Transaction Manager
-        print("Transaction State:")
-        for _, txn in self.txns.items():
-            print(f'T{txn.id}: {txn.status}')
+        # reports info of all the transactions in Transaction Manager
+        self.sink.emit("state", [(txn.id, txn.status) for txn in self.txns.values()])
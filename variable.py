@@ -5,6 +5,11 @@ Created on Nov 28, 2019
 '''
 
 
+def initial_value(var_id):
+    # value of a variable before anything is written to it
+    return 10 * var_id
+
+
 class Variable(object):
     '''
     Variable is the data item.
@@ -13,6 +18,8 @@ class Variable(object):
         id (int): id of the Variable
         value (int): value of the Variable. It's initialized as 10 * id
     '''
+    __slots__ = ("id", "value")
+
     def __init__(self, var_id):
         '''
         Constructor
@@ -21,4 +28,4 @@ class Variable(object):
             var_id (int): ID of variable.
         '''
         self.id = var_id
-        self.value = 10 * var_id
+        self.value = initial_value(var_id)
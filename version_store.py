@@ -0,0 +1,137 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from bisect import bisect_right
+from collections import OrderedDict
+from variable import initial_value
+
+
+class Version_Store(object):
+    """
+    Version_Store keeps the committed versions of each data item tagged with the tick they were committed at,
+    so a read-only transaction only needs to remember when it began.
+    Items that were never written have a single implicit version: their base value.
+
+    Attributes:
+        base_value (function): item_id: value of the item before the first version, its initial value or its value in a checkpoint
+        chains (dict (int: tuple(list(int), list(int)) ): item_id: (commit ticks, values), oldest first
+        readers (OrderedDict (int: int) ): transaction ID: start tick of every active read-only transaction, oldest first
+        stale_items (set(int)): Item IDs whose chain has more than one version
+    """
+    def __init__(self, base_value=initial_value):
+        '''
+        Constructor
+
+        Parameters:
+            base_value (function): item_id: value of the item before the first version
+        '''
+        self.base_value = base_value
+        self.chains = {}
+        self.readers = OrderedDict()
+        self.stale_items = set()
+
+    def add_reader(self, txn_id, ts):
+        """Registers an active read-only transaction
+
+        Parameters:
+            txn_id (int): ID of read-only transaction
+            ts (int): time the transaction began
+        """
+
+        self.readers[txn_id] = ts
+
+    def remove_reader(self, txn_id):
+        """Unregisters a read-only transaction. If it was the oldest one, versions nobody can see anymore are collected
+
+        Parameters:
+            txn_id (int): ID of read-only transaction
+        """
+
+        if txn_id not in self.readers:
+            return
+
+        oldest = next(iter(self.readers))
+        del self.readers[txn_id]
+        if oldest == txn_id:
+            for item_id in list(self.stale_items):
+                self.collect(item_id)
+
+    def add(self, item_id, ts, value):
+        """Records a committed version of an item
+
+        Parameters:
+            item_id (int): ID of item
+            ts (int): time of the commit
+            value (int): committed value
+        """
+
+        if item_id not in self.chains:
+            self.chains[item_id] = ([ts], [value])
+            return
+
+        ticks, values = self.chains[item_id]
+        if ticks[-1] == ts:
+            # written more than once by the same commit
+            values[-1] = value
+        else:
+            ticks.append(ts)
+            values.append(value)
+            self.stale_items.add(item_id)
+            self.collect(item_id)
+
+    def last_commit(self, item_id):
+        """Finds when an item was committed last
+
+        Parameters:
+            item_id (int): ID of item
+
+        Return:
+            tick (int) of the last commit of the item, -1 if it wasn't written since the store was built
+        """
+
+        if item_id not in self.chains:
+            return -1
+        return self.chains[item_id][0][-1]
+
+    def read(self, item_id, ts):
+        """Finds the value of an item that was committed last at or before time ts
+
+        Parameters:
+            item_id (int): ID of item
+            ts (int): time the reader began
+
+        Return:
+            value (int) of the visible version
+        """
+
+        if item_id not in self.chains:
+            return self.base_value(item_id)
+
+        ticks, values = self.chains[item_id]
+        i = bisect_right(ticks, ts) - 1
+        if i < 0:
+            return self.base_value(item_id)
+        return values[i]
+
+    def collect(self, item_id):
+        """Drops the versions of an item that are older than the version the oldest active reader sees.
+        With no active reader only the newest version is kept.
+
+        Parameters:
+            item_id (int): ID of item
+        """
+
+        ticks, values = self.chains[item_id]
+        if len(self.readers) > 0:
+            keep_from = bisect_right(ticks, next(iter(self.readers.values()))) - 1
+        else:
+            keep_from = len(ticks) - 1
+
+        if keep_from > 0:
+            del ticks[:keep_from]
+            del values[:keep_from]
+        if len(ticks) == 1:
+            self.stale_items.discard(item_id)
@@ -0,0 +1,135 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+
+class Wait_For_Graph(object):
+    """
+    Wait_For_Graph is the wait-for graph between transactions. It's kept up to date as transactions block and release locks,
+    so a deadlock check only needs to look at the transactions that blocked since the last check.
+
+    Attributes:
+        waits_for (dict(int: set(int)) ): transaction ID: IDs of the transactions it's waiting for
+        waited_by (dict(int: set(int)) ): transaction ID: IDs of the transactions waiting for it
+        newly_blocked (dict(int: None) ): IDs of transactions that gained edges since the last check, in the order they blocked
+    """
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.waits_for = {}
+        self.waited_by = {}
+        self.newly_blocked = {}
+
+    def add_edges(self, txn_id, txns_blocking):
+        """Records that a transaction waits for other transactions
+
+        Parameters:
+            txn_id (int): ID of the blocked transaction
+            txns_blocking (iterable(int)): IDs of the transactions it needs to wait for
+        """
+
+        for blocker in txns_blocking:
+            # a transaction never waits for itself
+            if blocker == txn_id:
+                continue
+            self.waits_for.setdefault(txn_id, set()).add(blocker)
+            self.waited_by.setdefault(blocker, set()).add(txn_id)
+
+        if txn_id in self.waits_for:
+            self.newly_blocked[txn_id] = None
+
+    def remove_waiter(self, txn_id):
+        """Removes all the edges going out of a transaction, when it stops waiting
+
+        Parameters:
+            txn_id (int): ID of transaction
+        """
+
+        for blocker in self.waits_for.pop(txn_id, ()):
+            waiters = self.waited_by[blocker]
+            waiters.discard(txn_id)
+            if len(waiters) == 0:
+                del self.waited_by[blocker]
+        self.newly_blocked.pop(txn_id, None)
+
+    def remove(self, txn_id):
+        """Removes a transaction and all of its edges, when it ends or is killed
+
+        Parameters:
+            txn_id (int): ID of transaction
+        """
+
+        self.remove_waiter(txn_id)
+        for waiter in self.waited_by.pop(txn_id, ()):
+            blockers = self.waits_for[waiter]
+            blockers.discard(txn_id)
+            if len(blockers) == 0:
+                del self.waits_for[waiter]
+
+    def find_cycles(self):
+        """ Check for deadlock. Any new cycle has to go through an edge added since the last check, so Tarjan's Algorithm
+        is only run over the part of the graph reachable from the transactions that blocked since then.
+        It's iterative so long wait chains can't overflow the stack. Only one transaction of a cycle is killed, the others
+        may still be in a smaller cycle, so they are searched from again at the next check.
+
+        Return:
+            list( list(int) ): List of cycles. Each cycle is a list of Transaction IDs of a strongly connected component
+        """
+
+        disc = {}
+        low = {}
+        stackMember = set()
+        st = []
+        ans = []
+        suspects = {}
+
+        for root in self.newly_blocked:
+            if root in disc or root not in self.waits_for:
+                continue
+
+            # each frame is a vertex and an iterator over the transactions it waits for
+            disc[root] = low[root] = len(disc)
+            st.append(root)
+            stackMember.add(root)
+            frames = [(root, iter(self.waits_for[root]))]
+
+            while len(frames) > 0:
+                u, edges = frames[-1]
+                descended = False
+                for v in edges:
+                    if v not in disc:
+                        # a transaction that waits for nobody can't be on a cycle, there is nothing to search past it
+                        if v not in self.waits_for:
+                            continue
+                        disc[v] = low[v] = len(disc)
+                        st.append(v)
+                        stackMember.add(v)
+                        frames.append((v, iter(self.waits_for[v])))
+                        descended = True
+                        break
+                    elif v in stackMember:
+                        low[u] = min(low[u], disc[v])
+                if descended:
+                    continue
+
+                frames.pop()
+                if len(frames) > 0:
+                    parent = frames[-1][0]
+                    low[parent] = min(low[parent], low[u])
+
+                if low[u] == disc[u]:
+                    cycle = []
+                    w = None
+                    while w != u:
+                        w = st.pop()
+                        cycle.append(w)
+                        stackMember.discard(w)
+                    if len(cycle) > 1:
+                        ans.append(cycle)
+                        suspects.update(dict.fromkeys(cycle))
+
+        self.newly_blocked = suspects
+        return ans
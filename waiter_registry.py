@@ -0,0 +1,132 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+from collections import OrderedDict
+
+
+class Waiter_Registry(object):
+    """
+    Waiter_Registry keeps the transactions that are blocked because a data item is not available at any site,
+    indexed by the item and by the sites that could make it available again.
+    A site recovery only wakes the transactions that the site can serve, and a committed write only wakes the readers of that item.
+
+    Attributes:
+        config (Config Object): size and item placement of the database
+        item_waiters (dict (int: OrderedDict(int: string)) ): item_id: transaction ID: "read"/"write", in the order they blocked
+        local_items (dict (int: set(int)) ): site_id: IDs of the unreplicated items stored at the site that have waiters
+        replicated_items (set(int)): IDs of the replicated items that have waiters
+        txn_item (dict (int: int) ): transaction ID: ID of the item it's waiting for
+        txn_order (dict (int: int) ): transaction ID: sequence number of when it blocked
+        count (int): number of times a transaction has been registered, used for the sequence numbers
+    """
+    def __init__(self, config):
+        '''
+        Constructor
+
+        Parameters:
+            config (Config Object): size and item placement of the database
+        '''
+        self.config = config
+        self.item_waiters = {}
+        self.local_items = {}
+        self.replicated_items = set()
+        self.txn_item = {}
+        self.txn_order = {}
+        self.count = 0
+
+    def __len__(self):
+        return len(self.txn_item)
+
+    def add(self, txn_id, item_id, access):
+        """Registers a transaction waiting for an item to become available
+
+        Parameters:
+            txn_id (int): ID of transaction
+            item_id (int): ID of item it's waiting for
+            access (string): "read" or "write"
+        """
+
+        self.remove(txn_id)
+        self.txn_item[txn_id] = item_id
+        self.txn_order[txn_id] = self.count
+        self.count += 1
+
+        if item_id not in self.item_waiters:
+            self.item_waiters[item_id] = OrderedDict()
+            if self.config.is_replicated(item_id):
+                self.replicated_items.add(item_id)
+            else:
+                home = self.config.item_sites[item_id][0]
+                self.local_items.setdefault(home, set()).add(item_id)
+        self.item_waiters[item_id][txn_id] = access
+
+    def remove(self, txn_id):
+        """Unregisters a transaction, if it's waiting
+
+        Parameters:
+            txn_id (int): ID of transaction
+        """
+
+        item_id = self.txn_item.pop(txn_id, None)
+        if item_id == None:
+            return
+        del self.txn_order[txn_id]
+
+        waiters = self.item_waiters[item_id]
+        del waiters[txn_id]
+        if len(waiters) == 0:
+            del self.item_waiters[item_id]
+            if self.config.is_replicated(item_id):
+                self.replicated_items.discard(item_id)
+            else:
+                home = self.config.item_sites[item_id][0]
+                self.local_items[home].discard(item_id)
+
+    def wake_site(self, site_id):
+        """Takes out the transactions a recovered site can serve: every waiter of its unreplicated items,
+        and the writers of replicated items. Replicated items can't be read at the site until a write is committed there,
+        except with quorums, where their readers are woken too.
+
+        Parameters:
+            site_id (int): ID of recovered site
+
+        Return:
+            list(int) of transaction IDs in the order they blocked
+        """
+
+        woken = []
+        for item_id in self.local_items.get(site_id, ()):
+            woken.extend(self.item_waiters[item_id])
+        quorum = self.config.read_quorum != None
+        for item_id in self.replicated_items:
+            for txn_id, access in self.item_waiters[item_id].items():
+                if access == "write" or quorum:
+                    woken.append(txn_id)
+        return self._take(woken)
+
+    def wake_readers(self, item_id):
+        """Takes out the transactions waiting to read an item that just became readable at some site
+
+        Parameters:
+            item_id (int): ID of item
+
+        Return:
+            list(int) of transaction IDs in the order they blocked
+        """
+
+        if item_id not in self.item_waiters:
+            return []
+        woken = [
+            txn_id for txn_id, access in self.item_waiters[item_id].items()
+            if access == "read"
+        ]
+        return self._take(woken)
+
+    def _take(self, woken):
+        woken.sort(key=lambda txn_id: self.txn_order[txn_id])
+        for txn_id in woken:
+            self.remove(txn_id)
+        return woken
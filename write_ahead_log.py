@@ -0,0 +1,152 @@
+'''
+Created on Oct 18, 2026
+
+@author: Ian Lam, Yu Ting Chiu
+'''
+
+import json
+import os
+import time
+
+
+class Write_Ahead_Log(object):
+    """
+    Write_Ahead_Log is an append-only file of the committed writes and the site failures and recoveries, one JSON record per line.
+    The Site_Manager appends to it before it changes any site, so the sites can be rebuilt from it after a restart.
+
+    fsync policies:
+        "always": every record is flushed and fsynced before the append returns
+        "group": records are fsynced together. Records of later ticks join the records of a tick until group_window seconds have
+                 passed since the first unsynced record, as long as the caller holds back what it reports until then, like the server.
+                 Otherwise the Transaction_Manager syncs each commit before it's reported
+        "none": records are flushed to the operating system like "group" but never fsynced
+
+    Attributes:
+        path (string): path of the log file
+        fsync_policy (string): "always"/"group"/"none"
+        group_window (float): seconds a record can wait for a group fsync
+        log_file (file object): the log file opened for appending
+        pending (int): number of records appended since the last flush
+        pending_since (float): time the oldest unflushed record was appended
+        syncs (int): number of fsyncs done
+    """
+    POLICIES = ("always", "group", "none")
+
+    def __init__(self, path, fsync_policy="group", group_window=0.005):
+        '''
+        Constructor
+
+        Parameters:
+            path (string): path of the log file, created if it doesn't exist
+            fsync_policy (string): "always"/"group"/"none"
+            group_window (float): seconds a record can wait for a group fsync
+        '''
+        if fsync_policy not in self.POLICIES:
+            raise ValueError(f'fsync_policy must be one of {self.POLICIES}')
+
+        self.path = path
+        self.fsync_policy = fsync_policy
+        self.group_window = group_window
+        self.log_file = open(path, "a")
+        self.pending = 0
+        self.pending_since = 0.0
+        self.syncs = 0
+
+    def append_commit(self, ts, txn_id, new_values, destinations):
+        """Logs the write set of a committing transaction
+
+        Parameters:
+            ts (int): time of the commit
+            txn_id (int): ID of the committing transaction
+            new_values (dict (int: int)): item_id: new value of the item
+            destinations (dict (int: set(int))): item_id: site IDs the new value is written to
+        """
+
+        writes = [[item_id, new_val, sorted(destinations[item_id])]
+                  for item_id, new_val in new_values.items()]
+        self.append({"op": "commit", "ts": ts, "txn": txn_id, "writes": writes})
+
+    def append_site(self, op, ts, site_id):
+        """Logs a site failure or recovery
+
+        Parameters:
+            op (string): "fail"/"recover"
+            ts (int): time of the event
+            site_id (int): ID of site
+        """
+
+        self.append({"op": op, "ts": ts, "site": site_id})
+
+    def append(self, record):
+        """Appends a record and makes it durable according to the fsync policy
+
+        Parameters:
+            record (dict): JSON serializable record
+        """
+
+        self.log_file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        if self.pending == 0:
+            self.pending_since = time.monotonic()
+        self.pending += 1
+
+        if self.fsync_policy == "always":
+            self.sync()
+
+    def end_tick(self):
+        # the records of the tick are flushed, unless the group window still lets later ticks join them
+        if self.pending > 0 and time.monotonic() - self.pending_since >= self.group_window:
+            self.sync()
+
+    def due(self):
+        """Seconds until the group window of the unsynced records expires
+
+        Return:
+            float, 0 once the window has expired. None if every record is synced
+        """
+
+        if self.pending == 0:
+            return None
+        return max(0.0, self.pending_since + self.group_window - time.monotonic())
+
+    def sync(self):
+        # flush the pending records, fsync them unless the policy is "none"
+        self.log_file.flush()
+        if self.fsync_policy != "none":
+            os.fsync(self.log_file.fileno())
+            self.syncs += 1
+        self.pending = 0
+
+    def truncate(self):
+        # drops every record, once a checkpoint holds the state they describe
+        self.log_file.flush()
+        self.log_file.truncate(0)
+        if self.fsync_policy != "none":
+            os.fsync(self.log_file.fileno())
+        self.pending = 0
+
+    def close(self):
+        if self.pending > 0:
+            self.sync()
+        self.log_file.close()
+
+    @staticmethod
+    def replay(path):
+        """Reads back the records of a log file. A torn record at the end, left by a crash in the middle of an append, is ignored
+
+        Parameters:
+            path (string): path of the log file
+
+        Return:
+            iterator(dict) of the records in the order they were appended
+        """
+
+        if not os.path.exists(path):
+            return
+
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                yield record